@@ -1,7 +1,29 @@
-from .menu import MenuApp
-from .clock import ClockApp
-from .snake import SnakeApp
-from .tetris import TetrisApp
-from .screen_test import ScreenTestApp
+import importlib
 
-__all__ = ["MenuApp", "ClockApp", "TetrisApp", "SnakeApp", "ScreenTestApp"]
\ No newline at end of file
+# Resolved on first access (PEP 562), so importing the package does not import every app
+_EXPORTS = {
+    "MenuApp": ".menu",
+    "ClockApp": ".clock",
+    "SnakeApp": ".snake",
+    "TetrisApp": ".tetris",
+    "ScreenTestApp": ".screen_test",
+    "LifeApp": ".life",
+    "SkyApp": ".sky",
+    "PixelReceiverApp": ".pixel_receiver",
+    "ExternalFrameApp": ".external_frame",
+    "AnimationApp": ".animation",
+    "SpectrumApp": ".spectrum",
+    "WorkerApp": ".worker",
+    "AsyncApp": ".async_app",
+    "AppSpec": ".registry",
+    "LazyApp": ".registry",
+    "discover_apps": ".registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
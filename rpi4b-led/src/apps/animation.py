@@ -0,0 +1,99 @@
+import logging
+import os
+from typing import List, Optional
+
+from frame_file import FrameFile
+from led_matrix import LEDMatrix
+from .base import BaseApp, GamepadButtons
+
+
+class AnimationApp(BaseApp):
+    """
+    Loops frame files made by convert_animation.py. Frames are copied from the
+    memory map into the framebuffer as they are, so playback does no decoding
+    and memory use does not depend on the length of the clip.
+    """
+
+    ICON = ["#######", "# ### #", "#######", "#  #  #", "#  ## #", "#######", "# ### #"]
+
+    def __init__(self, matrix: LEDMatrix, target_fps=30, clear_before_render=False, path: str = "animations") -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.path = path  # A frame file or a directory of them
+        self.clip: Optional[FrameFile] = None
+
+    def _clip_paths(self) -> List[str]:
+        if os.path.isdir(self.path):
+            return sorted(
+                os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith(".leda")
+            )
+        return [self.path] if os.path.exists(self.path) else []
+
+    def execute(self) -> None:
+        try:
+            super().execute()
+        finally:
+            self._close_clip()
+
+    def reset(self) -> None:
+        self.clip_paths = self._clip_paths()
+        self.clip_index = 0
+        if not self.clip_paths:
+            logging.warning(f"No frame files found at {self.path}")
+        self._open_clip()
+
+    def _close_clip(self) -> None:
+        if self.clip is not None:
+            self.clip.close()
+            self.clip = None
+
+    def _open_clip(self) -> None:
+        self._close_clip()
+        self.frame_index = 0
+        self.frame_time = 0.0
+        self.shown_index = -1
+        for _ in range(len(self.clip_paths)):
+            path = self.clip_paths[self.clip_index]
+            try:
+                clip = FrameFile(path)
+            except (OSError, ValueError):
+                logging.error(f"Cannot play {path}", exc_info=True)
+            else:
+                if (clip.width, clip.height) == (self.matrix.width, self.matrix.height) and clip.frame_count:
+                    self.clip = clip
+                    logging.info(f"Playing {path}, {clip.frame_count} frames")
+                    return
+                logging.warning(
+                    f"Skipping {path}: {clip.width}x{clip.height} with {clip.frame_count} frames,"
+                    f" the matrix is {self.matrix.width}x{self.matrix.height}"
+                )
+                clip.close()
+            self.clip_index = (self.clip_index + 1) % len(self.clip_paths)
+
+    def update(self, delta_time: float) -> None:
+        if self.is_pressed(GamepadButtons.BACK):
+            self.keep_running = False
+            return
+        if self.clip_paths and (self.is_pressed(GamepadButtons.A) or self.is_pressed(GamepadButtons.B)):
+            step = 1 if self.is_pressed(GamepadButtons.A) else -1
+            self.clip_index = (self.clip_index + step) % len(self.clip_paths)
+            self._open_clip()
+            return
+        if self.clip is None:
+            return
+
+        # Keep the remainder instead of restarting the timer, so frame durations
+        # average out exactly even though frames are shown on render ticks
+        self.frame_time += delta_time
+        durations = self.clip.durations
+        while self.frame_time >= durations[self.frame_index]:
+            self.frame_time -= durations[self.frame_index]
+            self.frame_index = (self.frame_index + 1) % self.clip.frame_count
+            if durations[self.frame_index] <= 0:  # Zero-length frames would spin forever
+                break
+
+    def render(self) -> None:
+        if self.clip is None:
+            self.matrix.clear()
+        elif self.frame_index != self.shown_index:
+            self.matrix.load(self.clip.frame(self.frame_index))
+            self.shown_index = self.frame_index
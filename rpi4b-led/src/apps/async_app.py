@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Coroutine, Optional, Set
+
+import gc_policy
+from .base import BaseApp
+
+
+class AsyncApp(BaseApp):
+    """
+    An app whose frames run as a task on an asyncio event loop, for apps that
+    wait on I/O (a weather or transit board polling a server, a file tail, a
+    socket) without stalling frames.
+
+    update() and render() stay synchronous and must not block. Work that waits
+    goes into tasks started with spawn(), which leave their results for the next
+    update() to pick up; blocking calls belong in loop.run_in_executor(). start()
+    and stop() are awaited before the first and after the last frame, e.g. to
+    open and close connections. The frame task paces itself by sleeping on the
+    loop until the next frame is due, which is when the other tasks run.
+    """
+
+    def __init__(self, matrix, target_fps=30, clear_before_render=True) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Awaited after reset(), before the first frame."""
+
+    async def stop(self) -> None:
+        """Awaited after the last frame, once the spawned tasks are cancelled."""
+
+    def spawn(self, coroutine: Coroutine) -> asyncio.Task:
+        """Run `coroutine` alongside the frames until the app exits. Exceptions are logged, not raised."""
+        task = self.loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"{self.info()} task {task.get_name()} failed", exc_info=task.exception())
+
+    def execute(self) -> None:
+        asyncio.run(self.run())
+
+    async def run(self) -> None:
+        self.keep_running = True
+        self.loop = asyncio.get_running_loop()
+        self.connect_device()
+        self.reset()
+        self._accumulator = 0.0
+        logging.info(f"Running {self.info()} with fps={self.target_fps} on an event loop")
+
+        await self.start()
+        gc_policy.app_started()
+        try:
+            await self.loop.create_task(self._frames(), name="frames")
+        finally:
+            self.transition = None
+            gc_policy.app_stopped()
+            await self._shutdown()
+
+        logging.info(f"Exiting {self.info()}")
+
+    async def _frames(self) -> None:
+        loop = self.loop
+        frame_time = 1 / self.target_fps
+        last_frame = next_frame = loop.time()
+        delta_time = 0.0
+        while self.keep_running:
+            self.run_frame(delta_time)
+            next_frame += frame_time
+            now = loop.time()
+            if next_frame < now - frame_time:
+                next_frame = now  # Too far behind: carry on from now instead of rushing frames to catch up
+            await asyncio.sleep(next_frame - now)  # Yields to the other tasks even when the frame is late
+            now = loop.time()
+            delta_time = now - last_frame
+            last_frame = now
+
+    async def _shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.stop()
+
+    # In a worker process the parent paces the frames: the loop runs the tasks while waiting for input
+
+    def _worker_started(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.start())
+
+    def _worker_wait(self, conn) -> None:
+        readable = self.loop.create_future()
+
+        def on_readable() -> None:
+            self.loop.remove_reader(conn.fileno())
+            readable.set_result(None)
+
+        self.loop.add_reader(conn.fileno(), on_readable)
+        self.loop.run_until_complete(readable)
+
+    def _worker_stopped(self) -> None:
+        try:
+            self.loop.run_until_complete(self._shutdown())
+        finally:
+            self.loop.close()
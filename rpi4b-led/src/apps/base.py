@@ -1,11 +1,18 @@
 import functools
 import time
 import pygame
+import color_tables
+import control_hooks
+import frame_watchdog
+import gc_policy
 from led_matrix import LEDMatrix
 import math
-from typing import List, Tuple, Dict
+from typing import Callable, List, Optional, Tuple, Dict
 import logging
+from log_pipeline import LOG_COST, RateLimiter
 from input_manager import (
+    VIRTUAL_JOYDEVICEADDED,
+    VIRTUAL_JOYDEVICEREMOVED,
     GamepadType,
     InputManager,
     NintendoButtons,
@@ -74,6 +81,12 @@ class GamepadButtons:
     NUM = 8
 
 
+# Share of a frame that logging may take before the frame loop complains
+LOG_COST_BUDGET = 0.1
+
+_event_log = RateLimiter(1.0)
+_log_cost_log = RateLimiter(10.0)
+
 InputMapping = {
     GamepadType.NINTENDO: {
         GamepadButtons.A: NintendoButtons.A,
@@ -112,6 +125,11 @@ class VfxUtils:
         )
         return VfxUtils.BREATH_CURVE_TABLE[index]
 
+    @staticmethod
+    def wheel_color(pos: int) -> int:
+        """VfxUtils.wheel() as a packed 0xRRGGBB color, looked up in color_tables.wheel_table()."""
+        return color_tables.wheel_table()[pos & 255]
+
     @staticmethod
     def wheel(pos: int) -> Tuple[int, int, int]:
         """Generate rainbow colors across 0-255 positions."""
@@ -127,6 +145,12 @@ class VfxUtils:
 
 class BaseApp:
     ICON: List[str] = []
+    # Seconds per update() in fixed-timestep mode, None to update once per rendered frame
+    FIXED_TIMESTEP: Optional[float] = None
+    # Updates a slow frame may catch up on before the simulation time is dropped
+    MAX_STEPS_PER_FRAME = 5
+    # False keeps the app in the main process under --app-processes, e.g. when it draws with the main process's state
+    WORKER_PROCESS = True
 
     def __init__(
         self, matrix: LEDMatrix, target_fps=30, clear_before_render=True
@@ -139,26 +163,99 @@ class BaseApp:
         self._input_manager = InputManager()
         self._input_devices = [None] * 4  # Support up to 4 players
         self._available_devices = []
+        self._accumulator = 0.0
+        self.interpolation = 0.0  # Fixed-timestep mode: fraction of a step the last render is ahead
+        self.transition = None  # Transition played over the first frames, see start_transition()
+
+    def start_transition(self, outgoing, name: str = "dissolve", duration: float = 0.4) -> None:
+        """Blend from the `outgoing` RGB snapshot into this app's frames when it runs next."""
+        from transitions import Transition  # numpy, only once something switches with a transition
+
+        self.transition = Transition(self.matrix, outgoing, name, duration)
 
     def execute(self) -> None:
         delta_time_ms = 0
         self.keep_running = True
         self.connect_device()
         self.reset()
+        self._accumulator = 0.0
         logging.info(f"Running {self.info()} with fps={self.target_fps}")
 
-        while self.keep_running:
-            if self.clear_before_render:
-                self.matrix.clear()
-            self.handle_events()
-            self._input_manager.update()
-            self.update(delta_time_ms / 1000.0)
-            self.render()
-            self.matrix.show()
-            delta_time_ms = self.clock.tick(self.target_fps)
+        gc_policy.app_started()
+        try:
+            while self.keep_running:
+                self.run_frame(delta_time_ms / 1000.0)
+                delta_time_ms = self.clock.tick(self.target_fps)
+        finally:
+            self.transition = None
+            gc_policy.app_stopped()
 
         logging.info(f"Exiting {self.info()}")
 
+    def run_frame(self, delta_time: float) -> None:
+        """One frame of the frame loop: events, simulate, render, show, then garbage collection in the slack."""
+        frame_start = time.perf_counter()
+        frame_watchdog.begin_frame(self, 1 / self.target_fps)
+        control_hooks.apply_commands(self)
+        if self.clear_before_render:
+            self.matrix.clear()
+        self.handle_events()
+        frame_watchdog.mark("events")
+        self.simulate(delta_time, self._input_manager.update)
+        frame_watchdog.mark("simulate")
+        self.render()
+        transition = self.transition
+        if transition is not None:
+            transition.capture(self.matrix)
+            if not transition.draw(self.matrix):
+                transition = self.transition = None
+        overlay = control_hooks.draw_overlay(self.matrix)
+        frame_watchdog.mark("render")
+        self.matrix.show()
+        if overlay:
+            control_hooks.restore_overlay(self.matrix)
+        if transition is not None:
+            transition.restore(self.matrix)
+        frame_watchdog.mark("show")
+        self.check_log_cost()
+        gc_policy.collect_in_slack(frame_start + 1 / self.target_fps)
+        frame_watchdog.mark("gc")
+        frame_watchdog.end_frame()
+
+    def simulate(self, delta_time: float, poll_input: Callable[[], None]) -> None:
+        """
+        Advance the game by a frame that took `delta_time`: one update() of that
+        length, or with FIXED_TIMESTEP as many fixed-length updates as the time
+        adds up to. Input is polled right before the first update, and button
+        edges are consumed by it, so a press is seen by exactly one update even
+        when a frame runs several or none.
+        """
+        step = self.FIXED_TIMESTEP
+        if not step:
+            poll_input()
+            self.update(delta_time)
+            # In a worker process nothing else moves the previous button states forward
+            self._input_manager.consume_edges()
+            return
+
+        self._accumulator = min(self._accumulator + delta_time, step * self.MAX_STEPS_PER_FRAME)
+        if self._accumulator >= step:
+            poll_input()
+            while self._accumulator >= step and self.keep_running:
+                self.update(step)
+                self._accumulator -= step
+                self._input_manager.consume_edges()
+        self.interpolation = self._accumulator / step
+
+    def check_log_cost(self) -> None:
+        """Warn (rarely) when log calls took more than LOG_COST_BUDGET of the last frame."""
+        records, seconds = LOG_COST.take()
+        if seconds > LOG_COST_BUDGET / self.target_fps:
+            _log_cost_log.log(
+                logging.WARNING,
+                f"Logging took {seconds * 1000:.1f}ms of a frame in {self.info()} ({records} records)",
+            )
+
     def reset(self) -> None:
         pass
 
@@ -171,6 +268,17 @@ class BaseApp:
     def info(self) -> str:
         return self.__class__.__name__
 
+    # Hooks of the worker process (see worker.py), which drives simulate() and render() itself
+
+    def _worker_started(self) -> None:
+        pass
+
+    def _worker_wait(self, conn) -> None:
+        """Return once `conn` has the next frame's input."""
+
+    def _worker_stopped(self) -> None:
+        pass
+
     def on_remove_joystick(self, joystick) -> None:
         self._input_manager.remove_joystick(joystick)
         self.disconnect_device(joystick.get_instance_id())
@@ -224,8 +332,15 @@ class BaseApp:
                     if joystick.get_instance_id() == e.instance_id:
                         self.on_remove_joystick(joystick)
                         logging.info(f"Joystick {joystick.get_name()} removed.")
+            elif e.type == VIRTUAL_JOYDEVICEADDED:
+                self.on_add_joystick(e.joystick)
+                logging.info(f"Joystick {e.joystick.get_name()} added.")
+            elif e.type == VIRTUAL_JOYDEVICEREMOVED:
+                self.on_remove_joystick(e.joystick)
+                logging.info(f"Joystick {e.joystick.get_name()} removed.")
             else:
-                logging.info(e)
+                # Axis motion and other events can arrive by the hundred per second
+                _event_log.log(logging.DEBUG, "%s", e)
 
     def get_joystick_id_with_type(self, device_index: int = -1) -> int:
         """
@@ -1,5 +1,6 @@
 import time
 import math
+import colors
 from typing import List, Tuple
 from led_matrix import LEDMatrix
 
@@ -13,6 +14,9 @@ class ClockApp(BaseApp):
     # X_X:X_X
     padding = [1, 1, 0, 0, 0, 0, 0, 0, 1, 0]
 
+    def reset(self) -> None:
+        self.color_position = None
+
     def update(self, delta_time: float) -> None:
         
         if self.is_pressed(GamepadButtons.BACK):
@@ -27,6 +31,11 @@ class ClockApp(BaseApp):
             self.milliseconds, 1000
         )  # Breathing effect
         self.current_time = f"{self.current_hour:02}:{self.current_minute:02}"
+        # The color only moves one wheel position every 338 seconds, look it up when the position changes
+        position = self.get_color_position()
+        if position != self.color_position:
+            self.color_position = position
+            self.color = VfxUtils.wheel_color(position)
 
     def render(self) -> None:
         total_width = sum(len(FONT[char][0]) for char in self.current_time) + sum(
@@ -40,27 +49,17 @@ class ClockApp(BaseApp):
             x_offset += self.padding[idx * 2]
             pattern = FONT[char]
             if char == ":":
-                base_color = self.get_color_from_time()
-                color = (
-                    int(base_color[0] * self.brightness),
-                    int(base_color[1] * self.brightness),
-                    int(base_color[2] * self.brightness),
-                )
+                color = colors.scale(self.color, self.brightness)
             else:
-                color = self.get_color_from_time()
-            sprite = [
-                [color if pixel == "#" else (0, 0, 0) for pixel in row]
-                for row in pattern
-            ]
-            self.matrix.draw_sprite(x_offset, y_offset, sprite)
+                color = self.color
+            self.matrix.draw_pattern(x_offset, y_offset, pattern, color)
             x_offset += (
                 len(pattern[0]) + self.padding[idx * 2 + 1]
             )  # No extra space for colon, space for other characters
 
-    def get_color_from_time(self) -> Tuple[int, int, int]:
-        """Map the current time to a color in the 0-255 rainbow color wheel."""
+    def get_color_position(self) -> int:
+        """Map the current time to a position in the 0-255 rainbow color wheel."""
         total_seconds = (
             self.current_hour * 3600 + self.current_minute * 60 + self.current_second
         )
-        color_position = int((total_seconds / 86400) * 255)  # Map to 0-255
-        return VfxUtils.wheel(color_position)
+        return int((total_seconds / 86400) * 255)  # Map to 0-255
@@ -0,0 +1,39 @@
+import logging
+
+from .base import BaseApp, GamepadButtons
+
+
+class ExternalFrameApp(BaseApp):
+    """Shows whatever an external producer last committed to the shared framebuffer (--shm-name)."""
+
+    ICON = ["#######", "#     #", "# # # #", "#     #", "#######", "   #   ", " ##### "]
+    WORKER_PROCESS = False  # Flips the pages of the main process's shared framebuffer
+
+    def __init__(self, matrix, target_fps=30, clear_before_render=False) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+
+    def execute(self) -> None:
+        try:
+            super().execute()
+        finally:
+            if self.matrix.shared_frame is not None:
+                self.matrix.shared_frame.active = False
+
+    def reset(self) -> None:
+        self.shared_frame = self.matrix.shared_frame
+        if self.shared_frame is None:
+            logging.warning("ExternalFrameApp needs the matrix to run with a shared framebuffer")
+            return
+        self.matrix.clear()
+        if self.shared_frame.ready:
+            self.matrix.bind_buffer(self.shared_frame.flip())
+        self.shared_frame.active = True
+
+    def update(self, delta_time: float) -> None:
+        if self.is_pressed(GamepadButtons.BACK):
+            self.keep_running = False
+            return
+
+        # The producer drew straight into the back page, so presenting it is just a page flip
+        if self.shared_frame is not None and self.shared_frame.ready:
+            self.matrix.bind_buffer(self.shared_frame.flip())
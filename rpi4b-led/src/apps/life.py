@@ -0,0 +1,181 @@
+import logging
+import re
+import zlib
+from collections import deque
+from typing import Tuple
+
+import numpy as np
+
+from led_matrix import LEDMatrix
+from .base import BaseApp, GamepadButtons, VfxUtils
+
+# Life-like rules in B/S notation, B cycles through them
+RULES = [
+    "B3/S23",  # Conway's Life
+    "B36/S23",  # HighLife
+    "B3678/S34678",  # Day & Night
+    "B368/S245",  # Morley
+    "B35678/S5678",  # Diamoeba
+]
+
+# Cells this old and older share the last palette entry
+MAX_AGE = 63
+
+
+def parse_rule(rule: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Turn a rule like "B3/S23" into birth and survival lookup tables indexed by neighbour count."""
+    match = re.fullmatch(r"B([0-8]*)/S([0-8]*)", rule.strip().upper())
+    if match is None:
+        raise ValueError(f"Invalid rule {rule!r}, expected B/S notation such as B3/S23")
+    birth = np.zeros(9, dtype=bool)
+    survive = np.zeros(9, dtype=bool)
+    birth[[int(n) for n in match.group(1)]] = True
+    survive[[int(n) for n in match.group(2)]] = True
+    return birth, survive
+
+
+def build_age_palette(size: int = MAX_AGE + 1) -> np.ndarray:
+    """RGB per cell age: black for dead cells, white for newborns, then around the color wheel."""
+    palette = np.zeros((size, 3), dtype=np.uint8)
+    palette[1] = (255, 255, 255)
+    for age in range(2, size):
+        fade = 1 - 0.6 * (age - 2) / (size - 2)
+        palette[age] = [int(c * fade) for c in VfxUtils.wheel((age * 4 + 85) % 256)]
+    return palette
+
+
+class LifeApp(BaseApp):
+    """
+    Life-like cellular automata on a torus. Every generation is computed for the
+    whole board at once with numpy and written through a view of the framebuffer,
+    so the cost barely grows with the size of the wall.
+    """
+
+    ICON = ["       ", "  #    ", "   #   ", " ###   ", "    ## ", "    ## ", "       "]
+
+    def __init__(
+        self,
+        matrix: LEDMatrix,
+        target_fps=30,
+        clear_before_render=False,
+        rule: str = RULES[0],
+        density: float = 0.3,
+        cycle_window: int = 32,
+        stall_hold: float = 2.0,
+    ) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.rule = rule
+        self.birth, self.survive = parse_rule(rule)
+        self.density = density  # Share of live cells after seeding
+        self.cycle_window = cycle_window  # Periods up to this many generations count as stalled
+        self.stall_hold = stall_hold  # Seconds a stalled pattern stays up before reseeding
+        self.palette = build_age_palette()
+        self.rng = np.random.default_rng()
+
+    def reset(self) -> None:
+        shape = (self.matrix.height, self.matrix.width)
+        self.randoms = np.empty(shape)
+        self.alive = np.empty(shape, dtype=bool)
+        self.age = np.empty(shape, dtype=np.uint8)
+        # Scratch for step(), reused every generation: the board inside a one-cell
+        # border copied from the opposite edges (a torus), and its eight shifted
+        # windows. numpy sums strided 2D windows through a temporary buffer, so the
+        # windows are contiguous slices of the flattened padded board, from its
+        # first cell to its last. The counts then come in rows of width + 2, the
+        # last two of which fall on the border and are ignored
+        height, width = shape
+        stride = width + 2
+        padded = self.padded = np.zeros((height + 2, stride), dtype=np.uint8)
+        self.padded_rows = padded[1:-1, 1:-1], padded[0, 1:-1], padded[-1, 1:-1]
+        self.padded_columns = (padded[:, 0], padded[:, -2]), (padded[:, -1], padded[:, 1])
+        flat, first, length = padded.reshape(-1), stride + 1, height * stride - 2
+        self.windows = [
+            flat[first + offset:first + offset + length]
+            for offset in (dy * stride + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx)
+        ]
+        self.neighbours = np.zeros(length, dtype=np.uint8)
+        # take() converts any other index type to intp in a temporary array of its own
+        self.counts = np.empty(length, dtype=np.intp)
+        # take() writes the outcomes for the counts, the next board reads those of the cells
+        survivors = np.empty((height, stride), dtype=bool)
+        births = np.empty((height, stride), dtype=bool)
+        self.survivors, self.survivor_cells = survivors.reshape(-1)[:length], survivors[:, :width]
+        self.births, self.birth_cells = births.reshape(-1)[:length], births[:, :width]
+        self.next_alive = np.empty(shape, dtype=bool)
+        self.indices = np.empty(shape, dtype=np.intp)
+        self.history = deque(maxlen=self.cycle_window)
+        self.seed()
+
+    def seed(self) -> None:
+        """Start over from a random board, in the arrays reset() allocated."""
+        self.rng.random(out=self.randoms)
+        np.less(self.randoms, self.density, out=self.alive)
+        np.copyto(self.age, self.alive)
+        self.history.clear()
+        self.stalled_timer = 0.0
+        self.generation = 0
+
+    def set_rule(self, rule: str) -> None:
+        self.birth, self.survive = parse_rule(rule)
+        self.rule = rule
+        logging.info(f"Life rule {rule}")
+
+    def step(self) -> None:
+        alive = self.alive
+        inner, top, bottom = self.padded_rows
+        inner[...] = alive
+        top[...] = alive[-1]
+        bottom[...] = alive[0]
+        for border, column in self.padded_columns:
+            border[...] = column
+        # Sum the eight shifted windows into the neighbour counts
+        neighbours = self.neighbours
+        neighbours[...] = 0
+        for window in self.windows:
+            neighbours += window
+        next_alive, counts = self.next_alive, self.counts
+        np.copyto(counts, neighbours)
+        np.take(self.survive, counts, out=self.survivors, mode="clip")  # "raise" would buffer `out`
+        np.take(self.birth, counts, out=self.births, mode="clip")
+        np.copyto(next_alive, self.birth_cells)
+        np.copyto(next_alive, self.survivor_cells, where=alive)
+        self.alive, self.next_alive = next_alive, alive
+        self.age += 1
+        np.minimum(self.age, MAX_AGE, out=self.age)
+        self.age *= next_alive.view(np.uint8)  # Multiplying by the bools themselves casts them in a buffer
+        self.generation += 1
+
+    def _stalled(self) -> bool:
+        if not np.count_nonzero(self.alive):
+            return True
+        # A state seen within the window means a still life or a short oscillator
+        state = zlib.crc32(self.alive)  # Reads the board in place, where tobytes() would copy it
+        if state in self.history:
+            return True
+        self.history.append(state)
+        return False
+
+    def update(self, delta_time: float) -> None:
+        if self.is_pressed(GamepadButtons.BACK):
+            self.keep_running = False
+            return
+        if self.is_pressed(GamepadButtons.A) or self.is_pressed(GamepadButtons.START):
+            self.seed()
+        elif self.is_pressed(GamepadButtons.B):
+            self.set_rule(RULES[(RULES.index(self.rule) + 1) % len(RULES)] if self.rule in RULES else RULES[0])
+            self.seed()
+
+        if self.stalled_timer > 0:
+            self.stalled_timer -= delta_time
+            if self.stalled_timer <= 0:
+                self.seed()
+            return
+
+        self.step()
+        if self._stalled():
+            logging.debug(f"Life stalled after {self.generation} generations, reseeding")
+            self.stalled_timer = self.stall_hold
+
+    def render(self) -> None:
+        np.copyto(self.indices, self.age)
+        np.take(self.palette, self.indices, axis=0, out=self.matrix.array(), mode="clip")
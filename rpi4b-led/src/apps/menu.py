@@ -1,116 +1,78 @@
-from typing import List
+from typing import List, Optional
 import pygame
 import logging
+import colors
 
 from .base import BaseApp, GamepadButtons
+from .worker import WorkerApp
 from input_manager import InputManager
 from led_matrix import LEDMatrix
 
 
 class MenuApp(BaseApp):
-    
-    def __init__(self, matrix, target_fps=30, clear_before_render=True):
+    # Transitions (see transitions.py) into a launched app and back to the menu
+    LAUNCH_TRANSITION = "iris"
+    RETURN_TRANSITION = "dissolve"
+    TRANSITION_TIME = 0.4
+
+    def __init__(self, matrix, target_fps=30, clear_before_render=True, app_processes=False):
         super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
         self.apps: List[BaseApp] = []
         self.input_manager = InputManager()
+        self.app_processes = app_processes  # Run each registered app in its own worker process
+        self.launch_request: Optional[int] = None  # Index of an app to launch next, set by the control socket
 
     def reg_app(self, app: BaseApp) -> None:
         if not isinstance(app, BaseApp):
             raise ValueError("app must be an instance of BaseApp")
+        if self.app_processes:
+            app = WorkerApp(app)
         self.apps.append(app)
 
     def reset(self) -> None:
         self.current_row = 0
-        self.target_row = 0
-        self.animation_progress = 0
         self.switch_time = 0.2  # Adjust this value to control the animation speed
-        self.direction = 0  # -1 for left, 1 for right
 
     def update(self, delta_time: float) -> None:
+        if self.launch_request is not None:
+            self._run_apps(self._snapshot())
+            return
 
         if self.is_pressed(GamepadButtons.A):  # Confirm button
             if self.current_row < len(self.apps):
-                self.apps[self.current_row].execute()
-                
+                self.launch_request = self.current_row
+                self._run_apps(self._snapshot())
+                return
+
+        if self.transition is not None:
+            return
         axis0, axis1 = self.get_vector()
-        if axis0 < -0.5:  # Left
-            self.target_row = self.current_row - 1
-            self.direction = -1
-        elif axis0 > 0.5:  # Right
-            self.target_row = self.current_row + 1
-            self.direction = 1
+        if axis0 < -0.5 or axis0 > 0.5:
+            outgoing = self._snapshot()
+            step = 1 if axis0 > 0.5 else -1
+            self.current_row = (self.current_row + step) % len(self.apps)
+            # Right brings in the next icon from the right, pushing the current one out to the left
+            self.start_transition(outgoing, "slide_left" if step == 1 else "slide_right", self.switch_time)
 
-        self.target_row = (self.target_row + len(self.apps)) % len(self.apps)
+    def _run_apps(self, outgoing: bytes) -> None:
+        # An app left for another by a switch request hands over directly, without showing the menu in between
+        while self.launch_request is not None:
+            self.current_row = self.launch_request
+            self.launch_request = None
+            app = self.apps[self.current_row]
+            app.start_transition(outgoing, self.LAUNCH_TRANSITION, self.TRANSITION_TIME)
+            app.execute()
+            # The app's last frame is still in the framebuffer
+            outgoing = bytes(self.matrix.buffer)
+        self.start_transition(outgoing, self.RETURN_TRANSITION, self.TRANSITION_TIME)
 
-        if self.current_row != self.target_row:
-            self.animation_progress += delta_time / self.switch_time
-            if self.animation_progress >= 1:
-                self.animation_progress = 0
-                self.current_row = self.target_row
+    def _snapshot(self) -> bytes:
+        self.render()
+        return bytes(self.matrix.buffer)
 
     def render(self) -> None:
         self.matrix.clear()
-        old_icon = self.apps[self.current_row].ICON
-        new_icon = self.apps[self.target_row].ICON
-        icon_width = len(old_icon[0])
-        icon_height = len(old_icon)
-        x_offset = (self.matrix.width - icon_width) // 2
-        y_offset = (self.matrix.height - icon_height) // 2
-
-        if self.current_row != self.target_row:
-            offset = int(self.animation_progress * self.matrix.width)
-            if self.direction == 1:  # Right
-                self.matrix.draw_sprite(
-                    x_offset - offset,
-                    y_offset,
-                    [
-                        [
-                            (255, 255, 255) if pixel == "#" else (0, 0, 0)
-                            for pixel in row
-                        ]
-                        for row in old_icon
-                    ],
-                )
-                self.matrix.draw_sprite(
-                    x_offset + self.matrix.width - offset,
-                    y_offset,
-                    [
-                        [
-                            (255, 255, 255) if pixel == "#" else (0, 0, 0)
-                            for pixel in row
-                        ]
-                        for row in new_icon
-                    ],
-                )
-            else:  # Left
-                self.matrix.draw_sprite(
-                    x_offset + offset,
-                    y_offset,
-                    [
-                        [
-                            (255, 255, 255) if pixel == "#" else (0, 0, 0)
-                            for pixel in row
-                        ]
-                        for row in old_icon
-                    ],
-                )
-                self.matrix.draw_sprite(
-                    x_offset - self.matrix.width + offset,
-                    y_offset,
-                    [
-                        [
-                            (255, 255, 255) if pixel == "#" else (0, 0, 0)
-                            for pixel in row
-                        ]
-                        for row in new_icon
-                    ],
-                )
-        else:
-            self.matrix.draw_sprite(
-                x_offset,
-                y_offset,
-                [
-                    [(255, 255, 255) if pixel == "#" else (0, 0, 0) for pixel in row]
-                    for row in old_icon
-                ],
-            )
+        icon = self.apps[self.current_row].ICON
+        x_offset = (self.matrix.width - len(icon[0])) // 2
+        y_offset = (self.matrix.height - len(icon)) // 2
+        self.matrix.draw_pattern(x_offset, y_offset, icon, colors.WHITE)
@@ -0,0 +1,202 @@
+import logging
+import socket
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from log_pipeline import RateLimiter
+from .base import BaseApp, GamepadButtons
+
+E131_PORT = 5568
+ARTNET_PORT = 6454
+DDP_PORT = 4048
+
+CHANNELS_PER_UNIVERSE = 510  # 170 RGB pixels per DMX universe
+
+E131_ACN_ID = b"ASC-E1.17\x00\x00\x00"
+E131_VECTOR_ROOT_DATA = 0x00000004
+E131_VECTOR_ROOT_EXTENDED = 0x00000008
+E131_VECTOR_EXTENDED_SYNC = 0x00000001
+E131_DATA_OFFSET = 126
+
+_socket_error_log = RateLimiter(5.0)
+
+ARTNET_ID = b"Art-Net\x00"
+ARTNET_OP_DMX = 0x5000
+ARTNET_OP_SYNC = 0x5200
+ARTNET_DATA_OFFSET = 18
+ARTNET_SYNC_TIMEOUT = 4.0  # Art-Net falls back to unsynced output after 4s without ArtSync
+
+DDP_VERSION_MASK = 0xC0
+DDP_VERSION_1 = 0x40
+DDP_FLAG_TIMECODE = 0x10
+DDP_FLAG_QUERY = 0x02
+DDP_FLAG_PUSH = 0x01
+DDP_HEADER_SIZE = 10
+
+
+def build_universe_table(first_universe: int, frame_size: int) -> Dict[int, Tuple[int, int]]:
+    """Map each universe covering the frame to its (byte offset, byte count)."""
+    table = {}
+    for index, offset in enumerate(range(0, frame_size, CHANNELS_PER_UNIVERSE)):
+        table[first_universe + index] = (offset, min(CHANNELS_PER_UNIVERSE, frame_size - offset))
+    return table
+
+
+class PixelReceiverApp(BaseApp):
+    """Displays pixel data streamed over E1.31 (sACN), Art-Net or DDP."""
+
+    ICON = ["#     #", " #   # ", "  # #  ", "   #   ", "   #   ", "   #   ", "  ###  "]
+
+    def __init__(
+        self,
+        matrix,
+        target_fps=30,
+        clear_before_render=False,
+        host="0.0.0.0",
+        e131_universe=1,
+        artnet_universe=0,
+    ) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.host = host
+        # Packets land in a back buffer, presented in one copy on sync/push
+        self.frame = bytearray(len(matrix.buffer))
+        self.packet = bytearray(2048)
+        self.packet_view = memoryview(self.packet)
+        self.e131_universes = build_universe_table(e131_universe, len(self.frame))
+        self.artnet_universes = build_universe_table(artnet_universe, len(self.frame))
+        self.sockets: List[Tuple[socket.socket, object]] = []
+
+    def execute(self) -> None:
+        try:
+            super().execute()
+        finally:
+            self._close_sockets()
+
+    def reset(self) -> None:
+        self.frame[:] = bytes(len(self.frame))
+        self.matrix.clear()
+        self.dirty = False
+        self.last_artnet_sync = 0.0
+        self.packets_received = 0
+        self._close_sockets()
+        self._open_socket(E131_PORT, self._handle_e131, multicast=True)
+        self._open_socket(ARTNET_PORT, self._handle_artnet)
+        self._open_socket(DDP_PORT, self._handle_ddp)
+
+    def _open_socket(self, port: int, handler, multicast: bool = False) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((self.host, port))
+        except OSError as e:
+            logging.error(f"Pixel receiver cannot listen on UDP {port}: {e}")
+            sock.close()
+            return
+        sock.setblocking(False)
+        if multicast:
+            # sACN senders usually multicast universe N to 239.255.N_hi.N_lo
+            for universe in self.e131_universes:
+                group = socket.inet_aton(f"239.255.{universe >> 8}.{universe & 0xFF}")
+                try:
+                    sock.setsockopt(
+                        socket.IPPROTO_IP,
+                        socket.IP_ADD_MEMBERSHIP,
+                        group + socket.inet_aton("0.0.0.0"),
+                    )
+                except OSError:
+                    logging.debug(f"Cannot join sACN multicast group of universe {universe}")
+        self.sockets.append((sock, handler))
+
+    def _close_sockets(self) -> None:
+        for sock, _ in self.sockets:
+            sock.close()
+        self.sockets = []
+
+    def update(self, delta_time: float) -> None:
+        if self.is_pressed(GamepadButtons.BACK):
+            self.keep_running = False
+            return
+
+        for sock, handler in self.sockets:
+            while True:
+                try:
+                    size = sock.recv_into(self.packet)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    _socket_error_log.log(logging.DEBUG, "Pixel receiver socket error", exc_info=True)
+                    break
+                self.packets_received += 1
+                handler(size)
+
+        # Senders without sync/push: present whatever arrived this frame
+        if self.dirty:
+            self._present()
+
+    def _present(self) -> None:
+        self.matrix.load(self.frame)
+        self.dirty = False
+
+    def _store(self, offset: int, start: int, size: int) -> None:
+        size = min(size, len(self.frame) - offset)
+        if size > 0:
+            self.frame[offset:offset + size] = self.packet_view[start:start + size]
+
+    def _handle_e131(self, size: int) -> None:
+        packet = self.packet
+        if size < 49 or packet[4:16] != E131_ACN_ID:
+            return
+        (root_vector,) = struct.unpack_from("!I", packet, 18)
+        if root_vector == E131_VECTOR_ROOT_EXTENDED:
+            (framing_vector,) = struct.unpack_from("!I", packet, 40)
+            if framing_vector == E131_VECTOR_EXTENDED_SYNC:
+                self._present()
+            return
+        if root_vector != E131_VECTOR_ROOT_DATA or size <= E131_DATA_OFFSET:
+            return
+        if packet[125] != 0:  # Only the DMX null start code carries levels
+            return
+        sync_address, _, _, universe = struct.unpack_from("!HBBH", packet, 109)
+        target = self.e131_universes.get(universe)
+        if target is None:
+            return
+        (count,) = struct.unpack_from("!H", packet, 123)
+        offset, limit = target
+        self._store(offset, E131_DATA_OFFSET, min(count - 1, limit, size - E131_DATA_OFFSET))
+        if sync_address == 0:
+            self.dirty = True
+
+    def _handle_artnet(self, size: int) -> None:
+        packet = self.packet
+        if size < 10 or packet[0:8] != ARTNET_ID:
+            return
+        (opcode,) = struct.unpack_from("<H", packet, 8)
+        if opcode == ARTNET_OP_SYNC:
+            self.last_artnet_sync = time.monotonic()
+            self._present()
+            return
+        if opcode != ARTNET_OP_DMX or size <= ARTNET_DATA_OFFSET:
+            return
+        universe = packet[14] | (packet[15] << 8)
+        target = self.artnet_universes.get(universe)
+        if target is None:
+            return
+        (length,) = struct.unpack_from("!H", packet, 16)
+        offset, limit = target
+        self._store(offset, ARTNET_DATA_OFFSET, min(length, limit, size - ARTNET_DATA_OFFSET))
+        if time.monotonic() - self.last_artnet_sync > ARTNET_SYNC_TIMEOUT:
+            self.dirty = True
+
+    def _handle_ddp(self, size: int) -> None:
+        packet = self.packet
+        if size < DDP_HEADER_SIZE:
+            return
+        flags = packet[0]
+        if flags & DDP_VERSION_MASK != DDP_VERSION_1 or flags & DDP_FLAG_QUERY:
+            return
+        start = DDP_HEADER_SIZE + (4 if flags & DDP_FLAG_TIMECODE else 0)
+        offset, length = struct.unpack_from("!IH", packet, 4)
+        self._store(offset, start, min(length, size - start))
+        if flags & DDP_FLAG_PUSH:
+            self._present()
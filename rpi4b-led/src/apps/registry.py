@@ -0,0 +1,98 @@
+import ast
+import importlib
+import logging
+import os
+from typing import Dict, List, Optional
+
+from led_matrix import LEDMatrix
+from .base import BaseApp
+
+APPS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class AppSpec:
+    """What the menu needs to know about an app before its module is imported."""
+
+    def __init__(self, name: str, module: str, icon: List[str]) -> None:
+        self.name = name
+        self.module = module
+        self.icon = icon
+
+    def load(self) -> type:
+        return getattr(importlib.import_module(self.module), self.name)
+
+    def __repr__(self) -> str:
+        return f"AppSpec({self.name!r}, {self.module!r})"
+
+
+def _literal_icon(node: ast.ClassDef) -> Optional[List[str]]:
+    for statement in node.body:
+        if isinstance(statement, ast.Assign):
+            targets = statement.targets
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            targets = [statement.target]
+        else:
+            continue
+        if any(isinstance(t, ast.Name) and t.id == "ICON" for t in targets):
+            try:
+                icon = ast.literal_eval(statement.value)
+            except ValueError:
+                return None
+            return icon if icon and all(isinstance(row, str) for row in icon) else None
+    return None
+
+
+def discover_apps(apps_dir: str = APPS_DIR) -> Dict[str, AppSpec]:
+    """
+    Find every app class with a literal ICON by parsing the app modules instead
+    of importing them, so the menu can draw without paying for app imports.
+    """
+    specs = {}
+    for filename in sorted(os.listdir(apps_dir)):
+        if not filename.endswith(".py") or filename.startswith("_"):
+            continue
+        path = os.path.join(apps_dir, filename)
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                tree = ast.parse(f.read(), filename=path)
+            except SyntaxError:
+                logging.error(f"Skipping app module {filename}", exc_info=True)
+                continue
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            icon = _literal_icon(node)
+            if icon is not None:
+                specs[node.name] = AppSpec(node.name, f"apps.{filename[:-3]}", icon)
+    return specs
+
+
+class LazyApp(BaseApp):
+    """Menu entry that imports and constructs its app on first launch."""
+
+    def __init__(self, spec: AppSpec, matrix: LEDMatrix, **app_kwargs) -> None:
+        super().__init__(
+            matrix,
+            target_fps=app_kwargs.get("target_fps", 30),
+            clear_before_render=app_kwargs.get("clear_before_render", True),
+        )
+        self.spec = spec
+        self.ICON = spec.icon
+        self.app_kwargs = app_kwargs
+        self._instance: Optional[BaseApp] = None
+
+    def instance(self) -> BaseApp:
+        if self._instance is None:
+            app_class = self.spec.load()
+            self._instance = app_class(self.matrix, **self.app_kwargs)
+            logging.info(f"Loaded {self.spec.name} from {self.spec.module}")
+        return self._instance
+
+    def info(self) -> str:
+        return self.spec.name
+
+    def start_transition(self, outgoing, name: str = "dissolve", duration: float = 0.4) -> None:
+        self.instance().start_transition(outgoing, name, duration)
+
+    def execute(self) -> None:
+        self.instance().execute()
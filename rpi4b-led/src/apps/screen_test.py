@@ -1,35 +1,11 @@
 import time
+import colors
+import color_tables
 from led_matrix import LEDMatrix
-from .base import BaseApp, GamepadButtons, VfxUtils
-from typing import List, Tuple
+from .base import BaseApp, GamepadButtons
 import math
-import random
+import numpy as np
 
-def color_temperature_to_rgb(kelvin: int) -> Tuple[int, int, int]:
-    # Convert color temperature in Kelvin to RGB
-    temp = kelvin / 100.0
-    if temp <= 66:
-        red = 255
-        green = temp
-        green = 99.4708025861 * math.log(green) - 161.1195681661
-        if temp <= 19:
-            blue = 0
-        else:
-            blue = temp - 10
-            blue = 138.5177312231 * math.log(blue) - 305.0447927307
-    else:
-        red = temp - 60
-        red = 329.698727446 * (red ** -0.1332047592)
-        green = temp - 60
-        green = 288.1221695283 * (green ** -0.0755148492)
-        blue = 255
-
-    return (
-        max(0, min(255, int(red))),
-        max(0, min(255, int(green))),
-        max(0, min(255, int(blue))),
-    )
-    
 class ScreenTestApp(BaseApp):
     ICON = [" ######", " #    #", " #    #", " #    #", " #    #", " #    #", " ######"]
     EFFECT_DURATION = 3600 * 24 * 365 * 100  # 100 years
@@ -39,10 +15,18 @@ class ScreenTestApp(BaseApp):
         self.effect_index = 0
         self.effects = [self.breathing_wall, self.white_screen, self.color_wipe, self.rainbow, self.rainbow_cycle]
         self.effect_timer = 0
-        self.breathing_frequencies = [
-            [random.uniform(0.05, 0.15) for _ in range(self.matrix.width)]
-            for _ in range(self.matrix.height)
-        ]
+        h, w = self.matrix.height, self.matrix.width
+        y, x = np.mgrid[0:h, 0:w]
+        # Wheel positions before the animation offset, the effects only add the offset and look colors up
+        self.diagonal = x + y
+        self.columns = x * 256 // w
+        self.index = np.empty((h, w), dtype=np.intp)
+        self.breathing_frequencies = np.random.uniform(0.05, 0.15, (h, w)).astype(np.float32)
+        self.row_brightness = ((y + 1) / h).astype(np.float32)  # Decreasing from bottom to top
+        # The 3000K white at 256 brightness levels
+        levels = np.linspace(0, 1, 256, dtype=np.float32)[:, None]
+        self.breathing_colors = (levels * colors.unpack(color_tables.color_temperature(3000))).astype(np.uint8)
+        self.brightness = np.empty((h, w), dtype=np.float32)
 
     def update(self, delta_time: float) -> None:
         
@@ -63,46 +47,42 @@ class ScreenTestApp(BaseApp):
         self.matrix.show()
 
     def white_screen(self) -> None:
-        for y in range(self.matrix.height):
-            for x in range(self.matrix.width):
-                self.matrix.set_pixel(x, y, (255, 255, 255))
+        self.matrix.array().fill(255)
 
     def color_wipe(self, wait_ms=10) -> None:
         w, h = self.matrix.width, self.matrix.height
         count = int(self.effect_timer * 1000 / wait_ms) % (w * h)
-        for y in range(self.matrix.height):
-            for x in range(self.matrix.width):
-                idx = y * w + x
-                if idx < count:
-                    self.matrix.set_pixel(x, y, VfxUtils.wheel((x + y + count) & 255))
+        np.add(self.diagonal, count, out=self.index)
+        self.index &= 255
+        # Pixels in row-major order up to `count`, the rest stay cleared
+        np.take(
+            color_tables.wheel_array(),
+            self.index.reshape(-1)[:count],
+            axis=0,
+            out=self.matrix.array().reshape(-1, 3)[:count],
+            mode="clip",
+        )
 
     def rainbow(self, wait_ms=10) -> None:
         count = int(self.effect_timer * 1000 / wait_ms)
-        for y in range(self.matrix.height):
-            for x in range(self.matrix.width):
-                self.matrix.set_pixel(x, y, VfxUtils.wheel((x + y + count) & 255))
+        np.add(self.diagonal, count, out=self.index)
+        self.index &= 255
+        np.take(color_tables.wheel_array(), self.index, axis=0, out=self.matrix.array(), mode="clip")
 
     def rainbow_cycle(self, wait_ms=10) -> None:
         count = int(self.effect_timer * 1000 / wait_ms)
-        for y in range(self.matrix.height):
-            for x in range(self.matrix.width):
-                self.matrix.set_pixel(
-                    x,
-                    y,
-                    VfxUtils.wheel((int(x * 256 / self.matrix.width) + count) & 255),
-                )
-                
+        np.add(self.columns, count, out=self.index)
+        self.index &= 255
+        np.take(color_tables.wheel_array(), self.index, axis=0, out=self.matrix.array(), mode="clip")
+
     def breathing_wall(self, wait_ms=10) -> None:
-        base_color = color_temperature_to_rgb(3000)
-        for y in range(self.matrix.height):
-            for x in range(self.matrix.width):
-                # Calculate brightness for each row, decreasing from bottom to top
-                brightness = (y + 1) / self.matrix.height
-                # Apply a sine wave for breathing effect with added randomness
-                frequency = self.breathing_frequencies[y][x]
-                breath = (math.sin(self.effect_timer * 2 * math.pi * frequency) + 1) / 2
-                breath = 0.5 + 0.5 * breath  # Ensure it doesn't go completely dark
-                final_brightness = brightness * breath
-                # Set the pixel color with the calculated brightness
-                final_color = tuple(int(c * final_brightness) for c in base_color)
-                self.matrix.set_pixel(x, y, final_color)
\ No newline at end of file
+        # A sine wave per pixel with its own frequency for the breathing effect
+        np.multiply(self.breathing_frequencies, self.effect_timer * 2 * math.pi, out=self.brightness)
+        np.sin(self.brightness, out=self.brightness)
+        # 0.5-1 so that it doesn't go completely dark, scaled by the row brightness
+        self.brightness *= 0.25
+        self.brightness += 0.75
+        self.brightness *= self.row_brightness
+        self.brightness *= 255
+        np.copyto(self.index, self.brightness, casting="unsafe")
+        np.take(self.breathing_colors, self.index, axis=0, out=self.matrix.array(), mode="clip")
@@ -0,0 +1,57 @@
+import logging
+
+from led_matrix import LEDMatrix
+from particles import ParticleSystem, firework, rain, snow
+from .base import BaseApp, GamepadButtons
+
+
+class SkyApp(BaseApp):
+    """Fireworks, rain and snow from the particle engine, A and B switch between them."""
+
+    ICON = ["   #   ", " # # # ", "  ###  ", "### ###", "  ###  ", " # # # ", "   #   "]
+    FIXED_TIMESTEP = 1 / 60
+    SCENES = ["fireworks", "rain", "snow"]
+
+    def __init__(self, matrix: LEDMatrix, target_fps=30, clear_before_render=True, capacity: int = 4096) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.capacity = capacity
+
+    def reset(self) -> None:
+        self.scene_index = 0
+        self._start_scene()
+
+    def _start_scene(self) -> None:
+        width, height = self.matrix.width, self.matrix.height
+        scene = self.SCENES[self.scene_index]
+        if scene == "fireworks":
+            self.particles = ParticleSystem(self.capacity, gravity=(0.0, height * 0.8), drag=1.2)
+            self.emitter = None
+            self.launch_timer = 0.0
+        elif scene == "rain":
+            self.particles = ParticleSystem(self.capacity, gravity=(0.0, height * 2.0))
+            self.emitter = rain(self.particles, width, height)
+        else:
+            self.particles = ParticleSystem(self.capacity, fade=False)
+            self.emitter = snow(self.particles, width, height)
+        logging.info(f"Sky: {scene}")
+
+    def update(self, delta_time: float) -> None:
+        if self.is_pressed(GamepadButtons.BACK):
+            self.keep_running = False
+            return
+        if self.is_pressed(GamepadButtons.A) or self.is_pressed(GamepadButtons.B):
+            step = 1 if self.is_pressed(GamepadButtons.A) else -1
+            self.scene_index = (self.scene_index + step) % len(self.SCENES)
+            self._start_scene()
+
+        if self.emitter is not None:
+            self.emitter.update(delta_time)
+        else:
+            self.launch_timer -= delta_time
+            if self.launch_timer <= 0:
+                firework(self.particles, self.matrix.width, self.matrix.height)
+                self.launch_timer = self.particles.rng.uniform(0.4, 1.2)
+        self.particles.update(delta_time)
+
+    def render(self) -> None:
+        self.particles.render(self.matrix)
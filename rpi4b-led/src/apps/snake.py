@@ -1,62 +1,221 @@
 import random
-from typing import List, Tuple
+from array import array
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+import numpy as np
+import colors
 from led_matrix import LEDMatrix
+from particles import ParticleSystem
 from .base import BaseApp, GamepadButtons, FONT, VfxUtils
 import math
 
+# Occupancy grid cell values, the body of player i is stored as SNAKE + i
+EMPTY = 0
+FOOD = 1
+SNAKE = 2
+
+PLAYER_COLORS = [colors.GREEN, 0x0080FF, 0xFFA500, 0xFF00FF]
+
+
+class FreeCells:
+    """
+    The empty cells of the board as a dense list plus each cell's position in it,
+    so adding, removing (swap with the last entry) and random choice are all O(1).
+    """
+
+    def __init__(self, size: int) -> None:
+        # Arrays of machine ints rather than lists, so a new board is two blocks and not an object per cell
+        self.cells = array("i", range(size))
+        self.positions = array("i", range(size))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def add(self, cell: int) -> None:
+        self.positions[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def remove(self, cell: int) -> None:
+        index = self.positions[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[index] = last
+            self.positions[last] = index
+        self.positions[cell] = -1
+
+    def choice(self) -> Optional[int]:
+        return random.choice(self.cells) if self.cells else None
+
+
+class Snake:
+    def __init__(
+        self, player: int, body: List[Tuple[int, int]], direction: Tuple[int, int], device_index: int
+    ) -> None:
+        self.player = player
+        self.body: Deque[Tuple[int, int]] = deque(body)
+        self.direction = direction
+        self.color = PLAYER_COLORS[player]
+        self.device_index = device_index  # Input slot steering this snake
+        self.score = 0
+        self.speed = 1
+        self.speed_multiplier = 1
+        self.move_timer = 0
+        self.alive = True
+
 
 class SnakeApp(BaseApp):
+    """
+    Snake for one player, or for one snake per connected gamepad (up to four).
+    All snakes and the food share one occupancy grid, so every collision check is
+    a single cell lookup however many snakes there are and however long they get.
+    """
+
     ICON = [" ##### ", "     # ", " ### # ", " # # # ", " # # # ", " #   # ", " ##### "]
+    FIXED_TIMESTEP = 1 / 60
 
     def reset(self) -> None:
+        self.particles = ParticleSystem(capacity=1024, drag=2.0)  # Crashed snakes burst into these
         self.reset_game_state()
-        
+
+    def _start_positions(self, count: int) -> List[Tuple[List[Tuple[int, int]], Tuple[int, int]]]:
+        if count == 1:
+            return [([(5, 5), (4, 5), (3, 5)], (1, 0))]
+        width, height = self.matrix.width, self.matrix.height
+        starts = []
+        for i in range(count):
+            y = (i + 1) * height // (count + 1)
+            if i % 2 == 0:  # Left side heading right
+                starts.append(([(3, y), (2, y), (1, y)], (1, 0)))
+            else:  # Right side heading left
+                starts.append(([(width - 4, y), (width - 3, y), (width - 2, y)], (-1, 0)))
+        return starts
+
     def reset_game_state(self) -> None:
-        self.snake: List[Tuple[int, int]] = [(5, 5), (4, 5), (3, 5)]
-        self.direction = (1, 0)  # Initial direction: right
+        width = self.matrix.width
+        self.grid = bytearray(width * self.matrix.height)  # One cell value per pixel, row by row
+        self.free_cells = FreeCells(len(self.grid))
+
+        # One snake per occupied input slot, the first available device steers a lone snake
+        slots = [i for i, device in enumerate(self._input_devices) if device is not None]
+        if len(slots) < 2:
+            slots = [-1]
+        self.snakes: List[Snake] = []
+        for player, (slot, (body, direction)) in enumerate(zip(slots, self._start_positions(len(slots)))):
+            snake = Snake(player, body, direction, slot)
+            for x, y in body:
+                self._occupy(x, y, SNAKE + player)
+            self.snakes.append(snake)
+        self.winner: Optional[Snake] = None
+
         self.food: List[Tuple[int, int]] = []
-        self.score = 0
         self.food_timer = 0
         self.food_interval = random.uniform(3, 5)  # Generate food every 3 to 5 seconds
-        self.speed = 1
         self.max_speed = 3  # Maximum speed multiplier
-        self.speed_multiplier = 1
-        self.move_timer = 0
-        self.move_interval = 0.5  # Snake moves every 0.5 seconds
+        self.move_interval = 0.5  # Snakes move every 0.5 seconds
         self.game_over = False  # Game over flag
         self.show_score_timer = 0
+        self.particles.clear()
 
-        self.food.append(self._generate_food())
-
-    def _generate_food(self) -> Tuple[int, int]:
-        while True:
-            food = (
-                random.randint(0, self.matrix.width - 1),
-                random.randint(0, self.matrix.height - 1),
-            )
-            if food not in self.snake and food not in self.food:
-                return food
-    
-    def update(self, delta_time: float) -> None:
-        if self.is_holding(GamepadButtons.A):
-            self.speed_multiplier = 2
+        self._spawn_food()
+
+    @property
+    def score(self) -> int:
+        return max(snake.score for snake in self.snakes)
+
+    def _occupy(self, x: int, y: int, value: int) -> None:
+        cell = y * self.matrix.width + x
+        if self.grid[cell] == EMPTY:
+            self.free_cells.remove(cell)
+        self.grid[cell] = value
+
+    def _vacate(self, x: int, y: int) -> None:
+        cell = y * self.matrix.width + x
+        if self.grid[cell] != EMPTY:
+            self.grid[cell] = EMPTY
+            self.free_cells.add(cell)
+
+    def _spawn_food(self) -> None:
+        cell = self.free_cells.choice()
+        if cell is None:  # The snakes fill the board
+            return
+        food = (cell % self.matrix.width, cell // self.matrix.width)
+        self.food.append(food)
+        self._occupy(food[0], food[1], FOOD)
+
+    def _steer(self, snake: Snake) -> None:
+        if self.is_holding(GamepadButtons.A, snake.device_index):
+            snake.speed_multiplier = 2
         else:
-            self.speed_multiplier = 1
+            snake.speed_multiplier = 1
+
+        axis_0, axis_1 = self.get_vector(device_index=snake.device_index)
+        if axis_0 < -0.5 and snake.direction != (1, 0):  # Left
+            snake.direction = (-1, 0)
+        elif axis_0 > 0.5 and snake.direction != (-1, 0):  # Right
+            snake.direction = (1, 0)
+        if axis_1 < -0.5 and snake.direction != (0, 1):  # Up
+            snake.direction = (0, -1)
+        elif axis_1 > 0.5 and snake.direction != (0, -1):  # Down
+            snake.direction = (0, 1)
+
+    def _move_snakes(self, moving: List[Snake]) -> None:
+        width, height = self.matrix.width, self.matrix.height
+        # Resolve every move of this frame against the grid before changing it, so
+        # the outcome does not depend on player order. Tails still count as occupied.
+        heads = {}
+        for snake in moving:
+            x, y = snake.body[0]
+            heads[snake] = (x + snake.direction[0], y + snake.direction[1])
+        targets = {}
+        for head in heads.values():
+            targets[head] = targets.get(head, 0) + 1
+
+        crashed = []
+        for snake, (x, y) in heads.items():
+            if (
+                not (0 <= x < width and 0 <= y < height)
+                or self.grid[y * width + x] >= SNAKE
+                or targets[(x, y)] > 1  # Head-on into the same cell
+            ):
+                crashed.append(snake)
 
-        if self.is_pressed(GamepadButtons.START):
+        for snake in crashed:
+            snake.alive = False
+            del heads[snake]
+            self._explode(snake)
+            for x, y in snake.body:
+                self._vacate(x, y)
+
+        for snake, new_head in heads.items():
+            ate = self.grid[new_head[1] * width + new_head[0]] == FOOD
+            snake.body.appendleft(new_head)
+            self._occupy(new_head[0], new_head[1], SNAKE + snake.player)
+            if ate:
+                self.food.remove(new_head)  # At most three pieces of food
+                snake.score += 1
+                snake.speed = min(
+                    1 + snake.score / 10, self.max_speed
+                )  # Increase speed based on score
+            else:
+                self._vacate(*snake.body.pop())
+
+    def _explode(self, snake: Snake, per_segment: int = 6) -> None:
+        segments = np.repeat(np.array(snake.body, dtype=np.float32) + 0.5, per_segment, axis=0)
+        self.particles.burst(
+            segments[:, 0], segments[:, 1], len(segments), speed=10.0, life=1.2, color=snake.color
+        )
+
+    def update(self, delta_time: float) -> None:
+        self.particles.update(delta_time)
+        devices = {snake.device_index for snake in self.snakes}
+        if any(self.is_pressed(GamepadButtons.START, i) for i in devices):
             self.reset_game_state()
-        elif self.is_pressed(GamepadButtons.BACK):
+        elif any(self.is_pressed(GamepadButtons.BACK, i) for i in devices):
             self.keep_running = False
 
-        axis_0, axis_1 = self.get_vector()
-        if axis_0 < -0.5 and self.direction != (1, 0):  # Left
-            self.direction = (-1, 0)
-        elif axis_0 > 0.5 and self.direction != (-1, 0):  # Right
-            self.direction = (1, 0)
-        if axis_1 < -0.5 and self.direction != (0, 1):  # Up
-            self.direction = (0, -1)
-        elif axis_1 > 0.5 and self.direction != (0, -1):  # Down
-            self.direction = (0, 1)
+        for snake in self.snakes:
+            if snake.alive:
+                self._steer(snake)
 
         if self.game_over:
             self.show_score_timer -= delta_time
@@ -65,67 +224,55 @@ class SnakeApp(BaseApp):
             return
 
         self.food_timer += delta_time
-        self.move_timer += delta_time * self.speed * self.speed_multiplier
-
         if self.food_timer >= self.food_interval and len(self.food) < 3:
             self.food_timer = 0
             self.food_interval = random.uniform(3, 4)  # Reset food interval
-            self.food.append(self._generate_food())
-
-        if self.move_timer >= self.move_interval:
-            self.move_timer = 0
-
-            # Move snake
-            new_head = (
-                self.snake[0][0] + self.direction[0],
-                self.snake[0][1] + self.direction[1],
-            )
-            if new_head in self.snake or not (
-                0 <= new_head[0] < self.matrix.width
-                and 0 <= new_head[1] < self.matrix.height
-            ):
-                self.game_over = True  # Snake collided with itself or the wall
-                self.show_score_timer = 3  # Show score for 3 seconds
-            else:
-                self.snake.insert(0, new_head)
-                if new_head in self.food:
-                    self.food.remove(new_head)
-                    self.score += 1
-                    self.speed = min(
-                        1 + self.score / 10, self.max_speed
-                    )  # Increase speed based on score
-                else:
-                    self.snake.pop()
+            self._spawn_food()
+
+        moving = []
+        for snake in self.snakes:
+            if not snake.alive:
+                continue
+            snake.move_timer += delta_time * snake.speed * snake.speed_multiplier
+            if snake.move_timer >= self.move_interval:
+                snake.move_timer = 0
+                moving.append(snake)
+        if moving:
+            self._move_snakes(moving)
+
+        alive = [snake for snake in self.snakes if snake.alive]
+        if len(alive) < min(2, len(self.snakes)):
+            self.game_over = True  # Every snake but (at most) one crashed
+            self.show_score_timer = 3  # Show score for 3 seconds
+            self.winner = alive[0] if alive else None
 
     def render(self) -> None:
         if self.game_over:
             self._show_score()
+            self.particles.render(self.matrix)
             return
 
-        for segment in self.snake:
-            self.matrix.set_pixel(segment[0], segment[1], (0, 255, 0))  # Green snake
+        for snake in self.snakes:
+            if snake.alive:
+                for x, y in snake.body:
+                    self.matrix.set_pixel(x, y, snake.color)
         for f in self.food:
-            self.matrix.set_pixel(f[0], f[1], (255, 0, 0))  # Red food
+            self.matrix.set_pixel(f[0], f[1], colors.RED)  # Red food
+        self.particles.render(self.matrix)
 
     def _show_score(self) -> None:
-        score_str = f"{self.score}"
+        # Single player and draws show the best score in white, a winner their own score in their color
+        if self.winner is not None and len(self.snakes) > 1:
+            score, base_color = self.winner.score, self.winner.color
+        else:
+            score, base_color = self.score, colors.WHITE
+        score_str = f"{score}"
         x_offset = (self.matrix.width - len(score_str) * 4) // 2
         y_offset = (self.matrix.height - 5) // 2  # Center vertically
         brightness = VfxUtils.breath_curve(
             self.show_score_timer, 3, 2
         )  # Breathing effect
+        color = colors.scale(base_color, brightness)
         for i, char in enumerate(score_str):
             pattern = FONT[char]
-            color = (
-                int(255 * brightness),
-                int(255 * brightness),
-                int(255 * brightness),
-            )
-            self.matrix.draw_sprite(
-                x_offset + i * 4,
-                y_offset,
-                [
-                    [color if pixel == "#" else (0, 0, 0) for pixel in row]
-                    for row in pattern
-                ],
-            )
\ No newline at end of file
+            self.matrix.draw_pattern(x_offset + i * 4, y_offset, pattern, color)
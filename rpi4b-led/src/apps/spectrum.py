@@ -0,0 +1,204 @@
+import logging
+import os
+import stat
+import sys
+import threading
+import time
+import wave
+from typing import BinaryIO, Optional, Tuple
+
+import numpy as np
+
+from led_matrix import LEDMatrix
+from .base import BaseApp, GamepadButtons
+
+# Spectra kept for the render thread, more than it can fall behind between frames
+RING_SLOTS = 8
+
+
+def band_edges(bands: int, block_size: int, sample_rate: int, min_freq: float, max_freq: float) -> np.ndarray:
+    """
+    FFT bin boundaries of `bands` log-spaced bands (bands + 1 values), strictly
+    increasing so that no band is empty even where bins are wider than bands.
+    """
+    freqs = np.geomspace(min_freq, min(max_freq, sample_rate / 2), bands + 1)
+    edges = np.maximum(np.round(freqs * block_size / sample_rate).astype(int), 1)
+    for i in range(1, bands + 1):
+        edges[i] = max(edges[i], edges[i - 1] + 1)
+    return np.minimum(edges, block_size // 2 + 1)
+
+
+class SpectrumApp(BaseApp):
+    """
+    Bar spectrum of a PCM stream: a WAV file (looped), a FIFO such as an ALSA
+    loopback capture piped in, raw PCM on stdin ("-"). A reader thread does the
+    blocking reads and the FFTs and publishes band levels to a ring buffer, the
+    frame loop only draws the latest levels.
+    """
+
+    ICON = ["       ", "     # ", " #   # ", " #  ## ", " ## ## ", "###### ", "#######"]
+
+    def __init__(
+        self,
+        matrix: LEDMatrix,
+        target_fps=30,
+        clear_before_render=False,
+        source: str = "-",
+        sample_rate: int = 44100,
+        channels: int = 2,
+        block_size: int = 1024,
+        min_freq: float = 40,
+        max_freq: float = 16000,
+        dynamic_range: float = 45,
+        fall_speed: float = 2.0,
+        peak_hold: float = 0.5,
+        peak_decay: float = 0.5,
+    ) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.source = source
+        self.sample_rate = sample_rate  # Raw PCM only, WAV files bring their own format
+        self.channels = channels
+        self.block_size = block_size  # Samples per FFT
+        self.min_freq = min_freq
+        self.max_freq = max_freq
+        self.dynamic_range = dynamic_range  # dB between an empty bar and a full one
+        self.fall_speed = fall_speed  # Matrix heights per second the bars fall
+        self.peak_hold = peak_hold  # Seconds a peak marker stays put
+        self.peak_decay = peak_decay  # Matrix heights per second the peak markers fall afterwards
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        height = matrix.height
+        # Bar colors from green at the bottom through yellow to red at the top, one per row
+        top = np.linspace(1, 0, height)[:, None]
+        self.gradient = np.clip(
+            np.hstack([top * 2, (1 - top) * 2, np.zeros_like(top)]) * 255, 0, 255
+        ).astype(np.uint8)
+        self.rows = np.arange(height)[:, None]
+
+    def execute(self) -> None:
+        try:
+            super().execute()
+        finally:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=1)  # A blocked pipe read keeps the daemon thread until data arrives
+
+    def reset(self) -> None:
+        width = self.matrix.width
+        self.ring = np.zeros((RING_SLOTS, width), dtype=np.float32)
+        self.ring_head = 0  # Spectra written so far, the reader thread only ever increments it
+        self.levels = np.zeros(width, dtype=np.float32)
+        self.peaks = np.zeros(width, dtype=np.float32)
+        self.peak_timers = np.zeros(width, dtype=np.float32)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read_loop, args=(self._stop,), name="spectrum", daemon=True)
+        self._thread.start()
+
+    def _open(self) -> Tuple[BinaryIO, int, int, int, bool]:
+        """Return (stream, sample rate, channels, sample width, paced) for the source."""
+        if self.source == "-":
+            return sys.stdin.buffer, self.sample_rate, self.channels, 2, False
+        if self.source.lower().endswith(".wav"):
+            wav = wave.open(self.source, "rb")
+            return wav, wav.getframerate(), wav.getnchannels(), wav.getsampwidth(), True
+        stream = open(self.source, "rb")
+        # Regular files are read at playback speed, pipes and devices block on their own
+        paced = stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+        return stream, self.sample_rate, self.channels, 2, paced
+
+    def _read_loop(self, stop: threading.Event) -> None:
+        try:
+            stream, sample_rate, channels, sample_width, paced = self._open()
+        except (OSError, wave.Error):
+            logging.error(f"Cannot open audio source {self.source}", exc_info=True)
+            return
+        if sample_width not in (1, 2, 4):
+            logging.error(f"Unsupported sample width {sample_width} in {self.source}")
+            return
+        logging.info(f"Spectrum of {self.source}: {sample_rate} Hz, {channels} channels")
+
+        block = self.block_size
+        block_bytes = block * channels * sample_width
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[sample_width]
+        scale = 1 / (1 << (8 * sample_width - 1))
+        window = np.hanning(block).astype(np.float32)
+        edges = band_edges(self.matrix.width, block, sample_rate, self.min_freq, self.max_freq)
+        widths = np.maximum(np.diff(edges), 1).astype(np.float32)
+        first, last = edges[:-1], edges[-1]
+        frame_bytes = channels * sample_width
+        silence = b"\x80" if sample_width == 1 else b"\x00"  # 8 bit PCM is unsigned
+        reference = -np.inf  # Automatic gain, follows the loudest band with a slow release
+        start = time.monotonic()
+        blocks = 0
+        rewound = False
+
+        try:
+            while not stop.is_set():
+                data = stream.readframes(block) if isinstance(stream, wave.Wave_read) else stream.read(block_bytes)
+                data = data[:len(data) - len(data) % frame_bytes]
+                if not data:
+                    if not paced:
+                        break  # The writer closed the pipe
+                    if rewound:
+                        logging.warning(f"No audio in {self.source}")
+                        break
+                    # Loop files
+                    if isinstance(stream, wave.Wave_read):
+                        stream.rewind()
+                    else:
+                        stream.seek(0)
+                    rewound = True
+                    continue
+                rewound = False
+                if len(data) < block_bytes:
+                    # The last block of the stream, played out with silence after it
+                    data = bytes(data) + silence * (block_bytes - len(data))
+
+                samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+                if sample_width == 1:
+                    samples -= 128  # 8 bit PCM is unsigned
+                mono = samples.reshape(-1, channels).mean(axis=1) * scale
+                power = np.abs(np.fft.rfft(mono * window)) ** 2
+                bands = np.add.reduceat(power[:last], np.minimum(first, last - 1)) / widths
+                db = 10 * np.log10(bands + 1e-12)
+                reference = max(float(db.max()), reference - 0.2)
+                levels = np.clip((db - (reference - self.dynamic_range)) / self.dynamic_range, 0, 1)
+
+                self.ring[self.ring_head % RING_SLOTS] = levels
+                self.ring_head += 1
+
+                if paced:
+                    blocks += 1
+                    delay = start + blocks * block / sample_rate - time.monotonic()
+                    if delay > 0:
+                        stop.wait(delay)
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+    def update(self, delta_time: float) -> None:
+        if self.is_pressed(GamepadButtons.BACK):
+            self.keep_running = False
+            return
+        head = self.ring_head
+        latest = self.ring[(head - 1) % RING_SLOTS] if head else 0
+        # Bars jump up at once and fall smoothly
+        self.levels -= self.fall_speed * delta_time
+        np.maximum(self.levels, latest, out=self.levels)
+
+        rising = self.levels >= self.peaks
+        self.peaks[rising] = self.levels[rising]
+        self.peak_timers[rising] = self.peak_hold
+        self.peak_timers -= delta_time
+        self.peaks[self.peak_timers <= 0] -= self.peak_decay * delta_time
+        np.maximum(self.peaks, self.levels, out=self.peaks)
+
+    def render(self) -> None:
+        height = self.matrix.height
+        view = self.matrix.array()
+        bars = self.rows >= height - np.round(self.levels * height)
+        np.multiply(bars[:, :, None], self.gradient[:, None, :], out=view)
+        peak_rows = np.clip(height - np.round(self.peaks * height), 0, height - 1).astype(int)
+        shown = self.peaks > 0
+        view[peak_rows[shown], np.nonzero(shown)[0]] = 255
@@ -1,22 +1,27 @@
+import logging
 import random
 import math
 from typing import List, Tuple
+import numpy as np
+import colors
 from led_matrix import LEDMatrix
+from particles import ParticleSystem
 from .base import BaseApp, GamepadButtons, FONT, VfxUtils
+from .tetris_ai import TetrisAutoplayer
 from input_manager import InputManager
 
 # Define the shapes and colors of the Tetris pieces
 TETROMINOS = {
     "I": (
         [[0, 0, 0, 0], [1, 1, 1, 1], [0, 0, 0, 0], [0, 0, 0, 0]],
-        (0, 255, 255),
+        0x00FFFF,
     ),  # Cyan
-    "O": ([[1, 1], [1, 1]], (255, 255, 0)),  # Yellow
-    "T": ([[0, 1, 0], [1, 1, 1], [0, 0, 0]], (128, 0, 128)),  # Purple
-    "S": ([[0, 1, 1], [1, 1, 0], [0, 0, 0]], (0, 255, 0)),  # Green
-    "Z": ([[1, 1, 0], [0, 1, 1], [0, 0, 0]], (255, 0, 0)),  # Red
-    "J": ([[1, 0, 0], [1, 1, 1], [0, 0, 0]], (0, 0, 255)),  # Blue
-    "L": ([[0, 0, 1], [1, 1, 1], [0, 0, 0]], (255, 165, 0)),  # Orange
+    "O": ([[1, 1], [1, 1]], 0xFFFF00),  # Yellow
+    "T": ([[0, 1, 0], [1, 1, 1], [0, 0, 0]], 0x800080),  # Purple
+    "S": ([[0, 1, 1], [1, 1, 0], [0, 0, 0]], 0x00FF00),  # Green
+    "Z": ([[1, 1, 0], [0, 1, 1], [0, 0, 0]], 0xFF0000),  # Red
+    "J": ([[1, 0, 0], [1, 1, 1], [0, 0, 0]], 0x0000FF),  # Blue
+    "L": ([[0, 0, 1], [1, 1, 1], [0, 0, 0]], 0xFFA500),  # Orange
 }
 
 # Wallkick offsets for different rotations (SRS)
@@ -43,86 +48,157 @@ WALLKICK_OFFSETS = {
     },
 }
 
+
+def _rotate_matrix(piece: List[List[int]], clockwise: bool = True) -> List[List[int]]:
+    size = len(piece)
+    new_piece = [[0] * size for _ in range(size)]
+    for y in range(size):
+        for x in range(size):
+            if piece[y][x]:
+                if clockwise:
+                    new_x = size - 1 - y
+                    new_y = x
+                else:
+                    new_x = y
+                    new_y = size - 1 - x
+                new_piece[new_y][new_x] = piece[y][x]
+    return new_piece
+
+
+def _build_rotations(piece: List[List[int]]) -> List[List[List[int]]]:
+    rotations = [piece]
+    for _ in range(3):
+        rotations.append(_rotate_matrix(rotations[-1]))
+    return rotations
+
+
+# The board is stored as one int per line (a column x of the matrix, pieces fall
+# towards +x) with bit y set for every occupied cell. Each rotation of each piece
+# is precomputed as one bitmask per piece column, indexed [name][rotation][column].
+PIECE_SIZES = {name: len(shape) for name, (shape, _) in TETROMINOS.items()}
+PIECE_CELLS = {
+    name: [
+        tuple((x, y) for y, row in enumerate(rotation) for x, cell in enumerate(row) if cell)
+        for rotation in _build_rotations(shape)
+    ]
+    for name, (shape, _) in TETROMINOS.items()
+}
+PIECE_MASKS = {
+    name: [
+        tuple(
+            sum(1 << y for y in range(len(rotation)) if rotation[y][x])
+            for x in range(len(rotation))
+        )
+        for rotation in _build_rotations(shape)
+    ]
+    for name, (shape, _) in TETROMINOS.items()
+}
+
 class TetrisApp(BaseApp):
     ICON = [" ###   ", " # #   ", " # ####", " #    #", " #### #", "    # #", "    ###"]
+    # Movement and soft drop advance per update, so tie them to time rather than to rendered frames
+    FIXED_TIMESTEP = 1 / 30
+
+    def __init__(
+        self,
+        matrix: LEDMatrix,
+        target_fps=30,
+        clear_before_render=True,
+        demo_idle_timeout: float = 20.0,
+        demo_search_budget: float = 0.004,
+    ) -> None:
+        super().__init__(matrix, target_fps=target_fps, clear_before_render=clear_before_render)
+        self.demo_idle_timeout = demo_idle_timeout  # Seconds without input before the autoplayer takes over
+        self.demo_search_budget = demo_search_budget  # Seconds of placement search per frame
+        self.autoplayer = TetrisAutoplayer(PIECE_MASKS, matrix.width, matrix.height)
+        # Sparks of cleared lines, falling the way the pieces do (towards larger x)
+        self.particles = ParticleSystem(capacity=1024, gravity=(40.0, 0.0), drag=1.5)
 
     def reset(self) -> None:
         self.reset_game_state()
+        self.demo = False
+        self.idle_time = 0
 
     def reset_game_state(self) -> None:
-        self.board = [[0] * self.matrix.height for _ in range(self.matrix.width)]
-        self.current_piece, self.current_color = self._new_piece()
-        self.next_piece, self.next_color = self._new_piece()
-        self.piece_y = self.matrix.height // 2 - len(self.current_piece) // 2
+        self.full_line = (1 << self.matrix.height) - 1
+        self.lines = [0] * self.matrix.width  # Occupancy bitboard, one int per line
+        self.board = [[0] * self.matrix.height for _ in range(self.matrix.width)]  # Packed cell colors
+        self.piece_name, self.current_color = self._new_piece()
+        self.next_piece_name, self.next_color = self._new_piece()
+        self.rotation = 0  # Index into the precomputed rotations
+        self.piece_y = self.matrix.height // 2 - PIECE_SIZES[self.piece_name] // 2
         self.piece_x = 0
         self.score = 0
         self.drop_timer = 0
         self.drop_interval = 1  # Initial drop interval in seconds
         self.game_over = False
+        self.particles.clear()
         self.show_score_timer = 0
         self.clear_lines_animation_timer = 0
         self.lines_to_clear = []
-        self.rotation_state = 0
+        self.rotation_state = 0  # SRS state selecting the wall kicks
         self.move_direction = 0  # 0: no movement, -1: up, 1: down
         self.offset_y = 0
         self.hard_drop_ready = True
+        self.piece_count = 1  # Lets the autoplayer notice a new piece
+        self.planned_piece = 0
 
-    def _new_piece(self) -> Tuple[List[List[int]], Tuple[int, int, int]]:
-        return random.choice(list(TETROMINOS.values()))
-
-    def _rotate_piece(
-        self, piece: List[List[int]], clockwise: bool = True
-    ) -> List[List[int]]:
-        size = len(piece)
-        new_piece = [[0] * size for _ in range(size)]
-        for y in range(size):
-            for x in range(size):
-                if piece[y][x]:
-                    if clockwise:
-                        new_x = size - 1 - y
-                        new_y = x
-                    else:
-                        new_x = y
-                        new_y = size - 1 - x
-                    new_piece[new_y][new_x] = piece[y][x]
-        return new_piece
-
-    def _valid_position(
-        self, piece: List[List[int]], offset_x: int, offset_y: int
-    ) -> bool:
-        for y, row in enumerate(piece):
-            for x, cell in enumerate(row):
-                if cell:
-                    new_x = x + offset_x
-                    new_y = y + offset_y
-                    if (
-                        new_x < 0
-                        or new_x >= self.matrix.width
-                        or new_y < 0
-                        or new_y >= self.matrix.height
-                        or (new_x >= 0 and self.board[new_x][new_y])
-                    ):
-                        return False
+    @property
+    def current_piece(self) -> Tuple[int, ...]:
+        return PIECE_MASKS[self.piece_name][self.rotation]
+
+    def _new_piece(self) -> Tuple[str, int]:
+        name = random.choice(list(TETROMINOS))
+        return name, TETROMINOS[name][1]
+
+    def _valid_position(self, piece: Tuple[int, ...], offset_x: int, offset_y: int) -> bool:
+        """Check the column masks of `piece` placed at (offset_x, offset_y) against the walls and the bitboard."""
+        lines = self.lines
+        width = self.matrix.width
+        for x, mask in enumerate(piece):
+            if not mask:
+                continue
+            line = x + offset_x
+            if line < 0 or line >= width:
+                return False
+            if offset_y >= 0:
+                shifted = mask << offset_y
+            elif mask & ((1 << -offset_y) - 1):
+                return False
+            else:
+                shifted = mask >> -offset_y
+            if shifted & ~self.full_line or lines[line] & shifted:
+                return False
         return True
 
     def _merge_piece(self) -> None:
-        for y, row in enumerate(self.current_piece):
-            for x, cell in enumerate(row):
-                if cell:
-                    self.board[self.piece_x + x][self.piece_y + y] = self.current_color
+        for x, mask in enumerate(self.current_piece):
+            if mask:
+                # Pieces with empty leading rows may sit at a negative offset
+                self.lines[self.piece_x + x] |= (
+                    mask << self.piece_y if self.piece_y >= 0 else mask >> -self.piece_y
+                )
+        for x, y in PIECE_CELLS[self.piece_name][self.rotation]:
+            self.board[self.piece_x + x][self.piece_y + y] = self.current_color
 
     def _clear_lines(self) -> None:
-        self.lines_to_clear = [
-            x for x, col in enumerate(self.board) if all(cell != 0 for cell in col)
-        ]
+        full_line = self.full_line
+        self.lines_to_clear = [x for x, line in enumerate(self.lines) if line == full_line]
         if self.lines_to_clear:
             self.clear_lines_animation_timer = 0.5  # 0.5 seconds animation
+            self._emit_line_sparks()
+
+    def _emit_line_sparks(self, per_cell: int = 4) -> None:
+        height = self.matrix.height
+        cells = np.repeat(np.arange(height, dtype=np.float32) + 0.5, per_cell)
+        for x in self.lines_to_clear:
+            cell_colors = np.repeat(np.array(self.board[x], dtype=np.uint32), per_cell)
+            self.particles.burst(x + 0.5, cells, len(cells), speed=12.0, life=0.9, color=cell_colors)
 
     def _perform_clear_lines(self) -> None:
-        new_board = [
-            col for x, col in enumerate(self.board) if x not in self.lines_to_clear
-        ]
-        lines_cleared = len(self.lines_to_clear)
+        full_line = self.full_line
+        kept = [x for x, line in enumerate(self.lines) if line != full_line]
+        lines_cleared = len(self.lines) - len(kept)
         if lines_cleared == 1:
             self.score += 10
         elif lines_cleared == 2:
@@ -131,17 +207,21 @@ class TetrisApp(BaseApp):
             self.score += 60
         elif lines_cleared == 4:
             self.score += 100
-        new_board = [[0] * self.matrix.height for _ in range(lines_cleared)] + new_board
-        self.board = new_board
+        self.lines = [0] * lines_cleared + [self.lines[x] for x in kept]
+        self.board = [[0] * self.matrix.height for _ in range(lines_cleared)] + [
+            self.board[x] for x in kept
+        ]
         self.lines_to_clear = []
         self.drop_interval = max(
             0.1, 1 - self.score / 1000
         )  # Increase speed based on score
 
     def _try_rotate(self, clockwise: bool) -> bool:
-        piece_type = "I" if self.current_piece == TETROMINOS["I"][0] else "JLSTZ"
-        new_rotation_state = (self.rotation_state + (1 if clockwise else -1)) % 4
-        rotated_piece = self._rotate_piece(self.current_piece, clockwise)
+        piece_type = "I" if self.piece_name == "I" else "JLSTZ"
+        step = 1 if clockwise else -1
+        new_rotation_state = (self.rotation_state + step) % 4
+        new_rotation = (self.rotation + step) % 4
+        rotated_piece = PIECE_MASKS[self.piece_name][new_rotation]
 
         for offset_x, offset_y in WALLKICK_OFFSETS[piece_type][
             (self.rotation_state, new_rotation_state)
@@ -149,15 +229,56 @@ class TetrisApp(BaseApp):
             if self._valid_position(
                 rotated_piece, self.piece_x + offset_x, self.piece_y + offset_y
             ):
-                self.current_piece = rotated_piece
+                self.rotation = new_rotation
                 self.piece_x += offset_x
                 self.piece_y += offset_y
                 self.rotation_state = new_rotation_state
                 return True
         return False
     
+    def _demo_controls(self) -> Tuple[int, float, float]:
+        """Steer the piece towards the autoplayer's pick, returning (rotation step, axis_0, axis_1)."""
+        if self.planned_piece != self.piece_count:
+            self.planned_piece = self.piece_count
+            self.autoplayer.start(self.lines, self.piece_name, self.next_piece_name)
+            return 0, 0, 0  # Also releases the stick so the next hard drop registers
+        if self.autoplayer.searching:
+            self.autoplayer.step(self.demo_search_budget)
+            return 0, 0, 0
+        if self.autoplayer.best is None or self.clear_lines_animation_timer > 0:
+            return 0, 0, 0
+
+        target_rotation, target_y = self.autoplayer.best
+        if self.rotation != target_rotation:
+            return (1 if (target_rotation - self.rotation) % 4 <= 2 else -1), 0, 0
+        if self.piece_y != target_y:
+            step = 1 if target_y > self.piece_y else -1
+            if self._valid_position(self.current_piece, self.piece_x, self.piece_y + step):
+                return 0, 0, step
+        return 0, -1, 0  # In place, or blocked on the way there
+
     def update(self, delta_time: float) -> None:
-        if self.is_pressed(GamepadButtons.A):
+        self.particles.update(delta_time)
+        axis_0, axis_1 = self.get_vector()
+        if abs(axis_0) > 0.5 or abs(axis_1) > 0.5 or any(
+            self.is_pressed(button) for button in range(GamepadButtons.NUM)
+        ):
+            self.idle_time = 0
+            if self.demo:
+                self.demo = False
+                logging.info("Tetris demo handed back to the player")
+        else:
+            self.idle_time += delta_time
+            if not self.demo and self.idle_time >= self.demo_idle_timeout:
+                self.demo = True
+                self.planned_piece = 0
+                logging.info("Tetris demo started")
+
+        if self.demo:
+            rotate, axis_0, axis_1 = self._demo_controls()
+            if rotate:
+                self._try_rotate(clockwise=rotate > 0)
+        elif self.is_pressed(GamepadButtons.A):
             self._try_rotate(clockwise=True)
         elif self.is_pressed(GamepadButtons.B):
             self._try_rotate(clockwise=False)
@@ -166,9 +287,6 @@ class TetrisApp(BaseApp):
         elif self.is_pressed(GamepadButtons.BACK):
             self.keep_running = False
 
-        # Handle joystick axis motion
-        axis_0, axis_1 = self.get_vector()
-
         if axis_1 < -0.5:
             self.move_direction = -1
         elif axis_1 > 0.5:
@@ -216,11 +334,13 @@ class TetrisApp(BaseApp):
             else:
                 self._merge_piece()
                 self._clear_lines()
-                self.current_piece, self.current_color = self.next_piece, self.next_color
-                self.next_piece, self.next_color = self._new_piece()
+                self.piece_name, self.current_color = self.next_piece_name, self.next_color
+                self.next_piece_name, self.next_color = self._new_piece()
+                self.rotation = 0
                 self.piece_x = 0
-                self.piece_y = self.matrix.height // 2 - len(self.current_piece) // 2
+                self.piece_y = self.matrix.height // 2 - PIECE_SIZES[self.piece_name] // 2
                 self.rotation_state = int(random.uniform(0, 4))  # Random rotation state
+                self.piece_count += 1
                 if not self._valid_position(self.current_piece, self.piece_x, self.piece_y):
                     self.game_over = True
                     self.show_score_timer = 3  # Show score for 5 seconds
@@ -228,6 +348,7 @@ class TetrisApp(BaseApp):
     def render(self) -> None:
         if self.game_over:
             self._show_score()
+            self.particles.render(self.matrix)
             return
 
         for x, col in enumerate(self.board):
@@ -237,28 +358,21 @@ class TetrisApp(BaseApp):
 
         if self.clear_lines_animation_timer > 0:
             brightness = VfxUtils.breath_curve(self.clear_lines_animation_timer, 0.5, 1.5)
+            color = colors.gray(int(brightness * 255))  # Breathing effect
             for x in self.lines_to_clear:
                 for y in range(self.matrix.height):
-                    self.matrix.set_pixel(x, y, (int(brightness * 255), int(brightness * 255), int(brightness * 255)))  # Breathing effect
+                    self.matrix.set_pixel(x, y, color)
         else:
-            for y, row in enumerate(self.current_piece):
-                for x, cell in enumerate(row):
-                    if cell:
-                        self.matrix.set_pixel(self.piece_x + x, self.piece_y + y, self.current_color)  # Current piece color
+            for x, y in PIECE_CELLS[self.piece_name][self.rotation]:
+                self.matrix.set_pixel(self.piece_x + x, self.piece_y + y, self.current_color)  # Current piece color
+        self.particles.render(self.matrix)
 
     def _show_score(self) -> None:
         score_str = f"{self.score}"
         x_offset = (self.matrix.width - len(score_str) * 4) // 2
         y_offset = (self.matrix.height - 5) // 2  # Center vertically
         brightness = int(VfxUtils.breath_curve(self.show_score_timer, 3, 2) * 255)  # Breathing effect
+        color = colors.gray(brightness)
         for i, char in enumerate(score_str):
             pattern = FONT[char]
-            color = (brightness, brightness, brightness)
-            self.matrix.draw_sprite(
-                x_offset + i * 4,
-                y_offset,
-                [
-                    [color if pixel == "#" else (0, 0, 0) for pixel in row]
-                    for row in pattern
-                ],
-            )
\ No newline at end of file
+            self.matrix.draw_pattern(x_offset + i * 4, y_offset, pattern, color)
\ No newline at end of file
@@ -0,0 +1,131 @@
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Weights of the classic "near perfect" Tetris heuristic
+HEIGHT_WEIGHT = -0.510066
+LINES_WEIGHT = 0.760666
+HOLES_WEIGHT = -0.35663
+BUMPINESS_WEIGHT = -0.184483
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+class TetrisAutoplayer:
+    """
+    Picks placements for TetrisApp's bitboard (one int per line, pieces fall
+    towards +x) by scoring every straight drop of the current piece followed by
+    every straight drop of the next one.
+
+    The search is a generator that step() advances until a per-frame time
+    budget runs out, so a slow search spreads over several frames instead of
+    stalling one.
+    """
+
+    def __init__(
+        self, piece_masks: Dict[str, List[Tuple[int, ...]]], width: int, height: int
+    ) -> None:
+        self.piece_masks = piece_masks
+        self.width = width
+        self.height = height
+        self.full_line = (1 << height) - 1
+        self._search: Optional[Iterator[None]] = None
+        self.best: Optional[Tuple[int, int]] = None  # (rotation, y) of the best placement
+        self._best_score = float("-inf")
+
+    def start(self, lines: Sequence[int], piece: str, next_piece: str) -> None:
+        self.best = None
+        self._best_score = float("-inf")
+        self._search = self._search_placements(list(lines), piece, next_piece)
+
+    @property
+    def searching(self) -> bool:
+        return self._search is not None
+
+    def step(self, budget: float) -> None:
+        """Advance the search for at most `budget` seconds."""
+        if self._search is None:
+            return
+        deadline = time.perf_counter() + budget
+        for _ in self._search:
+            if time.perf_counter() >= deadline:
+                return
+        self._search = None
+
+    def _fits(self, lines: Sequence[int], masks: Tuple[int, ...], x: int, y: int) -> bool:
+        for i, mask in enumerate(masks):
+            if not mask:
+                continue
+            line = x + i
+            if line >= self.width:
+                return False
+            if y >= 0:
+                shifted = mask << y
+            elif mask & ((1 << -y) - 1):
+                return False
+            else:
+                shifted = mask >> -y
+            if shifted & ~self.full_line or lines[line] & shifted:
+                return False
+        return True
+
+    def _drop(self, lines: List[int], masks: Tuple[int, ...], y: int) -> Optional[Tuple[List[int], int]]:
+        """Drop `masks` straight down lane offset `y` from the spawn line, returning (new lines, lines cleared)."""
+        if not self._fits(lines, masks, 0, y):
+            return None
+        x = 0
+        while self._fits(lines, masks, x + 1, y):
+            x += 1
+        result = list(lines)
+        for i, mask in enumerate(masks):
+            if mask:
+                result[x + i] |= mask << y if y >= 0 else mask >> -y
+        kept = [line for line in result if line != self.full_line]
+        cleared = len(result) - len(kept)
+        if cleared:
+            result = [0] * cleared + kept
+        return result, cleared
+
+    def _placements(self, lines: List[int], piece: str) -> Iterator[Tuple[int, int, List[int], int]]:
+        seen = set()
+        for rotation, masks in enumerate(self.piece_masks[piece]):
+            if masks in seen:  # O and the symmetric rotations of S, Z, I
+                continue
+            seen.add(masks)
+            for y in range(-len(masks), self.height):
+                dropped = self._drop(lines, masks, y)
+                if dropped is not None:
+                    yield rotation, y, dropped[0], dropped[1]
+
+    def evaluate(self, lines: Sequence[int], cleared: int) -> float:
+        heights = [0] * self.height
+        holes = 0
+        seen = 0
+        for x, line in enumerate(lines):
+            holes += _popcount(seen & ~line)
+            new = line & ~seen
+            while new:
+                low = new & -new
+                heights[low.bit_length() - 1] = self.width - x
+                new ^= low
+            seen |= line
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        return (
+            HEIGHT_WEIGHT * sum(heights)
+            + LINES_WEIGHT * cleared
+            + HOLES_WEIGHT * holes
+            + BUMPINESS_WEIGHT * bumpiness
+        )
+
+    def _search_placements(self, lines: List[int], piece: str, next_piece: str) -> Iterator[None]:
+        for rotation, y, board, cleared in self._placements(lines, piece):
+            score = float("-inf")
+            for _, _, next_board, next_cleared in self._placements(board, next_piece):
+                score = max(score, self.evaluate(next_board, cleared + next_cleared))
+                yield
+            if score == float("-inf"):  # The next piece would not fit anywhere
+                score = self.evaluate(board, cleared) - 1000
+            if score > self._best_score:
+                self._best_score = score
+                self.best = (rotation, y)
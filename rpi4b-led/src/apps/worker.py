@@ -0,0 +1,209 @@
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+import control_hooks
+import frame_watchdog
+import gc_policy
+from led_matrix import LEDMatrix
+from log_pipeline import stop_logging
+from shared_frame import SharedFrame
+from .base import BaseApp
+from .registry import LazyApp
+
+# Messages sent by the worker process
+FRAME_DONE = "frame"
+APP_EXITED = "exit"
+APP_FAILED = "error"
+
+
+def _worker_main(app: BaseApp, frame: SharedFrame, conn) -> None:
+    """Entry point of the forked worker: run `app` one frame per input snapshot from the parent."""
+    # The shared mapping is inherited through fork, the parent owns and unlinks it
+    matrix = LEDMatrix(
+        app.matrix.width,
+        app.matrix.height,
+        app.matrix.width * app.matrix.height,
+        0,
+        headless=True,
+    )
+    matrix.bind_buffer(frame.front_page())
+    app.matrix = matrix
+    input_manager = app._input_manager
+    started = False
+    snapshot = None
+
+    def poll_input() -> None:
+        # Button edges are relative to the last update that ran here (consume_edges),
+        # not to the parent's previous frame, so simulate() may skip frames
+        button_states, previous_button_states, input_manager.axis_states, input_manager.hats_states, _ = snapshot
+        for joystick_id, states in previous_button_states.items():
+            input_manager.previous_button_states.setdefault(joystick_id, states)
+        input_manager.button_states = button_states
+
+    try:
+        while True:
+            if started:
+                app._worker_wait(conn)
+            try:
+                delta_time, snapshot = conn.recv()
+            except EOFError:
+                break
+            app._input_devices = snapshot[4]
+            app.refresh_available_devices()
+
+            if not started:
+                input_manager.previous_button_states = snapshot[1]
+                app.keep_running = True
+                app.reset()
+                app._accumulator = 0.0
+                started = True
+                app._worker_started()
+                gc_policy.app_started()
+
+            frame_start = time.perf_counter()
+            if app.clear_before_render:
+                matrix.clear()
+            app.simulate(delta_time, poll_input)
+            app.render()
+
+            if not app.keep_running:
+                conn.send((APP_EXITED, None))
+                break
+            conn.send((FRAME_DONE, None))
+            # The parent copies the page meanwhile, the next snapshot is at least a frame away
+            gc_policy.collect_in_slack(frame_start + 1 / app.target_fps)
+    except Exception:
+        conn.send((APP_FAILED, traceback.format_exc()))
+    finally:
+        if started:
+            try:
+                app._worker_stopped()
+            except Exception:
+                logging.error(f"{app.info()} failed to stop", exc_info=True)
+        stop_logging()  # The child exits without running atexit handlers
+
+
+class WorkerApp(BaseApp):
+    """
+    Runs `app` in a forked process for crash isolation and a core of its own.
+
+    The worker renders into a shared-memory page while this process keeps
+    handling joystick events, input polling and output. The two run in lockstep:
+    the parent sends an input snapshot, the worker renders one frame and acks,
+    and the parent copies the page to the matrix before sending the next
+    snapshot, so the page is never read and written at the same time.
+    """
+
+    def __init__(self, app: BaseApp, hang_timeout: float = 2.0) -> None:
+        super().__init__(app.matrix, target_fps=app.target_fps, clear_before_render=False)
+        self.app = app
+        self.ICON = app.ICON
+        self.hang_timeout = hang_timeout
+
+    def info(self) -> str:
+        return f"{self.app.info()} (worker)"
+
+    def _input_snapshot(self):
+        input_manager = self._input_manager
+        return (
+            input_manager.button_states,
+            input_manager.previous_button_states,
+            input_manager.axis_states,
+            input_manager.hats_states,
+            self._input_devices,
+        )
+
+    def execute(self) -> None:
+        # Import and construct a lazily registered app here so every later launch forks it ready-made
+        app = self.app.instance() if isinstance(self.app, LazyApp) else self.app
+        if not app.WORKER_PROCESS:
+            app.transition, self.transition = self.transition, None
+            app.execute()
+            return
+        self.keep_running = True
+        self.connect_device()
+        frame = SharedFrame.create(
+            f"led-worker-{os.getpid()}-{id(self)}", self.matrix.width, self.matrix.height
+        )
+        frame.front_page()[:] = self.matrix.buffer
+        # fork keeps start-up instant and hands the app over without pickling
+        context = multiprocessing.get_context("fork")
+        # Also keeps the collector from touching (and copying) the pages the worker shares with this process
+        gc_policy.app_started()
+        conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_worker_main, args=(app, frame, child_conn), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        logging.info(f"Running {self.info()} with fps={self.target_fps}, pid={process.pid}")
+
+        waiting = False
+        sent_time = last_send_time = time.monotonic()
+        try:
+            while self.keep_running:
+                frame_start = time.perf_counter()
+                frame_watchdog.begin_frame(self, 1 / self.target_fps)
+                control_hooks.apply_commands(self)
+                self.handle_events()
+                frame_watchdog.mark("events")
+                now = time.monotonic()
+
+                if waiting:
+                    if conn.poll():
+                        try:
+                            message, detail = conn.recv()
+                        except EOFError:
+                            message, detail = APP_FAILED, f"exit code {process.exitcode}"
+                        if message == FRAME_DONE:
+                            self.matrix.load(frame.front_page())
+                            waiting = False
+                        elif message == APP_EXITED:
+                            break
+                        else:
+                            logging.error(f"{self.app.info()} crashed, back to the menu:\n{detail}")
+                            break
+                    elif not process.is_alive():
+                        logging.error(f"{self.app.info()} died with exit code {process.exitcode}")
+                        break
+                    elif now - sent_time > self.hang_timeout:
+                        logging.error(f"{self.app.info()} hung for {self.hang_timeout}s, killing it")
+                        break
+
+                if not waiting:
+                    self._input_manager.update()
+                    conn.send((now - last_send_time, self._input_snapshot()))
+                    sent_time = last_send_time = now
+                    waiting = True
+                transition = self.transition
+                if transition is not None:
+                    transition.capture(self.matrix)
+                    if not transition.draw(self.matrix):
+                        transition = self.transition = None
+                overlay = control_hooks.draw_overlay(self.matrix)
+                frame_watchdog.mark("worker")
+
+                self.matrix.show()
+                if overlay:
+                    control_hooks.restore_overlay(self.matrix)
+                if transition is not None:
+                    transition.restore(self.matrix)
+                frame_watchdog.mark("show")
+                self.check_log_cost()
+                gc_policy.collect_in_slack(frame_start + 1 / self.target_fps)
+                frame_watchdog.mark("gc")
+                frame_watchdog.end_frame()
+                self.clock.tick(self.target_fps)
+        finally:
+            self.transition = None
+            gc_policy.app_stopped()
+            conn.close()
+            process.join(timeout=0.5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            frame.close()
+            logging.info(f"Exiting {self.info()}")
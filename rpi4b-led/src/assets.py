@@ -0,0 +1,285 @@
+"""
+Multi-color sprites, sprite sheets and bitmap fonts from PNG files.
+
+Decoding a PNG (pygame.image) is slow on the Pi, so every image is converted
+once into a cache file next to the others in CACHE_DIR and later startups
+memory-map that instead. The cache is rebuilt when the source's modification
+time or size changes. Each sprite is stored as an RGB page in the framebuffer
+layout plus its opaque runs: (y, x, length) spans of pixels with alpha >= 128,
+so drawing is one bulk copy per run and transparent pixels cost nothing.
+
+Layout of a cache file: a 32 byte header, one 12 byte entry per sprite, the
+sprites' RGB pages of tile_width * tile_height * 3 bytes, then all runs as
+u16 (y, x, length) triples.
+
+    magic       4s  b"LEDS"
+    version     u16 1
+    pad         u16
+    mtime_ns    i64 of the source image
+    size        u64 of the source image
+    tile_width  u16
+    tile_height u16
+    count       u32 sprites, left to right then top to bottom
+
+    entry: first_run u32, run_count u32, advance u16 (rightmost opaque column + 1), pad u16
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from led_matrix import LEDMatrix
+
+MAGIC = b"LEDS"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxqQHHI")
+ENTRY = struct.Struct("<IIHxx")
+RUN = 3  # u16 values per run
+ALPHA_THRESHOLD = 128  # LEDs cannot blend, pixels are either drawn or not
+
+CACHE_DIR = os.environ.get("LED_ASSET_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "led-matrix"))
+
+# Loaded sheets by (path, tile size), reused until the source changes
+_sheets: Dict[Tuple[str, int, int], Tuple[int, int, "SpriteSheet"]] = {}
+
+
+class Sprite:
+    """An image drawn with its own colors, pixels with alpha below ALPHA_THRESHOLD are transparent."""
+
+    def __init__(self, width: int, height: int, pixels: memoryview, runs: memoryview, advance: int) -> None:
+        self.width = width
+        self.height = height
+        self.pixels = pixels  # RGB bytes, row-major
+        self.runs = runs  # Flat u16 (y, x, length) triples of the opaque spans
+        self.advance = advance  # Width up to the rightmost opaque column, for proportional text
+
+    def draw(self, matrix: LEDMatrix, x: int, y: int, pixels=None) -> None:
+        """Copy the opaque runs into the framebuffer with the top-left corner at (x, y), clipped to the matrix."""
+        pixels = self.pixels if pixels is None else pixels
+        runs = self.runs
+        width, height = matrix.width, matrix.height
+        blit = matrix.blit
+        for i in range(0, len(runs), RUN):
+            row, column, length = runs[i], runs[i + 1], runs[i + 2]
+            target_y = y + row
+            if not 0 <= target_y < height:
+                continue
+            start = x + column
+            first, last = max(start, 0), min(start + length, width)
+            if first >= last:
+                continue
+            source = (row * self.width + column + first - start) * 3
+            blit(pixels[source:source + (last - first) * 3], (target_y * width + first) * 3)
+
+
+class SpriteSheet:
+    """Equally sized sprites cut from one image, indexed left to right then top to bottom."""
+
+    def __init__(self, path: str, tile_width: int, tile_height: int, sprites: List[Sprite], source=None) -> None:
+        self.path = path
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.sprites = sprites
+        self._source = source  # The cache's memory map the sprites are views of, if any
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def __getitem__(self, index: int) -> Sprite:
+        return self.sprites[index]
+
+    def close(self) -> None:
+        if self._source is not None:
+            for sprite in self.sprites:
+                sprite.pixels.release()
+                sprite.runs.release()
+            self._source.close()
+            self._source = None
+
+
+class Font:
+    """
+    A bitmap font from a sheet of glyph tiles, `chars` names the tiles in
+    order. Glyphs are as wide as their opaque pixels (empty ones, like space,
+    are half a tile); text is drawn in the glyphs' own colors or in one color.
+    """
+
+    def __init__(self, sheet: SpriteSheet, chars: str, spacing: int = 1) -> None:
+        if len(chars) > len(sheet):
+            raise ValueError(f"{sheet.path} has {len(sheet)} glyphs, {len(chars)} chars given")
+        self.sheet = sheet
+        self.height = sheet.tile_height
+        self.spacing = spacing
+        self.glyphs = dict(zip(chars, sheet.sprites))
+        self._blank_advance = max(1, sheet.tile_width // 2)
+        self._tints: Dict[int, bytes] = {}  # A page filled with one color, shared by all glyphs
+
+    def advance(self, char: str) -> int:
+        glyph = self.glyphs.get(char)
+        return glyph.advance if glyph is not None and glyph.advance else self._blank_advance
+
+    def text_width(self, text: str) -> int:
+        return sum(self.advance(char) for char in text) + self.spacing * max(0, len(text) - 1)
+
+    def draw_text(self, matrix: LEDMatrix, x: int, y: int, text: str, color: Optional[int] = None) -> int:
+        """Draw `text` from (x, y), in packed `color` if given. Returns the x after the last glyph."""
+        pixels = None
+        if color is not None:
+            pixels = self._tints.get(color)
+            if pixels is None:
+                if len(self._tints) >= 64:  # Color-cycling text would grow it forever
+                    self._tints.clear()
+                rgb = bytes((color >> 16, (color >> 8) & 0xFF, color & 0xFF))
+                pixels = self._tints[color] = memoryview(rgb * (self.sheet.tile_width * self.height))
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is not None:
+                glyph.draw(matrix, x, y, pixels)
+            x += self.advance(char) + self.spacing
+        return x - self.spacing
+
+
+def _cache_path(path: str, tile_width: int, tile_height: int) -> str:
+    digest = hashlib.sha1(f"{path}:{tile_width}x{tile_height}".encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{os.path.basename(path)}-{digest}.leds")
+
+
+def _decode(path: str, tile_width: int, tile_height: int):
+    """Yield (rgb, runs, advance) per tile of the image at `path`."""
+    image = pygame.image.load(path)
+    width, height = image.get_size()
+    rgba = pygame.image.tobytes(image, "RGBA")
+    for tile_y in range(0, height - tile_height + 1, tile_height):
+        for tile_x in range(0, width - tile_width + 1, tile_width):
+            rgb = bytearray(tile_width * tile_height * 3)
+            runs = array("H")
+            advance = 0
+            for y in range(tile_height):
+                row = ((tile_y + y) * width + tile_x) * 4
+                run_start = None
+                for x in range(tile_width + 1):
+                    opaque = x < tile_width and rgba[row + x * 4 + 3] >= ALPHA_THRESHOLD
+                    if opaque:
+                        i = (y * tile_width + x) * 3
+                        rgb[i:i + 3] = rgba[row + x * 4:row + x * 4 + 3]
+                        if run_start is None:
+                            run_start = x
+                    elif run_start is not None:
+                        runs.extend((y, run_start, x - run_start))
+                        advance = max(advance, x)
+                        run_start = None
+            yield bytes(rgb), runs, advance
+
+
+def _write_cache(cache_path: str, stat: os.stat_result, tile_width: int, tile_height: int, tiles) -> None:
+    runs_total = 0
+    entries = []
+    for _, runs, advance in tiles:
+        entries.append(ENTRY.pack(runs_total, len(runs) // RUN, advance))
+        runs_total += len(runs) // RUN
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporary = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, tile_width, tile_height, len(tiles)))
+        f.writelines(entries)
+        for rgb, _, _ in tiles:
+            f.write(rgb)
+        for _, runs, _ in tiles:
+            runs.tofile(f)
+    os.replace(temporary, cache_path)  # Other processes see the old cache or the whole new one
+
+
+def _map_cache(path: str, cache_path: str, stat: os.stat_result, tile_width: int, tile_height: int):
+    """The sheet from a cache file that matches the source, or None."""
+    try:
+        with open(cache_path, "rb") as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # Missing or empty
+        return None
+    if len(source) >= HEADER.size:
+        magic, version, mtime_ns, size, cached_width, cached_height, count = HEADER.unpack_from(source)
+        page_size = tile_width * tile_height * 3
+        runs_offset = HEADER.size + count * ENTRY.size + count * page_size
+        if (
+            (magic, version, mtime_ns, size, cached_width, cached_height)
+            == (MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, tile_width, tile_height)
+            and len(source) >= runs_offset
+            and (len(source) - runs_offset) % (RUN * 2) == 0
+        ):
+            view = memoryview(source)
+            all_runs = view[runs_offset:].cast("H")
+            sprites = []
+            for i in range(count):
+                first_run, run_count, advance = ENTRY.unpack_from(source, HEADER.size + i * ENTRY.size)
+                page = HEADER.size + count * ENTRY.size + i * page_size
+                sprites.append(
+                    Sprite(
+                        tile_width,
+                        tile_height,
+                        view[page:page + page_size],
+                        all_runs[first_run * RUN:(first_run + run_count) * RUN],
+                        advance,
+                    )
+                )
+            all_runs.release()
+            view.release()
+            return SpriteSheet(path, tile_width, tile_height, sprites, source)
+    source.close()
+    return None
+
+
+def load_sheet(path: str, tile_width: int, tile_height: int) -> SpriteSheet:
+    """Load the sprites of a sheet of tile_width x tile_height tiles, from the cache if it is current."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, tile_width, tile_height)
+    loaded = _sheets.get(key)
+    if loaded is not None and loaded[:2] == (stat.st_mtime_ns, stat.st_size):
+        return loaded[2]
+
+    cache_path = _cache_path(path, tile_width, tile_height)
+    sheet = _map_cache(path, cache_path, stat, tile_width, tile_height)
+    if sheet is None:
+        tiles = list(_decode(path, tile_width, tile_height))
+        try:
+            _write_cache(cache_path, stat, tile_width, tile_height, tiles)
+            sheet = _map_cache(path, cache_path, stat, tile_width, tile_height)
+        except OSError:
+            logging.warning(f"Cannot cache {path} in {CACHE_DIR}, decoding it on every start", exc_info=True)
+        if sheet is None:
+            sprites = [
+                Sprite(tile_width, tile_height, memoryview(rgb), memoryview(runs), advance)
+                for rgb, runs, advance in tiles
+            ]
+            sheet = SpriteSheet(path, tile_width, tile_height, sprites)
+        logging.debug(f"Decoded {path} into {len(sheet)} sprites")
+    if loaded is not None:
+        loaded[2].close()  # The file changed: unmap the old cache, sprites of the old sheet are no longer usable
+    _sheets[key] = (stat.st_mtime_ns, stat.st_size, sheet)
+    return sheet
+
+
+def load_sprite(path: str) -> Sprite:
+    """Load a whole image as one sprite."""
+    width, height = _image_size(path)
+    return load_sheet(path, width, height)[0]
+
+
+def load_font(path: str, chars: str, tile_width: int, tile_height: int, spacing: int = 1) -> Font:
+    """Load a font from a sheet of glyph tiles named by `chars` in order."""
+    return Font(load_sheet(path, tile_width, tile_height), chars, spacing)
+
+
+def _image_size(path: str) -> Tuple[int, int]:
+    # The PNG header has the size, so a cached sprite needs no decoding
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+        return struct.unpack(">II", header[16:24])
+    return pygame.image.load(path).get_size()
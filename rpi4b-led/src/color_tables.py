@@ -0,0 +1,172 @@
+"""
+Precomputed color and easing tables shared by the effects. Each table is built
+once, on first use, and then an effect only indexes it: a packed int per entry
+for pixel-by-pixel drawing, or a (size, 3) uint8 numpy array whose fancy
+indexing colors a whole frame at once (LEDMatrix.array()). numpy is imported
+by the array variants only.
+"""
+
+import functools
+import math
+from typing import Callable, Dict, List, Tuple
+
+import colors
+
+TABLE_SIZE = 256
+
+# Kelvin range of the color temperature table, in steps of TEMPERATURE_STEP
+MIN_TEMPERATURE = 1000
+MAX_TEMPERATURE = 40000
+TEMPERATURE_STEP = 100
+
+# Gradient stops as (position 0-1, packed color), linearly interpolated in between
+GRADIENTS: Dict[str, List[Tuple[float, int]]] = {
+    "fire": [(0.0, 0x000000), (0.35, 0xA00000), (0.7, 0xFF8000), (1.0, 0xFFFF80)],
+    "ocean": [(0.0, 0x000010), (0.4, 0x0020A0), (0.75, 0x00A0C0), (1.0, 0xC0FFFF)],
+    "sunset": [(0.0, 0x200040), (0.4, 0xC00060), (0.7, 0xFF6000), (1.0, 0xFFD040)],
+    "forest": [(0.0, 0x001000), (0.5, 0x208000), (1.0, 0xC0FF40)],
+    "heat": [(0.0, 0x0000FF), (0.25, 0x00FFFF), (0.5, 0x00FF00), (0.75, 0xFFFF00), (1.0, 0xFF0000)],
+}
+
+
+def _in_out(ease_in: Callable[[float], float]) -> Callable[[float], float]:
+    return lambda t: ease_in(2 * t) / 2 if t < 0.5 else 1 - ease_in(2 - 2 * t) / 2
+
+
+def _out_bounce(t: float) -> float:
+    if t < 1 / 2.75:
+        return 7.5625 * t * t
+    if t < 2 / 2.75:
+        t -= 1.5 / 2.75
+        return 7.5625 * t * t + 0.75
+    if t < 2.5 / 2.75:
+        t -= 2.25 / 2.75
+        return 7.5625 * t * t + 0.9375
+    t -= 2.625 / 2.75
+    return 7.5625 * t * t + 0.984375
+
+
+# Easing curves over t = 0-1, all starting at 0 and ending at 1
+EASINGS: Dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "in_quad": lambda t: t * t,
+    "out_quad": lambda t: t * (2 - t),
+    "in_out_quad": _in_out(lambda t: t * t),
+    "in_cubic": lambda t: t ** 3,
+    "out_cubic": lambda t: 1 - (1 - t) ** 3,
+    "in_out_cubic": _in_out(lambda t: t ** 3),
+    "in_out_sine": lambda t: (1 - math.cos(math.pi * t)) / 2,
+    "out_bounce": _out_bounce,
+}
+
+
+def color_temperature_to_rgb(kelvin: int) -> Tuple[int, int, int]:
+    # Convert color temperature in Kelvin to RGB
+    temp = kelvin / 100.0
+    if temp <= 66:
+        red = 255
+        green = temp
+        green = 99.4708025861 * math.log(green) - 161.1195681661
+        if temp <= 19:
+            blue = 0
+        else:
+            blue = temp - 10
+            blue = 138.5177312231 * math.log(blue) - 305.0447927307
+    else:
+        red = temp - 60
+        red = 329.698727446 * (red ** -0.1332047592)
+        green = temp - 60
+        green = 288.1221695283 * (green ** -0.0755148492)
+        blue = 255
+
+    return (
+        max(0, min(255, int(red))),
+        max(0, min(255, int(green))),
+        max(0, min(255, int(blue))),
+    )
+
+
+def _wheel(pos: int) -> int:
+    if pos < 85:
+        return (pos * 3 << 16) | ((255 - pos * 3) << 8)
+    elif pos < 170:
+        pos -= 85
+        return ((255 - pos * 3) << 16) | (pos * 3)
+    else:
+        pos -= 170
+        return (pos * 3 << 8) | (255 - pos * 3)
+
+
+def _as_array(table: Tuple[int, ...]):
+    import numpy as np
+
+    packed = np.array(table, dtype=np.uint32)
+    rgb = np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=1).astype(np.uint8)
+    rgb.flags.writeable = False  # Shared by every caller
+    return rgb
+
+
+@functools.lru_cache(maxsize=None)
+def wheel_table() -> Tuple[int, ...]:
+    """Packed rainbow colors of wheel positions 0-255."""
+    return tuple(_wheel(pos) for pos in range(TABLE_SIZE))
+
+
+@functools.lru_cache(maxsize=None)
+def wheel_array():
+    """wheel_table() as a (256, 3) uint8 array."""
+    return _as_array(wheel_table())
+
+
+@functools.lru_cache(maxsize=None)
+def temperature_table() -> Tuple[int, ...]:
+    """Packed colors from MIN_TEMPERATURE to MAX_TEMPERATURE Kelvin, TEMPERATURE_STEP apart."""
+    return tuple(
+        colors.pack(*color_temperature_to_rgb(kelvin))
+        for kelvin in range(MIN_TEMPERATURE, MAX_TEMPERATURE + 1, TEMPERATURE_STEP)
+    )
+
+
+def color_temperature(kelvin: float) -> int:
+    """Packed color of a black body at `kelvin`, to the nearest table step."""
+    table = temperature_table()
+    index = round((kelvin - MIN_TEMPERATURE) / TEMPERATURE_STEP)
+    return table[max(0, min(len(table) - 1, index))]
+
+
+@functools.lru_cache(maxsize=None)
+def gradient_table(name: str) -> Tuple[int, ...]:
+    """Packed colors of the named gradient in GRADIENTS, sampled at 256 positions."""
+    stops = GRADIENTS[name]
+    table = []
+    stop = 0
+    for i in range(TABLE_SIZE):
+        t = i / (TABLE_SIZE - 1)
+        while stop < len(stops) - 2 and t > stops[stop + 1][0]:
+            stop += 1
+        (start, a), (end, b) = stops[stop], stops[stop + 1]
+        table.append(colors.blend(a, b, min(1.0, max(0.0, (t - start) / (end - start)))))
+    return tuple(table)
+
+
+@functools.lru_cache(maxsize=None)
+def gradient_array(name: str):
+    """gradient_table() as a (256, 3) uint8 array."""
+    return _as_array(gradient_table(name))
+
+
+@functools.lru_cache(maxsize=None)
+def easing_table(name: str) -> Tuple[float, ...]:
+    """The named curve in EASINGS sampled at 256 points from t = 0 to t = 1."""
+    curve = EASINGS[name]
+    return tuple(curve(i / (TABLE_SIZE - 1)) for i in range(TABLE_SIZE))
+
+
+def ease(name: str, t: float) -> float:
+    """The named easing curve at `t`, clamped to 0-1."""
+    table = easing_table(name)
+    if t <= 0:
+        return table[0]
+    if t >= 1:
+        return table[-1]
+    return table[int(t * (TABLE_SIZE - 1) + 0.5)]
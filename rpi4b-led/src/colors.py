@@ -0,0 +1,58 @@
+"""
+Packed 24-bit colors: 0xRRGGBB ints, the way colors travel from the apps to the
+framebuffer. The helpers work on the packed value with a couple of multiplies
+(red and blue together, green on its own) instead of building (r, g, b) tuples.
+The strip's channel order is applied once, when LEDMatrix.show() packs words.
+"""
+
+from typing import Tuple
+
+BLACK = 0x000000
+WHITE = 0xFFFFFF
+RED = 0xFF0000
+GREEN = 0x00FF00
+BLUE = 0x0000FF
+
+_RB = 0xFF00FF
+_G = 0x00FF00
+
+# Channel orders LEDMatrix accepts, as sent on the wire. For the three-channel orders
+# the first letter goes to bits 16-23 of the strip word, which the driver sends first
+# (as WS2811_STRIP_RGB); for RGBW the strip driver orders the bytes.
+CHANNEL_ORDERS = ("RGB", "GRB", "BGR", "RGBW")
+
+
+def pack(r: int, g: int, b: int) -> int:
+    return (r << 16) | (g << 8) | b
+
+
+def unpack(color: int) -> Tuple[int, int, int]:
+    return (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+
+
+def gray(value: int) -> int:
+    """The packed color with all three channels at `value` (0-255)."""
+    return value * 0x010101
+
+
+def scale(color: int, factor: float) -> int:
+    """`color` with every channel multiplied by `factor` (0-1)."""
+    f = int(factor * 256)
+    return (((color & _RB) * f >> 8) & _RB) | (((color & _G) * f >> 8) & _G)
+
+
+def blend(a: int, b: int, t: float) -> int:
+    """Linear mix from `a` (t = 0) to `b` (t = 1)."""
+    tb = int(t * 256)
+    ta = 256 - tb
+    return ((((a & _RB) * ta + (b & _RB) * tb) >> 8) & _RB) | ((((a & _G) * ta + (b & _G) * tb) >> 8) & _G)
+
+
+def add(a: int, b: int) -> int:
+    """Channel-wise sum of `a` and `b`, saturating at 255."""
+    rb = (a & _RB) + (b & _RB)
+    g = (a & _G) + (b & _G)
+    # A carry out of a channel lands in the bit above it, spread it over the channel
+    rb |= ((rb & 0x1000100) >> 8) * 0xFF
+    g |= ((g & 0x10000) >> 8) * 0xFF
+    return (rb & _RB) | (g & _G)
@@ -0,0 +1,28 @@
+"""
+Frame loop hooks of the control socket (control_server.py). They do nothing
+until a server is installed, and this module imports nothing, so the frame
+loops call them without loading the server's dependencies when
+--control-socket is off.
+"""
+
+_server = None
+
+
+def install(server) -> None:
+    """Route the hooks to `server` (a ControlServer), or to nothing with None."""
+    global _server
+    _server = server
+
+
+def apply_commands(app) -> None:
+    if _server is not None:
+        _server.apply(app)
+
+
+def draw_overlay(matrix) -> bool:
+    return _server is not None and _server.draw_overlay(matrix)
+
+
+def restore_overlay(matrix) -> None:
+    if _server is not None:
+        _server.restore(matrix)
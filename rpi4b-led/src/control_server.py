@@ -0,0 +1,288 @@
+"""
+Local control socket: switch apps, set the brightness, show a text message or a
+frame and read stats while the wall runs, without a restart (ledctl.py is the
+command line client).
+
+The server listens on a Unix-domain socket on its own thread. Requests are
+JSON objects, one per line, and every request gets one JSON line back:
+
+    {"cmd": "apps"}                                  -> {"ok": true, "apps": ["ClockApp", ...]}
+    {"cmd": "switch", "app": "TetrisApp"}            launch an app, leaving the running one
+    {"cmd": "menu"}                                  leave the running app
+    {"cmd": "brightness", "value": 64}               0-255
+    {"cmd": "text", "text": "HELLO", "color": "ff8000", "seconds": 5}
+    {"cmd": "frame", "rgb": "<base64>", "seconds": 0}  width * height * 3 bytes, 0 shows it until "clear"
+    {"cmd": "clear"}                                 remove the text or frame
+    {"cmd": "stats"}                                 -> {"ok": true, "app": ..., "fps": ..., ...}
+
+Errors come back as {"ok": false, "error": "..."}. The socket thread only
+parses and queues; the render loop applies queued commands at the start of its
+next frame, so a command never races a frame and a slow client never stalls
+one. Text and frames are drawn over the running app's frame until they expire.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import colors
+import control_hooks
+from led_matrix import LEDMatrix
+
+DEFAULT_SOCKET = "/tmp/led-matrix.sock"
+REPLY_TIMEOUT = 2.0  # The render loop applies commands within a frame unless it is stuck
+MAX_REQUEST = 1 << 20  # A base64 frame of a 64x64 matrix is 16 KiB
+TEXT_SCROLL_SPEED = 12  # Pixels per second for text wider than the matrix
+
+
+class ControlServer:
+    def __init__(self, menu, matrix: LEDMatrix, path: str = DEFAULT_SOCKET) -> None:
+        self.menu = menu
+        self.matrix = matrix
+        self.path = path
+        self._commands = queue.SimpleQueue()  # (request, Future) for the render loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Render loop state, only touched on the render thread
+        self.start_time = time.monotonic()
+        self.active_app = None
+        self.frames = 0
+        self._last_frame = 0.0
+        self._frame_time = 0.0  # Moving average of the time between frames
+        self.overlay = None  # "text" or "frame"
+        self._overlay_until = 0.0
+        self._overlay_start = 0.0
+        self._overlay_frame = bytearray(len(matrix.buffer))
+        self._text = ""
+        self._text_color = colors.WHITE
+        self._saved = bytearray(len(matrix.buffer))  # The app's frame under the overlay
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        control_hooks.install(self)
+
+    def stop(self) -> None:
+        control_hooks.install(None)
+        # The loop is already closed if the server failed to start, e.g. the path was taken
+        if self._loop is not None and self._stop_event is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except Exception:
+            logging.error("Control server stopped", exc_info=True)
+        finally:
+            self._ready.set()
+
+    def _remove_stale_socket(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)  # Left behind by a wall that did not shut down cleanly
+            return
+        finally:
+            probe.close()
+        raise OSError(f"Another wall is listening on {self.path}")
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._remove_stale_socket()
+        server = await asyncio.start_unix_server(self._handle_connection, self.path, limit=MAX_REQUEST)
+        logging.info(f"Control socket on {self.path}")
+        self._ready.set()
+        await self._stop_event.wait()
+        server.close()
+        await server.wait_closed()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self._handle_request(line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):  # ValueError: a line over MAX_REQUEST
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict) or not isinstance(request.get("cmd"), str):
+                raise ValueError('expected {"cmd": ...}')
+        except ValueError as e:
+            return {"ok": False, "error": f"Bad request: {e}"}
+        future = Future()
+        self._commands.put((request, future))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), REPLY_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": "The render loop did not respond"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, **result}
+
+    # Render thread side
+
+    def apply(self, app) -> None:
+        """Run the queued commands, called by the frame loop of `app`, the innermost running app."""
+        now = time.perf_counter()
+        if self._frame_time:
+            self._frame_time += (now - self._last_frame - self._frame_time) * 0.05
+        elif self._last_frame:
+            self._frame_time = now - self._last_frame  # Seeded with the first interval instead of averaging up from 0
+        self._last_frame = now
+        self.frames += 1
+        self.active_app = app
+        while True:
+            try:
+                request, future = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._execute(app, request))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _execute(self, app, request: dict) -> dict:
+        command = request["cmd"]
+        if command == "apps":
+            return {"apps": [self._app_name(entry) for entry in self.menu.apps]}
+        if command == "switch":
+            names = [self._app_name(entry) for entry in self.menu.apps]
+            name = request.get("app")
+            if name not in names:
+                raise ValueError(f"Unknown app {name!r}, expected one of {', '.join(names)}")
+            self.menu.launch_request = names.index(name)
+            self._leave(app)
+            return {}
+        if command == "menu":
+            self._leave(app)
+            return {}
+        if command == "brightness":
+            self.matrix.set_brightness(int(request["value"]))
+            return {"brightness": self.matrix.brightness}
+        if command == "text":
+            self._text = str(request.get("text", "")).upper()
+            self._text_color = _parse_color(request.get("color", colors.WHITE))
+            self._show_overlay("text", float(request.get("seconds", 5)))
+            return {}
+        if command == "frame":
+            rgb = base64.b64decode(request.get("rgb", ""), validate=True)
+            if len(rgb) != len(self._overlay_frame):
+                raise ValueError(
+                    f"Frame of {len(rgb)} bytes, the {self.matrix.width}x{self.matrix.height} matrix takes "
+                    f"{len(self._overlay_frame)}"
+                )
+            self._overlay_frame[:] = rgb
+            self._show_overlay("frame", float(request.get("seconds", 0)))
+            return {}
+        if command == "clear":
+            self.overlay = None
+            return {}
+        if command == "stats":
+            return {
+                "app": app.info(),
+                "fps": round(1 / self._frame_time, 1) if self._frame_time else 0.0,
+                "target_fps": app.target_fps,
+                "frames": self.frames,
+                "uptime": round(time.monotonic() - self.start_time, 1),
+                "brightness": self.matrix.brightness,
+                "width": self.matrix.width,
+                "height": self.matrix.height,
+                "overlay": self.overlay,
+                "pid": os.getpid(),
+            }
+        raise ValueError(f"Unknown command {command!r}")
+
+    @staticmethod
+    def _app_name(entry) -> str:
+        # WorkerApp wraps the menu's entry, whose info() is the app's class name
+        return getattr(entry, "app", entry).info()
+
+    def _leave(self, app) -> None:
+        if app is not self.menu:
+            app.keep_running = False
+
+    def _show_overlay(self, kind: str, seconds: float) -> None:
+        self.overlay = kind
+        self._overlay_start = time.monotonic()
+        self._overlay_until = self._overlay_start + seconds if seconds > 0 else float("inf")
+
+    def draw_overlay(self, matrix: LEDMatrix) -> bool:
+        """Draw the text or frame over the app's frame, True if there was one to restore after show()."""
+        if self.overlay is None:
+            return False
+        now = time.monotonic()
+        if now >= self._overlay_until:
+            self.overlay = None
+            return False
+        self._saved[:] = matrix.buffer
+        if self.overlay == "frame":
+            matrix.load(self._overlay_frame)
+        else:
+            self._draw_text(matrix, now - self._overlay_start)
+        return True
+
+    def _draw_text(self, matrix: LEDMatrix, elapsed: float) -> None:
+        from apps.base import FONT
+
+        matrix.clear()
+        text = self._text
+        width = len(text) * 4 - 1
+        if width <= matrix.width:
+            x = (matrix.width - width) // 2
+        else:  # Scroll in from the right edge, then around again
+            x = matrix.width - int(elapsed * TEXT_SCROLL_SPEED) % (width + matrix.width)
+        y = (matrix.height - 5) // 2
+        for char in text:
+            if -3 < x < matrix.width:
+                matrix.draw_pattern(x, y, FONT.get(char, FONT["?"]), self._text_color)
+            x += 4
+
+    def restore(self, matrix: LEDMatrix) -> None:
+        matrix.load(self._saved)
+
+
+def _parse_color(color) -> int:
+    # An 0xRRGGBB int, or the same as a hex string with or without "#"
+    if isinstance(color, str):
+        color = int(color.lstrip("#"), 16)
+    if not 0 <= color <= 0xFFFFFF:
+        raise ValueError(f"Color {color:#x} out of range")
+    return color
+
+
+def start_server(menu, matrix: LEDMatrix, path: str = DEFAULT_SOCKET) -> ControlServer:
+    server = ControlServer(menu, matrix, path)
+    server.start()
+    return server
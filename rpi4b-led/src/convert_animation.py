@@ -0,0 +1,72 @@
+"""
+Offline converter from GIF/APNG/WebP animations (or still images) to frame
+files for AnimationApp. Needs Pillow, which the wall itself does not:
+
+    python convert_animation.py logo.gif logo.leda --width 18 --height 9
+"""
+
+import argparse
+import logging
+from typing import Iterator, List, Tuple
+
+from PIL import Image, ImageSequence
+
+from frame_file import write_frame_file
+
+
+def _fit(image: Image.Image, width: int, height: int, mode: str) -> Image.Image:
+    if mode == "stretch":
+        return image.resize((width, height), Image.LANCZOS)
+    scale = (max if mode == "cover" else min)(width / image.width, height / image.height)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    resized = image.resize(size, Image.LANCZOS)
+    canvas = Image.new("RGB", (width, height))
+    canvas.paste(resized, ((width - size[0]) // 2, (height - size[1]) // 2))
+    return canvas
+
+
+def convert_frames(
+    paths: List[str],
+    width: int,
+    height: int,
+    fit: str = "contain",
+    colors: int = 64,
+    fps: float = 0,
+) -> Iterator[Tuple[bytes, int]]:
+    """Yield (rgb, duration_ms) for every frame of every input, sized to the matrix."""
+    for path in paths:
+        with Image.open(path) as source:
+            for frame in ImageSequence.Iterator(source):
+                duration = round(1000 / fps) if fps else int(frame.info.get("duration") or 100)
+                # Composite transparency over black, which is what an unlit LED shows
+                rgba = frame.convert("RGBA")
+                image = Image.new("RGB", rgba.size)
+                image.paste(rgba, mask=rgba.getchannel("A"))
+                image = _fit(image, width, height, fit)
+                if colors:
+                    # Fewer colors keep gradients from shimmering at this resolution
+                    image = image.quantize(colors=colors, dither=Image.Dither.NONE).convert("RGB")
+                yield image.tobytes(), duration
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Convert animations to LED matrix frame files")
+    parser.add_argument("inputs", nargs="+", help="Images or animations, played in order")
+    parser.add_argument("output", help="Frame file to write")
+    parser.add_argument("--width", type=int, default=10, help="Width of the matrix in pixels")
+    parser.add_argument("--height", type=int, default=10, help="Height of the matrix in pixels")
+    parser.add_argument(
+        "--fit", choices=["contain", "cover", "stretch"], default="contain", help="How to scale to the matrix"
+    )
+    parser.add_argument("--colors", type=int, default=64, help="Quantize to this many colors, 0 to keep all")
+    parser.add_argument("--fps", type=float, default=0, help="Override the frame durations of the inputs")
+    args = parser.parse_args()
+
+    count = write_frame_file(
+        args.output,
+        args.width,
+        args.height,
+        convert_frames(args.inputs, args.width, args.height, args.fit, args.colors, args.fps),
+    )
+    logging.info(f"Wrote {count} frames of {args.width}x{args.height} to {args.output}")
@@ -0,0 +1,72 @@
+"""
+Pre-rendered animations for the matrix, written by convert_animation.py and
+played back by AnimationApp straight from a memory map.
+
+Layout: a 16 byte header, one u32 duration in milliseconds per frame, then the
+frames as raw RGB pages of width * height * 3 bytes, row-major from the
+top-left pixel (the framebuffer layout, so a frame is copied as is).
+
+    magic       4s  b"LEDA"
+    version     u16 1
+    width       u16
+    height      u16
+    pad         u16
+    frame_count u32
+"""
+
+import mmap
+import struct
+from typing import Iterable, List, Tuple
+
+MAGIC = b"LEDA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHxxI")
+DURATION = struct.Struct("<I")
+
+
+def write_frame_file(path: str, width: int, height: int, frames: Iterable[Tuple[bytes, int]]) -> int:
+    """Write (rgb, duration_ms) frames to `path`, returning the number of frames."""
+    frames = list(frames)
+    frame_size = width * height * 3
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, height, len(frames)))
+        for _, duration in frames:
+            f.write(DURATION.pack(duration))
+        for rgb, _ in frames:
+            if len(rgb) != frame_size:
+                raise ValueError(f"Frame of {len(rgb)} bytes, expected {frame_size}")
+            f.write(rgb)
+    return len(frames)
+
+
+class FrameFile:
+    """A frame file mapped into memory, frames are read lazily by the page cache."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, self.frame_count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} frame file")
+        self.frame_size = self.width * self.height * 3
+        self.data_offset = HEADER.size + DURATION.size * self.frame_count
+        if len(self._mmap) < self.data_offset + self.frame_size * self.frame_count:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+        self.durations: List[float] = [
+            DURATION.unpack_from(self._mmap, HEADER.size + DURATION.size * i)[0] / 1000
+            for i in range(self.frame_count)
+        ]
+        if hasattr(mmap, "MADV_SEQUENTIAL"):  # Python 3.8+, read ahead while playing
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+        self._view = memoryview(self._mmap)
+
+    def frame(self, index: int) -> memoryview:
+        start = self.data_offset + index * self.frame_size
+        return self._view[start:start + self.frame_size]
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
@@ -0,0 +1,205 @@
+"""
+Frame-overrun watchdog: attributes hitches on the wall to code without running
+a profiler all the time. The frame loop tells the watchdog when each frame
+starts, its budget (1 / fps) and when each phase of it ends. A background
+thread checks on the running frame every few milliseconds; once the frame is
+`threshold` seconds past its deadline the thread starts sampling the main
+thread's stack (sys._current_frames()), and when the frame finally ends it
+writes the samples together with the frame's phase timings to a dump file.
+Frames that never end (hangs) are dumped after `hang_timeout` seconds.
+"""
+
+import collections
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+# Frames of the frame loop never have more phases than this
+MAX_PHASES = 16
+
+_watchdog: Optional["FrameWatchdog"] = None
+
+
+class FrameWatchdog:
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        sample_interval: float = 0.005,
+        dump_dir: str = "hitches",
+        max_dumps: int = 50,
+        hang_timeout: float = 5.0,
+    ) -> None:
+        self.threshold = threshold  # Seconds past the frame's deadline before sampling starts
+        self.sample_interval = sample_interval
+        self.dump_dir = dump_dir
+        self.max_dumps = max_dumps  # Per run, so a persistently slow app cannot fill the disk
+        self.hang_timeout = hang_timeout
+        self.dumps = 0
+        self._main_ident = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reports = queue.SimpleQueue()  # (frame number, app, budget, duration, phases) of overrun frames
+
+        # State of the running frame, written by the main thread only. The sampler
+        # reads it without a lock: the frame number tells it when a new frame began.
+        self.frame_number = 0
+        self.active = False
+        self.app = None
+        self.start_time = 0.0
+        self.deadline = 0.0
+        self.phase_names: List[Optional[str]] = [None] * MAX_PHASES
+        self.phase_times = [0.0] * MAX_PHASES
+        self.phase_count = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="frame-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    # Main thread side, called by the frame loop
+
+    def begin_frame(self, app, budget: float) -> None:
+        self.active = False
+        now = time.perf_counter()
+        self.app = app
+        self.start_time = now
+        self.deadline = now + budget
+        self.phase_count = 0
+        self.frame_number += 1
+        self.active = True
+
+    def mark(self, phase: str) -> None:
+        """Note the end of `phase` of the running frame."""
+        i = self.phase_count
+        if self.active and i < MAX_PHASES:
+            self.phase_names[i] = phase
+            self.phase_times[i] = time.perf_counter()
+            self.phase_count = i + 1
+
+    def end_frame(self) -> None:
+        if not self.active:  # A nested app's frames ran inside this one (the menu launching an app)
+            return
+        self.active = False
+        end = time.perf_counter()
+        if end > self.deadline + self.threshold:
+            budget = self.deadline - self.start_time
+            self._reports.put((self.frame_number, self.app, budget, end - self.start_time, self._phases()))
+
+    def _phases(self) -> List[Tuple[str, float]]:
+        phases = []
+        last = self.start_time
+        for i in range(min(self.phase_count, MAX_PHASES)):
+            phases.append((self.phase_names[i], self.phase_times[i] - last))
+            last = self.phase_times[i]
+        return phases
+
+    # Watchdog thread side
+
+    def _run(self) -> None:
+        sampled_frame = 0
+        samples: Dict[Tuple, int] = collections.Counter()
+        sample_start = 0.0
+        hang_dumped = False
+        while not self._stop.wait(self.sample_interval):
+            frame_number, active, deadline = self.frame_number, self.active, self.deadline
+            now = time.perf_counter()
+            if active and now > deadline + self.threshold:
+                if frame_number != sampled_frame:
+                    sampled_frame, sample_start, hang_dumped = frame_number, now, False
+                    samples = collections.Counter()
+                stack = sys._current_frames().get(self._main_ident)
+                if stack is not None:
+                    summary = traceback.extract_stack(stack)
+                    samples[tuple((line.filename, line.lineno, line.name, line.line) for line in summary)] += 1
+                if not hang_dumped and now - self.start_time > self.hang_timeout:
+                    hang_dumped = True
+                    budget = deadline - self.start_time
+                    self._dump(self.app, budget, now - self.start_time, self._phases(), samples, now - sample_start, True)
+
+            try:
+                while True:
+                    number, app, budget, duration, phases = self._reports.get_nowait()
+                    if number == sampled_frame and not hang_dumped:
+                        self._dump(app, budget, duration, phases, samples, now - sample_start, False)
+                    elif number != sampled_frame:
+                        # Over the threshold by less than a sample interval
+                        self._dump(app, budget, duration, phases, {}, 0.0, False)
+            except queue.Empty:
+                pass
+
+    def _dump(self, app, budget: float, duration: float, phases, samples, sampled: float, hung: bool) -> None:
+        name = app.info() if app is not None else "unknown"
+        if self.dumps >= self.max_dumps:
+            return
+        self.dumps += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.dump_dir, f"hitch-{stamp}-{self.dumps:03}-{name.split()[0]}.txt")
+        lines = [
+            f"{name}: frame {'still running after' if hung else 'took'} {duration * 1000:.1f}ms"
+            f" (budget {budget * 1000:.1f}ms, threshold {self.threshold * 1000:.0f}ms past it)",
+            "",
+            "Phases:" if phases else "Phases: none finished",
+        ]
+        lines += [f"  {phase:<10} {seconds * 1000:9.1f}ms" for phase, seconds in phases]
+        total = sum(samples.values())
+        lines += ["", f"Main thread stack samples: {total} over {sampled * 1000:.0f}ms"]
+        for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+            lines.append(f"\n{count} samples ({count / total:.0%}):")
+            lines.extend(line.rstrip("\n") for line in traceback.format_list(stack))
+        try:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            with open(path, "w") as dump:
+                dump.write("\n".join(lines) + "\n")
+        except OSError:
+            logging.error(f"Cannot write hitch dump {path}", exc_info=True)
+            return
+        logging.warning(f"{name} frame {'hung' if hung else 'overran'} ({duration * 1000:.0f}ms), see {path}")
+
+
+def start_watchdog(**kwargs) -> FrameWatchdog:
+    """Start watching the frames of every app, see FrameWatchdog for the arguments."""
+    global _watchdog
+    _watchdog = FrameWatchdog(**kwargs)
+    _watchdog.start()
+    return _watchdog
+
+
+def stop_watchdog() -> None:
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
+
+
+def begin_frame(app, budget: float) -> None:
+    if _watchdog is not None:
+        _watchdog.begin_frame(app, budget)
+
+
+def mark(phase: str) -> None:
+    if _watchdog is not None:
+        _watchdog.mark(phase)
+
+
+def end_frame() -> None:
+    if _watchdog is not None:
+        _watchdog.end_frame()
+
+
+def _forget_in_child() -> None:
+    # The sampling thread does not survive fork, app worker processes go unwatched
+    global _watchdog
+    _watchdog = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_in_child)
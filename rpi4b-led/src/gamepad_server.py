@@ -0,0 +1,317 @@
+"""
+In-process replacement for node-virtual-gamepads.
+
+Phones connect over WebSocket (the page served at "/") or send UDP datagrams to
+the same port. Every message is a JSON object, button indices follow
+VirtualButtons and axes 0/1 carry the d-pad:
+
+    {"type": "button", "index": 0, "value": 1}
+    {"type": "axis", "index": 0, "value": -1.0}
+    {"type": "hat", "index": 0, "value": [0, 1]}
+    {"type": "state", "buttons": [0, 1, ...], "axes": [0.0, 1.0]}
+    {"type": "bye"}
+
+UDP clients should prefer "state" messages since datagrams may get lost, and are
+dropped after `udp_timeout` seconds of silence.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from log_pipeline import RateLimiter
+from input_manager import (
+    VIRTUAL_JOYDEVICEADDED,
+    VIRTUAL_JOYDEVICEREMOVED,
+    VirtualButtons,
+)
+from websocket_server import (
+    Opcode,
+    accept_websocket,
+    is_websocket_upgrade,
+    read_http_request,
+    recv_message,
+    send_http_response,
+)
+
+NUM_AXES = 2
+NUM_HATS = 1
+
+_malformed_log = RateLimiter(5.0)
+
+
+class VirtualGamepad:
+    """A network gamepad exposing the subset of pygame.joystick.Joystick used by InputManager."""
+
+    _next_instance_id = 1000  # Keep clear of the ids SDL hands out
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.instance_id = VirtualGamepad._next_instance_id
+        VirtualGamepad._next_instance_id += 1
+        self.buttons = [0] * VirtualButtons.NUM
+        self.axes = [0.0] * NUM_AXES
+        self.hats = [(0, 0)] * NUM_HATS
+
+    def init(self) -> None:
+        pass
+
+    def get_instance_id(self) -> int:
+        return self.instance_id
+
+    def get_name(self) -> str:
+        # "Virtual" makes get_joystick_type() pick the VirtualButtons mapping
+        return f"Virtual Gamepad ({self.name})"
+
+    def get_numbuttons(self) -> int:
+        return len(self.buttons)
+
+    def get_button(self, button: int) -> int:
+        return self.buttons[button]
+
+    def get_numaxes(self) -> int:
+        return len(self.axes)
+
+    def get_axis(self, axis: int) -> float:
+        return self.axes[axis]
+
+    def get_numhats(self) -> int:
+        return len(self.hats)
+
+    def get_hat(self, hat: int) -> Tuple[int, int]:
+        return self.hats[hat]
+
+    def apply(self, message: dict) -> None:
+        kind = message.get("type")
+        if kind == "button":
+            index = int(message["index"])
+            if 0 <= index < len(self.buttons):
+                self.buttons[index] = 1 if message["value"] else 0
+        elif kind == "axis":
+            index = int(message["index"])
+            if 0 <= index < len(self.axes):
+                self.axes[index] = max(-1.0, min(1.0, float(message["value"])))
+        elif kind == "hat":
+            index = int(message["index"])
+            if 0 <= index < len(self.hats):
+                x, y = message["value"]
+                self.hats[index] = (int(x), int(y))
+        elif kind == "state":
+            for index, value in enumerate(message.get("buttons", [])[: len(self.buttons)]):
+                self.buttons[index] = 1 if value else 0
+            for index, value in enumerate(message.get("axes", [])[: len(self.axes)]):
+                self.axes[index] = max(-1.0, min(1.0, float(value)))
+
+
+CONTROLLER_PAGE = b"""<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1,user-scalable=no">
+<title>LED Matrix Gamepad</title>
+<style>
+body{margin:0;height:100vh;display:flex;justify-content:space-around;align-items:center;
+background:#222;font-family:sans-serif;user-select:none;-webkit-user-select:none;touch-action:none}
+.pad{display:grid;grid-template-columns:repeat(3,64px);grid-template-rows:repeat(3,64px);gap:6px}
+button{border:0;border-radius:12px;background:#555;color:#fff;font-size:20px}
+button.on{background:#aaa}
+.menu{display:flex;flex-direction:column;gap:12px}
+</style></head><body>
+<div class="pad">
+<span></span><button data-axis="1" data-value="-1">&#9650;</button><span></span>
+<button data-axis="0" data-value="-1">&#9664;</button><span></span><button data-axis="0" data-value="1">&#9654;</button>
+<span></span><button data-axis="1" data-value="1">&#9660;</button><span></span>
+</div>
+<div class="menu"><button data-button="6">BACK</button><button data-button="7">START</button></div>
+<div class="pad">
+<span></span><button data-button="3">Y</button><span></span>
+<button data-button="2">X</button><span></span><button data-button="1">B</button>
+<span></span><button data-button="0">A</button><span></span>
+</div>
+<script>
+var ws = new WebSocket("ws://" + location.host + "/gamepad");
+function send(m){ if (ws.readyState === 1) ws.send(JSON.stringify(m)); }
+function bind(el, down){
+  var b = el.dataset.button, a = el.dataset.axis;
+  el.classList.toggle("on", down);
+  if (b !== undefined) send({type: "button", index: +b, value: down ? 1 : 0});
+  else send({type: "axis", index: +a, value: down ? +el.dataset.value : 0});
+}
+document.querySelectorAll("button").forEach(function(el){
+  el.addEventListener("pointerdown", function(e){ e.preventDefault(); bind(el, true); });
+  ["pointerup", "pointercancel", "pointerleave"].forEach(function(t){
+    el.addEventListener(t, function(){ if (el.classList.contains("on")) bind(el, false); });
+  });
+});
+</script></body></html>
+"""
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "GamepadServer") -> None:
+        self.server = server
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        self.server.handle_udp_message(message, addr)
+
+
+class GamepadServer:
+    """Asyncio gamepad server running on its own thread next to the render loop."""
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+        max_clients: int = 4,
+        udp_timeout: float = 5.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_clients = max_clients
+        self.udp_timeout = udp_timeout
+        self._udp_clients: Dict[Tuple, Tuple[VirtualGamepad, float]] = {}
+        self._gamepads: List[VirtualGamepad] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="gamepad-server", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self) -> None:
+        # The loop is already closed if the server failed to start, e.g. the port was taken
+        if self._loop is not None and self._stop_event is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except Exception:
+            logging.error("Gamepad server stopped", exc_info=True)
+        finally:
+            self._ready.set()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        tcp_server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: _UdpProtocol(self), local_addr=(self.host, self.port)
+        )
+        reaper = asyncio.ensure_future(self._reap_udp_clients())
+        logging.info(f"Gamepad server listening on {self.host}:{self.port} (tcp/udp)")
+        self._ready.set()
+
+        await self._stop_event.wait()
+
+        reaper.cancel()
+        transport.close()
+        tcp_server.close()
+        await tcp_server.wait_closed()
+        for gamepad in list(self._gamepads):
+            self._disconnect(gamepad)
+
+    def _connect(self, name: str) -> Optional[VirtualGamepad]:
+        if len(self._gamepads) >= self.max_clients:
+            logging.warning(f"Rejecting gamepad {name}, {self.max_clients} already connected")
+            return None
+        gamepad = VirtualGamepad(name)
+        self._gamepads.append(gamepad)
+        pygame.event.post(pygame.event.Event(VIRTUAL_JOYDEVICEADDED, joystick=gamepad))
+        return gamepad
+
+    def _disconnect(self, gamepad: VirtualGamepad) -> None:
+        if gamepad not in self._gamepads:
+            return
+        self._gamepads.remove(gamepad)
+        pygame.event.post(
+            pygame.event.Event(VIRTUAL_JOYDEVICEREMOVED, joystick=gamepad)
+        )
+
+    def handle_udp_message(self, message: dict, addr) -> None:
+        if not isinstance(message, dict):
+            return
+        client = self._udp_clients.get(addr)
+        if message.get("type") == "bye":
+            if client is not None:
+                del self._udp_clients[addr]
+                self._disconnect(client[0])
+            return
+
+        if client is None:
+            gamepad = self._connect(f"udp {addr[0]}:{addr[1]}")
+            if gamepad is None:
+                return
+        else:
+            gamepad = client[0]
+        self._udp_clients[addr] = (gamepad, time.monotonic())
+        try:
+            gamepad.apply(message)
+        except (KeyError, TypeError, ValueError):
+            _malformed_log.log(logging.DEBUG, "Ignoring malformed gamepad message %r", message)
+
+    async def _reap_udp_clients(self) -> None:
+        while True:
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            for addr, (gamepad, last_seen) in list(self._udp_clients.items()):
+                if now - last_seen > self.udp_timeout:
+                    del self._udp_clients[addr]
+                    self._disconnect(gamepad)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername")
+        try:
+            method, path, headers = await read_http_request(reader)
+            if not is_websocket_upgrade(headers):
+                if method == "GET" and path in ("/", "/index.html"):
+                    await send_http_response(
+                        writer, "200 OK", CONTROLLER_PAGE, "text/html; charset=utf-8"
+                    )
+                else:
+                    await send_http_response(writer, "404 Not Found", b"not found")
+                return
+
+            await accept_websocket(writer, headers)
+            gamepad = self._connect(f"ws {peer[0]}:{peer[1]}")
+            if gamepad is None:
+                return
+            try:
+                while True:
+                    message = await recv_message(reader, writer)
+                    if message is None:
+                        break
+                    opcode, payload = message
+                    if opcode != Opcode.TEXT:
+                        continue
+                    try:
+                        data = json.loads(payload)
+                        if data.get("type") == "bye":
+                            break
+                        gamepad.apply(data)
+                    except (AttributeError, KeyError, TypeError, ValueError):
+                        _malformed_log.log(logging.DEBUG, "Ignoring malformed gamepad message %r", payload)
+            finally:
+                self._disconnect(gamepad)
+        except (ValueError, KeyError, ConnectionError, asyncio.IncompleteReadError):
+            logging.debug(f"Dropped gamepad connection from {peer}", exc_info=True)
+        finally:
+            writer.close()
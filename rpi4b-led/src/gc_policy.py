@@ -0,0 +1,68 @@
+"""
+Garbage collector policy for the frame loop. By default Python collects
+whenever enough container objects pile up, in the middle of whatever frame that
+happens to be. With idle collection on, automatic collection is turned off
+while an app runs, everything alive once it has started is frozen (gc.freeze())
+so no collection walks it again, and the frame loop collects the young
+generations itself in the time left before the next frame. A backlog that
+frames leave no time for is still collected, so memory stays bounded.
+"""
+
+import gc
+import time
+
+# Young objects worth a collection, and the backlog collected even without slack
+YOUNG_THRESHOLD = 700
+FORCE_THRESHOLD = 10 * YOUNG_THRESHOLD
+# Seconds left before the next frame needed to collect
+MIN_SLACK = 0.002
+# Every this many young collections also collect the middle generation
+MIDDLE_EVERY = 10
+
+_enabled = False
+_depth = 0  # Apps running, they nest (the menu runs the app it launches)
+_collections = 0
+
+
+def enable_idle_collection() -> None:
+    global _enabled
+    _enabled = True
+
+
+def app_started() -> None:
+    """Call once an app has set up its state, before its first frame."""
+    global _depth
+    if not _enabled:
+        return
+    if _depth == 0:
+        gc.disable()
+    _depth += 1
+    gc.freeze()
+
+
+def app_stopped() -> None:
+    """Call when an app's frame loop ends, collects what it left behind."""
+    global _depth
+    if not _enabled or _depth == 0:
+        return
+    _depth -= 1
+    gc.unfreeze()
+    gc.collect()
+    if _depth:
+        gc.freeze()  # Back to the app that launched it
+    else:
+        gc.enable()
+
+
+def collect_in_slack(deadline: float) -> None:
+    """Collect young objects if there is time until `deadline` (time.perf_counter()) or too many piled up."""
+    global _collections
+    if _depth == 0:
+        return
+    young = gc.get_count()[0]
+    if young < YOUNG_THRESHOLD:
+        return
+    if young < FORCE_THRESHOLD and deadline - time.perf_counter() < MIN_SLACK:
+        return
+    _collections += 1
+    gc.collect(1 if _collections % MIDDLE_EVERY == 0 else 0)
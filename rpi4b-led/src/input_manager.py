@@ -42,6 +42,11 @@ class GamepadType:
     NOSUPPORT = "Unknown"
 
 
+# Posted by in-process gamepad sources (see gamepad_server.py), e.joystick holds the device
+VIRTUAL_JOYDEVICEADDED = pygame.event.custom_type()
+VIRTUAL_JOYDEVICEREMOVED = pygame.event.custom_type()
+
+
 def get_joystick_type(joystick: pygame.joystick.Joystick) -> GamepadType:
     if GamepadType.NINTENDO in joystick.get_name():
         return GamepadType.NINTENDO
@@ -70,20 +75,28 @@ class InputManager:
         self.hats_states: Dict[int, List[int]] = {}
         for js in self.joysticks:
             self.update_joystick_states(js.get_instance_id(), js)
-        self.previous_button_states = self.button_states.copy()
+        self.previous_button_states = {
+            joystick_id: states.copy() for joystick_id, states in self.button_states.items()
+        }
         self._initialized = True
 
     def update_joystick_states(self, joystick_id, joystick):
-        self.button_states[joystick_id] = {
-            button: joystick.get_button(button)
-            for button in range(joystick.get_numbuttons())
-        }
-        self.axis_states[joystick_id] = [
-            joystick.get_axis(i) for i in range(joystick.get_numaxes())
-        ]
-        self.hats_states[joystick_id] = [
-            joystick.get_hat(i) for i in range(joystick.get_numhats())
-        ]
+        # Poll into the containers of the previous frame, so steady-state polling allocates nothing
+        buttons = self.button_states.get(joystick_id)
+        if buttons is None:
+            buttons = self.button_states[joystick_id] = {}
+        for button in range(joystick.get_numbuttons()):
+            buttons[button] = joystick.get_button(button)
+        axes = self.axis_states.get(joystick_id)
+        if axes is None or len(axes) != joystick.get_numaxes():
+            axes = self.axis_states[joystick_id] = [0.0] * joystick.get_numaxes()
+        for i in range(len(axes)):
+            axes[i] = joystick.get_axis(i)
+        hats = self.hats_states.get(joystick_id)
+        if hats is None or len(hats) != joystick.get_numhats():
+            hats = self.hats_states[joystick_id] = [(0, 0)] * joystick.get_numhats()
+        for i in range(len(hats)):
+            hats[i] = joystick.get_hat(i)
 
     def update(self) -> None:
         for joystick in self.joysticks:
@@ -95,6 +108,14 @@ class InputManager:
             # if self.previous_button_states != self.button_states:
             #     logging.info(self.button_states)
 
+    def consume_edges(self) -> None:
+        """Make the current button states the previous ones, so a press or release is reported only once."""
+        for joystick_id, states in self.button_states.items():
+            previous = self.previous_button_states.get(joystick_id)
+            if previous is None:
+                previous = self.previous_button_states[joystick_id] = {}
+            previous.update(states)
+
     def is_pressed(self, joystick_id: int, button: int) -> bool:
         return (
             self.button_states[joystick_id][button]
@@ -1,31 +1,136 @@
-from rpi_ws281x import PixelStrip, Color
+from rpi_ws281x import PixelStrip, ws
+from colors import CHANNEL_ORDERS
+from shared_frame import SharedFrame
 import os
 import sys
 
 class LEDMatrix:
 
-    def __init__(self, width, height, led_count, pin, pixel_width=1, pixel_height=1, freq_hz=800000, dma=10, brightness=255, invert=False, channel=0, simulate=False):
+    def __init__(self, width, height, led_count, pin, pixel_width=1, pixel_height=1, freq_hz=800000, dma=10, brightness=255, invert=False, channel=0, simulate=False, shm_name=None, headless=False, channel_order="RGB", output=None):
         self.width = width
         self.height = height
         self.pixel_width = pixel_width
         self.pixel_height = pixel_height
         self.led_count = led_count
         self.simulate = simulate
-        if not simulate:
-            self.strip = PixelStrip(led_count, pin, freq_hz, dma, invert, brightness, channel)
+        self.brightness = brightness
+        self.headless = headless  # Render into the framebuffer only, e.g. inside app worker processes
+        if channel_order not in CHANNEL_ORDERS:
+            raise ValueError(f"channel_order must be one of {', '.join(CHANNEL_ORDERS)}")
+        self.channel_order = channel_order
+        # Framebuffer: RGB bytes, row-major, (0, 0) is the top-left pixel
+        self.shared_frame = None
+        if shm_name:
+            # Expose the framebuffer to other processes, see shared_frame.py
+            self.shared_frame = SharedFrame.create(shm_name, width, height)
+            self.buffer = self.shared_frame.front_page()
+        else:
+            self.buffer = bytearray(width * height * 3)
+        self._blank = bytes(len(self.buffer))
+        self._array = None
+        self._bytes = None  # memoryview of the framebuffer, see _buffer_bytes()
+        self.frame_listeners = []
+        # Network output (see pixel_output.py) in place of the GPIO strip, sent pixels in LED order
+        self.output = output
+        if output is not None:
+            output.open([pixel_index for _, pixel_index in self._build_led_map()])
+            output.set_brightness(brightness)
+        elif not simulate and not headless:
+            # For the three-channel orders _pack_words already puts the bytes in wire order,
+            # WS2811_STRIP_RGB makes the driver send them as they are (its default would reorder them again)
+            strip_type = ws.SK6812_STRIP_RGBW if channel_order == "RGBW" else ws.WS2811_STRIP_RGB
+            self.strip = PixelStrip(led_count, pin, freq_hz, dma, invert, brightness, channel, strip_type)
             self.strip.begin()
-        self.pixels = [[(0, 0, 0) for _ in range(width)] for _ in range(height)]
+            self._led_map = self._build_led_map()
+            self._words = bytearray(width * height * 4)
+            self._word_values = memoryview(self._words).cast("I")
+            self._channel_copies = None  # (word bytes, buffer bytes) strided views, see _pack_words
+            # Byte offset within a native word for bits 0-7, 8-15, 16-23 and 24-31
+            self._byte_offsets = (0, 1, 2, 3) if sys.byteorder == "little" else (3, 2, 1, 0)
+            if channel_order == "RGBW":
+                import numpy as np
+
+                self._np = np
+                self._word_array = np.frombuffer(self._words, dtype=np.uint8).reshape(-1, 4)
+                self._white = np.empty(width * height, dtype=np.uint8)
+
+    def bind_buffer(self, buffer):
+        """Draw into and show from `buffer` (any writable RGB buffer of the framebuffer's size)."""
+        if len(buffer) != len(self._blank):
+            raise ValueError("buffer size does not match the matrix")
+        self.buffer = buffer
+        self._array = None
+        self._bytes = None
+        self._channel_copies = None
+
+    def close(self):
+        # Release the exports before the segment goes
+        self._array = None
+        self._bytes = None
+        self._channel_copies = None
+        if self.output is not None:
+            self.output.close()
+        if self.shared_frame is not None:
+            self.buffer = bytearray(self.buffer)
+            self.shared_frame.close()
+            self.shared_frame = None
+
+    def set_brightness(self, brightness):
+        """Scale the output to `brightness` (0-255); the framebuffer keeps full-range colors."""
+        self.brightness = max(0, min(255, int(brightness)))
+        if self.output is not None:
+            self.output.set_brightness(self.brightness)
+        elif not self.simulate and not self.headless:
+            self.strip.setBrightness(self.brightness)
 
     def set_pixel(self, x, y, color):
+        """Set a pixel to a packed 0xRRGGBB color (see colors.py) or an (r, g, b) tuple."""
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.pixels[y][x] = color
-            if not self.simulate:
-                for dx in range(self.pixel_width):
-                    for dy in range(self.pixel_height):
-                        actual_x = x * self.pixel_width + dx
-                        actual_y = (self.height - 1 - y) * self.pixel_height + dy  # Adjust for physical coordinate system
-                        led_index = self._get_led_index(actual_x, actual_y)
-                        self.strip.setPixelColor(led_index, Color(color[1], color[0], color[2]))  # Ensure correct RGB order
+            i = (y * self.width + x) * 3
+            buffer = self.buffer
+            if color.__class__ is int:
+                buffer[i] = color >> 16
+                buffer[i + 1] = (color >> 8) & 0xFF
+                buffer[i + 2] = color & 0xFF
+            else:
+                buffer[i] = color[0]
+                buffer[i + 1] = color[1]
+                buffer[i + 2] = color[2]
+
+    def get_pixel(self, x, y):
+        i = (y * self.width + x) * 3
+        return self.buffer[i], self.buffer[i + 1], self.buffer[i + 2]
+
+    def get_color(self, x, y):
+        """The pixel at (x, y) as a packed 0xRRGGBB color."""
+        i = (y * self.width + x) * 3
+        buffer = self.buffer
+        return (buffer[i] << 16) | (buffer[i + 1] << 8) | buffer[i + 2]
+
+    def array(self):
+        """The framebuffer as a (height, width, 3) uint8 numpy view for vectorized drawing."""
+        if self._array is None:
+            import numpy as np  # Only apps that draw with numpy pay for importing it
+
+            self._array = np.frombuffer(self.buffer, dtype=np.uint8).reshape(self.height, self.width, 3)
+        return self._array
+
+    def _buffer_bytes(self):
+        # Slice assignment to a bytearray first copies any source that is not a
+        # bytearray itself, assigning through a memoryview copies straight in
+        if self._bytes is None:
+            self._bytes = memoryview(self.buffer).cast("B")
+        return self._bytes
+
+    def load(self, frame):
+        """Copy a whole frame of RGB bytes (any buffer of the framebuffer's size) into the framebuffer."""
+        self._buffer_bytes()[:] = frame
+
+    def blit(self, data, offset=0):
+        """Copy raw RGB bytes into the framebuffer starting at byte `offset`, clipped to its end."""
+        size = min(len(data), len(self.buffer) - offset)
+        if offset >= 0 and size > 0:
+            self._buffer_bytes()[offset:offset + size] = memoryview(data)[:size]
 
     def _get_led_index(self, x, y):
         """Calculate the actual LED index for a given (x, y) coordinate."""
@@ -36,16 +141,76 @@ class LEDMatrix:
             # Odd row: right to left
             return y * self.width * self.pixel_width + (self.width * self.pixel_width - 1 - x)
 
+    def _build_led_map(self):
+        """Precompute (led_index, pixel_index) pairs so show() needs no coordinate math."""
+        led_map = []
+        for y in range(self.height):
+            for x in range(self.width):
+                for dx in range(self.pixel_width):
+                    for dy in range(self.pixel_height):
+                        actual_x = x * self.pixel_width + dx
+                        actual_y = (self.height - 1 - y) * self.pixel_height + dy  # Adjust for physical coordinate system
+                        led_map.append((self._get_led_index(actual_x, actual_y), y * self.width + x))
+        led_map.sort()
+        return led_map
+
+    def _pack_words(self):
+        # Interleave the RGB bytes into native 32-bit strip words in the configured
+        # channel order with extended slice copies instead of a per-pixel loop
+        offsets = self._byte_offsets
+        order = self.channel_order
+        if order == "RGBW":
+            # The white LED takes over what the three colors have in common
+            np = self._np
+            rgb = self.array().reshape(-1, 3)
+            white, out = self._white, self._word_array
+            np.minimum(np.minimum(rgb[:, 0], rgb[:, 1], out=white), rgb[:, 2], out=white)
+            out[:, offsets[3]] = white
+            np.subtract(rgb[:, 0], white, out=out[:, offsets[2]])
+            np.subtract(rgb[:, 1], white, out=out[:, offsets[1]])
+            np.subtract(rgb[:, 2], white, out=out[:, offsets[0]])
+        else:
+            if self._channel_copies is None:
+                # Memoryview slices copy between the strided bytes without a temporary
+                # bytearray per channel, made once per framebuffer
+                words, buffer = memoryview(self._words), memoryview(self.buffer)
+                # The first channel of the order lands in bits 16-23, which the driver sends first
+                self._channel_copies = tuple(
+                    (words[offset::4], buffer["RGB".index(channel)::3])
+                    for offset, channel in zip((offsets[2], offsets[1], offsets[0]), order)
+                )
+            for words, channel in self._channel_copies:
+                words[:] = channel
+        return self._word_values
+
     def show(self):
         if self.simulate:
             print("\033[H\033[J", end="")  # Clear screen and move cursor to the top-left corner
-            for row in self.pixels:
-                for pixel in row:
-                    print(self._color_to_char(pixel), end="")
+            buffer = self.buffer
+            for y in range(self.height):
+                row = y * self.width * 3
+                for i in range(row, row + self.width * 3, 3):
+                    print(self._color_to_char((buffer[i], buffer[i + 1], buffer[i + 2])), end="")
                 print()
             sys.stdout.flush()
-        else:
+        elif self.output is not None:
+            self.output.send(self.array())
+        elif not self.headless:
+            values = self._pack_words()
+            set_pixel_color = self.strip.setPixelColor
+            for led_index, pixel_index in self._led_map:
+                set_pixel_color(led_index, values[pixel_index])
             self.strip.show()
+        for listener in self.frame_listeners:
+            listener(self.buffer)
+
+    def add_frame_listener(self, listener):
+        """Call `listener(buffer)` after every show(). Listeners run on the render loop and must not block."""
+        self.frame_listeners.append(listener)
+
+    def remove_frame_listener(self, listener):
+        # Rebuild the list so a listener may remove itself while show() iterates
+        self.frame_listeners = [l for l in self.frame_listeners if l is not listener]
 
     def _color_to_char(self, color):
         if color == (0, 0, 0):
@@ -53,13 +218,19 @@ class LEDMatrix:
         return f"\033[48;2;{color[0]};{color[1]};{color[2]}m  \033[0m"  # Colored background
 
     def clear(self):
-        self.pixels = [[(0, 0, 0) for _ in range(self.width)] for _ in range(self.height)]
-        if not self.simulate:
-            for i in range(self.led_count):
-                self.strip.setPixelColor(i, 0)
+        self._buffer_bytes()[:] = self._blank
+
+    def draw_pattern(self, x_offset, y_offset, pattern, color, background=0):
+        """
+        Draw a pattern of strings, "#" in `color` and anything else in `background`
+        (packed colors), like draw_sprite() but without building a sprite first.
+        """
+        for y, row in enumerate(pattern):
+            for x, pixel in enumerate(row):
+                self.set_pixel(x + x_offset, y + y_offset, color if pixel == "#" else background)
 
     def draw_sprite(self, x_offset, y_offset, sprite):
         for y, row in enumerate(sprite):
             for x, color in enumerate(row):
                 if 0 <= x + x_offset < self.width and 0 <= y + y_offset < self.height:
-                    self.set_pixel(x + x_offset, y + y_offset, color)
\ No newline at end of file
+                    self.set_pixel(x + x_offset, y + y_offset, color)
@@ -0,0 +1,116 @@
+"""
+Command line client of the wall's control socket (main.py --control-socket,
+protocol in control_server.py):
+
+    python ledctl.py apps
+    python ledctl.py switch TetrisApp
+    python ledctl.py menu
+    python ledctl.py brightness 64
+    python ledctl.py text "HELLO" --color ff8000 --seconds 5
+    python ledctl.py frame logo.png --seconds 10
+    python ledctl.py clear
+    python ledctl.py stats
+
+Needs only the standard library, plus pygame for frames from image files.
+"""
+
+import argparse
+import base64
+import json
+import socket
+import sys
+
+DEFAULT_SOCKET = "/tmp/led-matrix.sock"
+
+
+class ControlClient:
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: float = 5.0) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, cmd: str, **fields) -> dict:
+        """Send one command and return the reply, raising RuntimeError when the wall refuses it."""
+        self.file.write(json.dumps({"cmd": cmd, **fields}).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise RuntimeError("The wall closed the connection")
+        reply = json.loads(line)
+        if not reply.pop("ok"):
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+
+def read_frame(path: str, width: int, height: int) -> bytes:
+    """RGB bytes of a matrix-sized frame: a raw file of width * height * 3 bytes, or an image scaled to fit."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) == width * height * 3:
+        return data
+    import pygame
+
+    image = pygame.image.load(path)
+    if image.get_size() != (width, height):
+        image = pygame.transform.scale(image, (width, height))
+    return pygame.image.tobytes(image, "RGB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Control a running LED matrix")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Control socket of the wall")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("apps", help="List the menu's apps")
+    switch = commands.add_parser("switch", help="Launch an app, leaving the running one")
+    switch.add_argument("app", help="App name as listed by apps")
+    commands.add_parser("menu", help="Leave the running app for the menu")
+    brightness = commands.add_parser("brightness", help="Set the brightness")
+    brightness.add_argument("value", type=int, help="0-255")
+    text = commands.add_parser("text", help="Show a message over the running app")
+    text.add_argument("text")
+    text.add_argument("--color", default="ffffff", help="Hex RGB color")
+    text.add_argument("--seconds", type=float, default=5, help="How long to show it, 0 until clear")
+    frame = commands.add_parser("frame", help="Show a frame over the running app")
+    frame.add_argument("file", help="Image file, or raw RGB of width * height * 3 bytes")
+    frame.add_argument("--seconds", type=float, default=0, help="How long to show it, 0 until clear")
+    commands.add_parser("clear", help="Remove the message or frame")
+    commands.add_parser("stats", help="Print the running app, frame rate and settings")
+    args = parser.parse_args()
+
+    try:
+        client = ControlClient(args.socket)
+    except OSError as e:
+        sys.exit(f"Cannot connect to {args.socket}: {e}")
+    try:
+        if args.command == "apps":
+            print("\n".join(client.request("apps")["apps"]))
+        elif args.command == "switch":
+            client.request("switch", app=args.app)
+        elif args.command == "menu":
+            client.request("menu")
+        elif args.command == "brightness":
+            client.request("brightness", value=args.value)
+        elif args.command == "text":
+            client.request("text", text=args.text, color=args.color, seconds=args.seconds)
+        elif args.command == "frame":
+            stats = client.request("stats")
+            rgb = read_frame(args.file, stats["width"], stats["height"])
+            client.request("frame", rgb=base64.b64encode(rgb).decode(), seconds=args.seconds)
+        elif args.command == "clear":
+            client.request("clear")
+        elif args.command == "stats":
+            for key, value in client.request("stats").items():
+                print(f"{key}: {value}")
+    except RuntimeError as e:
+        sys.exit(str(e))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
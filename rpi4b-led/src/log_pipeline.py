@@ -0,0 +1,196 @@
+"""
+Logging that stays out of the frame loop: log calls only format the record and
+put it on a queue, a background listener thread does the file and console I/O.
+Hot log sites go through a RateLimiter, and LOG_COST adds up the time logging
+takes on the main thread so the frame loop can report when it eats into a frame.
+Forked children (app worker processes) send their records to the parent, which
+alone writes and rotates the log file.
+"""
+
+import logging
+import os
+import pickle
+import queue
+import socket
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional, Tuple
+
+MAX_CHILD_RECORD = 64 * 1024  # Bytes of a pickled record from a child, well within one datagram
+# Fields of a record that are small whatever was logged, all a placeholder record keeps
+_HEADER_FIELDS = (
+    "name", "levelno", "levelname", "pathname", "filename", "module", "lineno", "funcName",
+    "created", "msecs", "relativeCreated", "thread", "threadName", "processName", "process",
+)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+# Datagram socket pair children send their records over, and the parent's thread receiving them
+_from_children: Optional[socket.socket] = None
+_to_parent: Optional[socket.socket] = None
+_receiver: Optional[threading.Thread] = None
+
+
+class LogCost:
+    """Time spent handing log records to the queue on the main thread."""
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.seconds = 0.0
+        self.total_records = 0
+        self.total_seconds = 0.0
+        self.worst_frame = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.records += 1
+        self.seconds += seconds
+
+    def take(self) -> Tuple[int, float]:
+        """Return and reset (records, seconds) since the last call, once per frame."""
+        records, seconds = self.records, self.seconds
+        self.records = 0
+        self.seconds = 0.0
+        self.total_records += records
+        self.total_seconds += seconds
+        self.worst_frame = max(self.worst_frame, seconds)
+        return records, seconds
+
+
+LOG_COST = LogCost()
+
+
+class TimedQueueHandler(QueueHandler):
+    def handle(self, record: logging.LogRecord) -> bool:
+        if record.thread != threading.main_thread().ident:
+            return super().handle(record)
+        start = time.perf_counter()
+        try:
+            return super().handle(record)
+        finally:
+            LOG_COST.add(time.perf_counter() - start)
+
+
+class RateLimiter:
+    """Lets one message through per `interval` seconds and counts the ones it drops."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.suppressed = 0
+        self._next_time = 0.0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_time:
+            self.suppressed += 1
+            return False
+        self._next_time = now + self.interval
+        return True
+
+    def log(self, level: int, msg: str, *args, **kwargs) -> None:
+        """logging.log() if allowed, noting how many messages were dropped before this one."""
+        if not self.allow():
+            return
+        if self.suppressed:
+            msg += f" ({self.suppressed} similar messages suppressed)"
+            self.suppressed = 0
+        logging.log(level, msg, *args, **kwargs)
+
+
+class _ParentHandler(logging.Handler):
+    """Sends records, as prepared by QueueHandler, to the parent process."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        super().__init__()
+        self.sock = sock
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            fields = dict(record.__dict__)
+            data = pickle.dumps(fields, pickle.HIGHEST_PROTOCOL)
+            if len(data) > MAX_CHILD_RECORD:
+                # QueueHandler.prepare() left the formatted text, traceback included, in both msg and
+                # message. Cut its UTF-8 encoding by the bytes over, with room for the note
+                text = fields["msg"].encode()
+                keep = len(text) - (len(data) - MAX_CHILD_RECORD) - 64
+                fields["msg"] = fields["message"] = text[:max(keep, 0)].decode(errors="ignore") + " [cut]"
+                data = pickle.dumps(fields, pickle.HIGHEST_PROTOCOL)
+            if len(data) > MAX_CHILD_RECORD:  # Other fields are too large, e.g. from extra=
+                fields = {name: getattr(record, name, None) for name in _HEADER_FIELDS}
+                fields["msg"] = fields["message"] = f"A record of {len(data)} bytes was too large to forward"
+                data = pickle.dumps(fields, pickle.HIGHEST_PROTOCOL)
+            self.sock.send(data)
+        except Exception:
+            self.handleError(record)
+
+
+def _receive_from_children(sock: socket.socket, records: queue.SimpleQueue) -> None:
+    while True:
+        data = sock.recv(MAX_CHILD_RECORD + 1)  # One byte more to notice a record cut short
+        if not data:  # Sent by stop_logging()
+            return
+        try:
+            if len(data) > MAX_CHILD_RECORD:
+                raise ValueError(f"record over {MAX_CHILD_RECORD} bytes")
+            record = logging.makeLogRecord(pickle.loads(data))
+        except Exception as e:
+            # A damaged record must not stop the logging of the others, but should not vanish either
+            record = logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"Dropped a damaged log record from a child process: {e!r}",
+            })
+        records.put(record)
+
+
+def _restart_in_child() -> None:
+    # Neither the listener thread nor records queued by the parent belong to a
+    # forked child (app worker processes), give it a queue and listener of its
+    # own that passes records on to the parent: two processes writing and
+    # rotating the same file would lose records
+    global _listener, _receiver
+    if _listener is None:
+        return
+    _receiver = None
+    _from_children.close()
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, _ParentHandler(_to_parent))
+    _listener.start()
+
+
+def setup_logging(path: str = "app.log", level: int = logging.DEBUG) -> QueueListener:
+    """Route the root logger through a queue to a rotating file and stdout, returning the running listener."""
+    global _listener, _queue_handler, _from_children, _to_parent, _receiver
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    file_handler = RotatingFileHandler(path, maxBytes=5 * 1024 * 1024, backupCount=1)  # 5 MB max size
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    _queue_handler = TimedQueueHandler(records)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(records, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    _from_children, _to_parent = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    _receiver = threading.Thread(
+        target=_receive_from_children, args=(_from_children, records), name="log-children", daemon=True
+    )
+    _receiver.start()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_in_child)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Write out everything still queued and stop the listener."""
+    if _receiver is not None:
+        _to_parent.send(b"")
+        _receiver.join(timeout=1)
+    if _listener is not None:
+        _listener.stop()
@@ -1,34 +1,56 @@
+import time
+
+STARTUP_TIME = time.perf_counter()
+
 import logging
 import argparse
 from typing import List
 from led_matrix import LEDMatrix
-from apps import MenuApp, ClockApp, SnakeApp, TetrisApp, ScreenTestApp
+from apps import MenuApp, LazyApp, discover_apps
 import pygame
 import sys
-from logging.handlers import RotatingFileHandler
+import frame_watchdog
+import gc_policy
 from input_manager import InputManager
+from log_pipeline import setup_logging, stop_logging
+
+# Menu entries in order, with extra constructor arguments
+MENU_APPS = [
+    ("ClockApp", {}),
+    ("TetrisApp", {}),
+    ("SnakeApp", {}),
+    ("ScreenTestApp", {"clear_before_render": False}),
+    ("LifeApp", {}),
+    ("SkyApp", {}),
+    ("PixelReceiverApp", {}),
+]
+
+# Setup logging, file and console output happen on a background thread
+setup_logging("app.log", logging.DEBUG)
 
-# Setup logging
-log_formatter = logging.Formatter(
-    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-log_handler = RotatingFileHandler(
-    "app.log", maxBytes=5 * 1024 * 1024, backupCount=1
-)  # 5 MB max size
-log_handler.setFormatter(log_formatter)
-log_handler.setLevel(logging.DEBUG)
 
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(log_formatter)
-console_handler.setLevel(logging.DEBUG)
+class StartupTimer:
+    """Collects the time spent in each start-up phase up to the first menu frame."""
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    handlers=[log_handler, console_handler],
-)
+    def __init__(self, start: float) -> None:
+        self.last = start
+        self.start = start
+        self.phases = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> str:
+        parts = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases)
+        return f"{parts}; first frame after {(self.last - self.start) * 1000:.0f}ms"
 
 
 def main() -> None:
+    startup = StartupTimer(STARTUP_TIME)
+    startup.mark("imports")
+
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="LED Matrix Application")
     parser.add_argument(
@@ -49,12 +71,107 @@ def main() -> None:
     parser.add_argument(
         "--fps", type=int, default=30, help="frequency of frames per second"
     )
+    parser.add_argument(
+        "--channel-order",
+        default="RGB",
+        choices=["RGB", "GRB", "BGR", "RGBW"],
+        help="Order the strip expects the color channels in",
+    )
+    parser.add_argument(
+        "--output",
+        default="strip",
+        choices=["strip", "ddp", "e131"],
+        help="Drive the GPIO strip or a network pixel controller over DDP or E1.31 (sACN)",
+    )
+    parser.add_argument(
+        "--output-host", help="Address of the pixel controller, or multicast for E1.31 multicast"
+    )
+    parser.add_argument(
+        "--output-port", type=int, help="UDP port of the pixel controller (default: 4048 DDP, 5568 E1.31)"
+    )
+    parser.add_argument(
+        "--universe", type=int, default=1, help="First E1.31 universe, 170 pixels each"
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Send only the packets whose pixels changed, the whole frame once a second",
+    )
     parser.add_argument(
         "--turn-off-leds", action="store_true", help="Turn off all LEDs and exit"
     )
+    parser.add_argument(
+        "--gamepad-server",
+        action="store_true",
+        help="Accept phone gamepads in-process instead of via node-virtual-gamepads",
+    )
+    parser.add_argument(
+        "--gamepad-port", type=int, default=8765, help="TCP/UDP port of the gamepad server"
+    )
+    parser.add_argument(
+        "--web-preview", action="store_true", help="Serve a live preview of the matrix over HTTP"
+    )
+    parser.add_argument(
+        "--preview-port", type=int, default=8080, help="HTTP port of the web preview"
+    )
+    parser.add_argument(
+        "--preview-fps", type=float, default=10, help="Maximum frame rate streamed to preview viewers"
+    )
+    parser.add_argument(
+        "--control-socket",
+        nargs="?",
+        const="/tmp/led-matrix.sock",
+        help="Accept ledctl.py commands (switch app, brightness, text, frame, stats) on this Unix socket",
+    )
+    parser.add_argument(
+        "--shm-name", help="Expose the framebuffer as a named shared-memory segment"
+    )
+    parser.add_argument(
+        "--animations", help="Frame file or directory of frame files to add an animation player for"
+    )
+    parser.add_argument(
+        "--audio",
+        help="PCM source for the spectrum visualizer: a WAV file, a FIFO or - for stdin (raw s16le stereo 44.1 kHz)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="DEBUG",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Lowest level written to app.log and stdout",
+    )
+    parser.add_argument(
+        "--gc-idle",
+        action="store_true",
+        help="Freeze objects alive at app start and collect garbage only in the slack between frames",
+    )
+    parser.add_argument(
+        "--hitch-threshold",
+        type=float,
+        help="Sample the main thread's stack when a frame runs this many ms past its deadline"
+        " and dump the samples with the frame's phase timings",
+    )
+    parser.add_argument(
+        "--hitch-dir", default="hitches", help="Directory of the --hitch-threshold dumps"
+    )
+    parser.add_argument(
+        "--app-processes",
+        action="store_true",
+        help="Run each app in its own worker process for crash isolation",
+    )
     args = parser.parse_args()
+    if args.output != "strip" and not args.output_host:
+        parser.error(f"--output {args.output} needs --output-host")
+    logging.getLogger().setLevel(args.log_level)
+    if args.gc_idle:
+        gc_policy.enable_idle_collection()
+    if args.hitch_threshold is not None:
+        frame_watchdog.start_watchdog(threshold=args.hitch_threshold / 1000, dump_dir=args.hitch_dir)
 
-    pygame.init()
+    # Only the event queue (part of the video subsystem) and joysticks are used,
+    # skip the other subsystems pygame.init() would start, audio in particular
+    pygame.display.init()
+    pygame.joystick.init()
+    startup.mark("pygame")
     joysticks = []
     for i in range(pygame.joystick.get_count()):
         joystick = pygame.joystick.Joystick(i)
@@ -73,6 +190,24 @@ def main() -> None:
     # Initialize the InputManager with joysticks
     input_manager = InputManager(joysticks)
 
+    gamepad_server = None
+    web_preview = None
+    control = None
+    if args.gamepad_server:
+        from gamepad_server import GamepadServer
+
+        gamepad_server = GamepadServer(port=args.gamepad_port)
+        gamepad_server.start()
+
+    output = None
+    if args.output != "strip":
+        from pixel_output import OUTPUTS
+
+        options = {"universe": args.universe} if args.output == "e131" else {}
+        output = OUTPUTS[args.output](
+            args.output_host, args.output_port, skip_unchanged=args.skip_unchanged, **options
+        )
+
     try:
         # Initialize the LED matrix
         matrix = LEDMatrix(
@@ -83,37 +218,72 @@ def main() -> None:
             args.pixel_width,
             args.pixel_height,
             simulate=simulate,
+            shm_name=args.shm_name,
+            channel_order=args.channel_order,
+            output=output,
         )
 
         matrix.clear()
         matrix.show()
+        startup.mark("matrix")
 
         if args.turn_off_leds:
             return
 
-        # Menu options
-        app_items = [
-            ClockApp(matrix, target_fps=args.fps),
-            TetrisApp(matrix, target_fps=args.fps),
-            SnakeApp(matrix, target_fps=args.fps),
-            ScreenTestApp(matrix, target_fps=args.fps, clear_before_render=False),
-        ]
+        if args.web_preview:
+            from web_preview import WebPreviewServer
+
+            web_preview = WebPreviewServer(matrix, port=args.preview_port, max_fps=args.preview_fps)
+            web_preview.start()
+
+        # Menu options, imported and constructed on first launch
+        app_specs = discover_apps()
+        menu_entries = list(MENU_APPS)
+        if args.shm_name:
+            menu_entries.append(("ExternalFrameApp", {}))
+        if args.animations:
+            menu_entries.append(("AnimationApp", {"path": args.animations}))
+        if args.audio:
+            menu_entries.append(("SpectrumApp", {"source": args.audio}))
 
         # Initialize the menu app
-        menu_app = MenuApp(matrix, target_fps=args.fps)
+        menu_app = MenuApp(matrix, target_fps=args.fps, app_processes=args.app_processes)
 
         # Register all apps
-        for app in app_items:
-            menu_app.reg_app(app)
+        for name, app_kwargs in menu_entries:
+            menu_app.reg_app(LazyApp(app_specs[name], matrix, target_fps=args.fps, **app_kwargs))
+        startup.mark("apps")
+
+        if args.control_socket:
+            import control_server
+
+            control = control_server.start_server(menu_app, matrix, args.control_socket)
 
+        def on_first_frame(buffer) -> None:
+            matrix.remove_frame_listener(on_first_frame)
+            startup.mark("first frame")
+            logging.info(f"Startup: {startup.report()}")
+
+        matrix.add_frame_listener(on_first_frame)
         menu_app.execute()
     except:
         logging.error("An error occurred", exc_info=True)
     finally:
         logging.debug("exit")
+        frame_watchdog.stop_watchdog()
+        if gamepad_server is not None:
+            gamepad_server.stop()
+        if web_preview is not None:
+            web_preview.stop()
+        if control is not None:
+            control.stop()
         matrix.clear()
         matrix.show()
+        matrix.close()
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        stop_logging()  # Flush queued records
@@ -0,0 +1,244 @@
+"""
+Particle effects for any app: sparks, explosions, fireworks, rain, snow.
+
+Particles are rows of preallocated parallel arrays (position, velocity, color,
+age and lifetime) rather than objects, so emitting, moving, retiring and
+drawing thousands of them are a handful of numpy operations per frame. The pool
+has a fixed capacity, emitting into a full pool drops the extra particles, and
+dead particles are recycled by moving the last live ones into their slots.
+"""
+
+import math
+from typing import Tuple, Union
+
+import numpy as np
+
+import color_tables
+import colors
+from led_matrix import LEDMatrix
+
+# A scalar for all new particles or one value per particle
+Values = Union[float, np.ndarray]
+
+
+class ParticleSystem:
+    """
+    A fixed-capacity pool of particles in matrix coordinates (pixels, y down).
+    Call update() once per simulation step and render() once per frame, after
+    the app has drawn its own content, which the particles are added onto.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        gravity: Tuple[float, float] = (0.0, 0.0),
+        drag: float = 0.0,
+        fade: bool = True,
+        seed=None,
+    ) -> None:
+        self.capacity = capacity
+        self.gravity = gravity  # Pixels per second squared
+        self.drag = drag  # Share of the velocity lost per second
+        self.fade = fade  # Dim particles linearly over their lifetime
+        self.count = 0  # Live particles are the first `count` rows
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.life = np.ones(capacity, dtype=np.float32)
+        self.rgb = np.zeros((capacity, 3), dtype=np.float32)
+        self._accumulator = None  # Per-pixel sums of render(), made for the first matrix drawn on
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def emit(
+        self,
+        count: int,
+        x: Values,
+        y: Values,
+        vx: Values = 0.0,
+        vy: Values = 0.0,
+        life: Values = 1.0,
+        color=colors.WHITE,
+    ) -> int:
+        """
+        Add up to `count` particles. Every other argument is a scalar shared by
+        all of them or an array of `count` values; `color` is a packed color or
+        an array of them. Returns how many fitted into the pool.
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+        new = slice(self.count, self.count + count)
+        for array, values in ((self.x, x), (self.y, y), (self.vx, vx), (self.vy, vy), (self.life, life)):
+            array[new] = values if np.ndim(values) == 0 else values[:count]
+        self.age[new] = 0
+        packed = np.asarray(color, dtype=np.uint32)
+        if packed.ndim:
+            packed = packed[:count]
+        self.rgb[new, 0] = (packed >> 16) & 0xFF
+        self.rgb[new, 1] = (packed >> 8) & 0xFF
+        self.rgb[new, 2] = packed & 0xFF
+        self.count += count
+        return count
+
+    def burst(self, x: Values, y: Values, count: int, speed: float, life: float, color=colors.WHITE) -> int:
+        """Explode `count` particles from (x, y) in all directions at up to `speed` pixels per second."""
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        # sqrt spreads the speeds so the burst fills a disc instead of a ring
+        magnitude = speed * np.sqrt(self.rng.uniform(0.05, 1, count))
+        return self.emit(
+            count,
+            x,
+            y,
+            np.cos(angle) * magnitude,
+            np.sin(angle) * magnitude,
+            life * self.rng.uniform(0.6, 1, count),
+            color,
+        )
+
+    def update(self, delta_time: float) -> None:
+        n = self.count
+        if not n:
+            return
+        vx, vy = self.vx[:n], self.vy[:n]
+        gx, gy = self.gravity
+        if gx:
+            vx += gx * delta_time
+        if gy:
+            vy += gy * delta_time
+        if self.drag:
+            keep = max(0.0, 1 - self.drag * delta_time)
+            vx *= keep
+            vy *= keep
+        self.x[:n] += vx * delta_time
+        self.y[:n] += vy * delta_time
+        age = self.age[:n]
+        age += delta_time
+        dead = np.flatnonzero(age >= self.life[:n])
+        if len(dead):
+            self._recycle(dead)
+
+    def _recycle(self, dead: np.ndarray) -> None:
+        # Swap-remove in bulk: the live particles among the last len(dead) rows
+        # move into the dead rows before that point, then the pool shrinks
+        n = self.count
+        keep = n - len(dead)
+        holes = dead[dead < keep]
+        if len(holes):
+            tail = np.arange(keep, n)
+            movers = np.setdiff1d(tail, dead, assume_unique=True)
+            for array in (self.x, self.y, self.vx, self.vy, self.age, self.life, self.rgb):
+                array[holes] = array[movers]
+        self.count = keep
+
+    def render(self, matrix: LEDMatrix, brightness: float = 1.0) -> None:
+        """Add the particles onto the framebuffer, saturating at white, overlapping particles add up."""
+        n = self.count
+        if not n:
+            return
+        width, height = matrix.width, matrix.height
+        px = np.floor(self.x[:n]).astype(np.intp)
+        py = np.floor(self.y[:n]).astype(np.intp)
+        visible = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        pixels = (py * width + px)[visible]
+        weight = (1 - self.age[:n] / self.life[:n])[visible] if self.fade else np.ones(len(pixels), np.float32)
+        if brightness != 1.0:
+            weight *= brightness
+        rgb = self.rgb[:n][visible]
+
+        size = width * height
+        if self._accumulator is None or len(self._accumulator) != size:
+            self._accumulator = np.empty((size, 3), dtype=np.float32)
+        accumulator = self._accumulator
+        for channel in range(3):
+            accumulator[:, channel] = np.bincount(pixels, weights=rgb[:, channel] * weight, minlength=size)
+        view = matrix.array().reshape(-1, 3)
+        accumulator += view
+        np.minimum(accumulator, 255, out=accumulator)
+        np.copyto(view, accumulator, casting="unsafe")
+
+
+class Emitter:
+    """
+    Emits `rate` particles per second into `system`, each at a uniformly random
+    position and velocity within the given (low, high) ranges, for rain, snow
+    and other steady streams. Fractions of a particle carry over to the next step.
+    """
+
+    def __init__(
+        self,
+        system: ParticleSystem,
+        rate: float,
+        x: Tuple[float, float],
+        y: Tuple[float, float],
+        vx: Tuple[float, float] = (0.0, 0.0),
+        vy: Tuple[float, float] = (0.0, 0.0),
+        life: Tuple[float, float] = (1.0, 1.0),
+        color=colors.WHITE,
+    ) -> None:
+        self.system = system
+        self.rate = rate
+        self.x, self.y, self.vx, self.vy, self.life = x, y, vx, vy, life
+        self.color = color
+        self._pending = 0.0
+
+    def update(self, delta_time: float) -> None:
+        self._pending += self.rate * delta_time
+        count = int(self._pending)
+        if not count:
+            return
+        self._pending -= count
+        uniform = self.system.rng.uniform
+        self.system.emit(
+            count,
+            uniform(*self.x, count),
+            uniform(*self.y, count),
+            uniform(*self.vx, count),
+            uniform(*self.vy, count),
+            uniform(*self.life, count),
+            self.color,
+        )
+
+
+def rain(system: ParticleSystem, width: int, height: int, intensity: float = 1.0) -> Emitter:
+    """Blue drops falling straight down from above the top edge."""
+    return Emitter(
+        system,
+        rate=width * 4 * intensity,
+        x=(0, width),
+        y=(-1, 0),
+        vx=(-0.5, 0.5),
+        vy=(height * 1.5, height * 2.5),
+        life=(0.6, 1.0),
+        color=0x3060FF,
+    )
+
+
+def snow(system: ParticleSystem, width: int, height: int, intensity: float = 1.0) -> Emitter:
+    """White flakes drifting slowly down and sideways."""
+    return Emitter(
+        system,
+        rate=width * 0.6 * intensity,
+        x=(-2, width + 2),
+        y=(-1, 0),
+        vx=(-1.5, 1.5),
+        vy=(height * 0.1, height * 0.25),
+        life=(4.0, 10.0),  # Long enough to fall past the bottom edge at those speeds
+        color=colors.WHITE,
+    )
+
+
+def firework(system: ParticleSystem, width: int, height: int, count: int = 60) -> int:
+    """One shell bursting at a random spot in the upper part of the matrix, in a random wheel color."""
+    rng = system.rng
+    x = rng.uniform(width * 0.15, width * 0.85)
+    y = rng.uniform(height * 0.15, height * 0.6)
+    color = color_tables.wheel_table()[int(rng.integers(256))]
+    return system.burst(x, y, count, speed=max(width, height) * 0.6, life=1.2, color=color)
@@ -0,0 +1,275 @@
+"""
+Network output for LEDMatrix: drives pixel controllers (ESP32 with WLED and the
+like) over DDP or E1.31 (sACN) instead of the Pi's GPIO strip.
+
+Frames go out in LED order (the same serpentine mapping as the GPIO strip) as
+RGB, the controller applies its own color order. Every packet of a frame is
+preallocated with its header filled in once; sending a frame gathers the pixels
+into LED order, copies each packet's share into its payload and sends the
+packets back to back, the last one flagged PUSH (DDP) or followed by a
+synchronization packet (E1.31) so the controller shows the frame at once.
+
+With skip_unchanged, packets whose pixels did not change since they were last
+sent are left out, a frame without changes sends nothing, and the whole frame
+is still resent every `keepalive` seconds since controllers fall back to their
+own effects when the stream goes quiet.
+"""
+
+import abc
+import logging
+import socket
+import struct
+import time
+import uuid
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from log_pipeline import RateLimiter
+
+DDP_PORT = 4048
+E131_PORT = 5568
+
+DDP_HEADER = struct.Struct("!BBBBIH")
+DDP_VERSION_1 = 0x40
+DDP_FLAG_PUSH = 0x01
+DDP_TYPE_RGB24 = 0x0B
+DDP_DEVICE_DISPLAY = 1
+DDP_MAX_DATA = 1440  # What receivers expect at most, 480 pixels
+
+E131_ACN_ID = b"ASC-E1.17\x00\x00\x00"
+E131_ROOT = struct.Struct("!HH12sHI16s")
+E131_FRAMING = struct.Struct("!HI64sBHBBH")
+E131_DMP = struct.Struct("!HBBHHHB")
+E131_SYNC = struct.Struct("!HIBHH")
+E131_DATA_OFFSET = E131_ROOT.size + E131_FRAMING.size + E131_DMP.size  # 126
+E131_SEQUENCE_OFFSET = 111
+E131_SYNC_SEQUENCE_OFFSET = 44
+E131_VECTOR_ROOT_DATA = 0x00000004
+E131_VECTOR_ROOT_EXTENDED = 0x00000008
+E131_VECTOR_DATA_PACKET = 0x00000002
+E131_VECTOR_EXTENDED_SYNC = 0x00000001
+CHANNELS_PER_UNIVERSE = 510  # 170 RGB pixels per DMX universe
+
+IP_UDP_OVERHEAD = 28
+KEEPALIVE = 1.0  # WLED gives up on a realtime stream after 2.5s by default
+
+_send_error_log = RateLimiter(5.0)
+
+
+class PixelOutput(abc.ABC):
+    """
+    Base of the network outputs. LEDMatrix calls open() with the framebuffer
+    pixel shown by each LED, then send() with the framebuffer on every show().
+    Subclasses build the packets in _build_packets() and number them in
+    _begin_frame() / _finish_frame().
+    """
+
+    PORT = 0
+
+    def __init__(
+        self, host: str, port: Optional[int] = None, skip_unchanged: bool = False, keepalive: float = KEEPALIVE
+    ) -> None:
+        self.host = host
+        self.port = port or self.PORT
+        self.skip_unchanged = skip_unchanged
+        self.keepalive = keepalive
+        self.frames_sent = 0
+        self.packets_sent = 0
+        self._sock = None
+        self._levels = None  # Brightness lookup table, None at full brightness
+
+    def open(self, pixel_order: Sequence[int]) -> None:
+        led_count = len(pixel_order)
+        self._order = np.asarray(pixel_order, dtype=np.intp)
+        self._frame = np.zeros((led_count, 3), dtype=np.uint8)  # RGB in LED order
+        self._frame_bytes = memoryview(self._frame).cast("B")
+        # (byte offset, payload view into its packet, whole packet, pixels as last sent)
+        self._packets = []
+        for start, packet, payload_offset in self._build_packets(led_count * 3):
+            size = len(packet) - payload_offset
+            view = memoryview(packet)
+            self._packets.append((start, view[payload_offset:], view, bytearray(size)))
+        self._last_full_send = 0.0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)  # A full socket buffer drops the frame, it never stalls the render loop
+        logging.info(
+            f"{type(self).__name__} to {self.host}:{self.port}, {led_count} LEDs in {len(self._packets)} packets"
+        )
+
+    def set_brightness(self, brightness: int) -> None:
+        """Scale every channel by brightness / 255, like the ws281x strip's global brightness."""
+        if brightness >= 255:
+            self._levels = None
+        else:
+            self._levels = (np.arange(256) * brightness // 255).astype(np.uint8)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def send(self, pixels: np.ndarray) -> None:
+        """Send the (height, width, 3) framebuffer array."""
+        if self._sock is None:
+            return
+        np.take(pixels.reshape(-1, 3), self._order, axis=0, out=self._frame, mode="clip")
+        if self._levels is not None:
+            np.take(self._levels, self._frame, out=self._frame, mode="clip")
+        now = time.monotonic()
+        full = not self.skip_unchanged or now - self._last_full_send >= self.keepalive
+        if full:
+            self._last_full_send = now
+        frame_bytes = self._frame_bytes
+        changed = []
+        for packet in self._packets:
+            start, payload, _, sent = packet
+            pixels_bytes = frame_bytes[start:start + len(sent)]
+            if full or sent != pixels_bytes:
+                sent[:] = pixels_bytes
+                payload[:] = sent
+                changed.append(packet)
+        if not changed:
+            return
+        self._begin_frame()
+        for i, packet in enumerate(changed):
+            self._send(self._stamp(packet, i == len(changed) - 1), self._destination(packet))
+        self._finish_frame()
+        self.frames_sent += 1
+
+    def _send(self, data, destination) -> None:
+        try:
+            self._sock.sendto(data, destination)
+            self.packets_sent += 1
+        except OSError as e:  # BlockingIOError included, unreachable controllers too
+            _send_error_log.log(logging.WARNING, f"Cannot send pixels to {destination[0]}: {e}")
+
+    def _destination(self, packet):
+        return (self.host, self.port)
+
+    @abc.abstractmethod
+    def _build_packets(self, size: int):
+        """Yield (frame byte offset, packet with its header filled in, payload offset) covering `size` bytes."""
+
+    def _begin_frame(self) -> None:
+        pass
+
+    def _stamp(self, packet, last: bool):
+        """Fill in the per-frame header fields, return what to send."""
+        return packet[2]
+
+    def _finish_frame(self) -> None:
+        pass
+
+
+class DDPOutput(PixelOutput):
+    """Distributed Display Protocol: byte offsets into the controller's pixels, PUSH on the last packet."""
+
+    PORT = DDP_PORT
+
+    def __init__(self, host: str, port: Optional[int] = None, mtu: int = 1500, **kwargs) -> None:
+        super().__init__(host, port, **kwargs)
+        # Whole pixels only, a pixel split across packets would show half-updated
+        self.max_data = min(DDP_MAX_DATA, (mtu - IP_UDP_OVERHEAD - DDP_HEADER.size) // 3 * 3)
+        self.sequence = 0
+
+    def _build_packets(self, size: int):
+        for start in range(0, size, self.max_data):
+            length = min(self.max_data, size - start)
+            packet = bytearray(DDP_HEADER.size + length)
+            DDP_HEADER.pack_into(packet, 0, DDP_VERSION_1, 0, DDP_TYPE_RGB24, DDP_DEVICE_DISPLAY, start, length)
+            yield start, packet, DDP_HEADER.size
+
+    def _begin_frame(self) -> None:
+        self.sequence = self.sequence % 15 + 1  # 1-15, 0 means the receiver should not check it
+
+    def _stamp(self, packet, last: bool):
+        data = packet[2]
+        data[0] = DDP_VERSION_1 | DDP_FLAG_PUSH if last else DDP_VERSION_1
+        data[1] = self.sequence
+        return data
+
+
+class E131Output(PixelOutput):
+    """
+    E1.31 (sACN): one universe of 170 pixels per packet from `universe` on,
+    then a synchronization packet on `sync_universe` (0 leaves it out and the
+    controller shows each universe as it arrives). A host of "multicast" sends
+    every universe to its standard multicast group.
+    """
+
+    PORT = E131_PORT
+
+    def __init__(
+        self,
+        host: str,
+        port: Optional[int] = None,
+        universe: int = 1,
+        sync_universe: int = 64000,
+        priority: int = 100,
+        source_name: str = "rpi4b-led",
+        **kwargs,
+    ) -> None:
+        super().__init__(host, port, **kwargs)
+        self.universe = universe
+        self.sync_universe = sync_universe
+        self.priority = priority
+        self.source_name = source_name.encode()[:63]
+        self.cid = uuid.uuid4().bytes
+        self.sequence = 0
+        self._multicast = host == "multicast"
+        self._destinations: List = []
+        self._sync_packet = None
+        if sync_universe:
+            self._sync_packet = bytearray(E131_ROOT.size + E131_SYNC.size)
+            E131_ROOT.pack_into(
+                self._sync_packet, 0, 0x0010, 0, E131_ACN_ID, 0x7000 | (len(self._sync_packet) - 16),
+                E131_VECTOR_ROOT_EXTENDED, self.cid,
+            )
+            E131_SYNC.pack_into(
+                self._sync_packet, E131_ROOT.size, 0x7000 | E131_SYNC.size, E131_VECTOR_EXTENDED_SYNC, 0, sync_universe, 0
+            )
+            self._sync_destination = self._universe_destination(sync_universe)
+
+    def _universe_destination(self, universe: int):
+        if self._multicast:
+            return (f"239.255.{universe >> 8}.{universe & 0xFF}", self.port)
+        return (self.host, self.port)
+
+    def _build_packets(self, size: int):
+        for index, start in enumerate(range(0, size, CHANNELS_PER_UNIVERSE)):
+            channels = min(CHANNELS_PER_UNIVERSE, size - start)
+            universe = self.universe + index
+            packet = bytearray(E131_DATA_OFFSET + channels)
+            E131_ROOT.pack_into(
+                packet, 0, 0x0010, 0, E131_ACN_ID, 0x7000 | (len(packet) - 16), E131_VECTOR_ROOT_DATA, self.cid
+            )
+            E131_FRAMING.pack_into(
+                packet, E131_ROOT.size, 0x7000 | (len(packet) - E131_ROOT.size), E131_VECTOR_DATA_PACKET,
+                self.source_name, self.priority, self.sync_universe, 0, 0, universe,
+            )
+            E131_DMP.pack_into(
+                packet, E131_ROOT.size + E131_FRAMING.size, 0x7000 | (len(packet) - E131_ROOT.size - E131_FRAMING.size),
+                0x02, 0xA1, 0, 1, channels + 1, 0,
+            )
+            self._destinations.append(self._universe_destination(universe))
+            yield start, packet, E131_DATA_OFFSET
+
+    def _destination(self, packet):
+        return self._destinations[packet[0] // CHANNELS_PER_UNIVERSE]
+
+    def _begin_frame(self) -> None:
+        self.sequence = (self.sequence + 1) & 0xFF
+
+    def _stamp(self, packet, last: bool):
+        data = packet[2]
+        data[E131_SEQUENCE_OFFSET] = self.sequence
+        return data
+
+    def _finish_frame(self) -> None:
+        if self._sync_packet is not None:
+            self._sync_packet[E131_SYNC_SEQUENCE_OFFSET] = self.sequence
+            self._send(self._sync_packet, self._sync_destination)
+
+
+OUTPUTS = {"ddp": DDPOutput, "e131": E131Output}
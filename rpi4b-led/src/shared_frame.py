@@ -0,0 +1,134 @@
+"""
+Double-buffered framebuffer in named shared memory, so other processes can draw
+on the wall without importing the app stack (this module only needs the stdlib).
+
+Layout: a 16 byte header followed by two RGB pages of width * height * 3 bytes,
+row-major from the top-left pixel.
+
+    magic    4s  b"LEDF"
+    width    u16
+    height   u16
+    sequence u32  incremented by the producer on every commit
+    ready    u8   1 while a committed frame waits to be displayed
+    active   u8   1 while the display side consumes frames
+    front    u8   index of the page currently shown on the wall
+    pad      u8
+
+A producer draws into back_page() only while `active and not ready`, then calls
+commit(). The display side flips `front` to the committed page and clears
+`ready`, which hands the other page back to the producer.
+"""
+
+import struct
+from multiprocessing import shared_memory
+
+MAGIC = b"LEDF"
+HEADER = struct.Struct("<4sHHIBBBx")
+SEQUENCE_OFFSET = 8
+READY_OFFSET = 12
+ACTIVE_OFFSET = 13
+FRONT_OFFSET = 14
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always tracks, which would unlink the segment when an
+        # attaching process exits
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedFrame:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        magic, self.width, self.height, _, _, _, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory {shm.name} is not an LED framebuffer")
+        self.page_size = self.width * self.height * 3
+        self.pages = [
+            shm.buf[HEADER.size + i * self.page_size:HEADER.size + (i + 1) * self.page_size]
+            for i in range(2)
+        ]
+
+    @classmethod
+    def create(cls, name: str, width: int, height: int) -> "SharedFrame":
+        size = HEADER.size + 2 * width * height * 3
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a crashed run
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, width, height, 0, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrame":
+        return cls(_open_segment(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _get(self, offset: int) -> int:
+        return self.shm.buf[offset]
+
+    def _set(self, offset: int, value: int) -> None:
+        self.shm.buf[offset] = value
+
+    @property
+    def sequence(self) -> int:
+        return struct.unpack_from("<I", self.shm.buf, SEQUENCE_OFFSET)[0]
+
+    @property
+    def ready(self) -> bool:
+        return self._get(READY_OFFSET) == 1
+
+    @property
+    def active(self) -> bool:
+        return self._get(ACTIVE_OFFSET) == 1
+
+    @active.setter
+    def active(self, value: bool) -> None:
+        self._set(ACTIVE_OFFSET, 1 if value else 0)
+
+    @property
+    def front(self) -> int:
+        return self._get(FRONT_OFFSET)
+
+    def front_page(self) -> memoryview:
+        return self.pages[self.front]
+
+    def back_page(self) -> memoryview:
+        return self.pages[1 - self.front]
+
+    # Producer side
+    def can_write(self) -> bool:
+        return self.active and not self.ready
+
+    def commit(self) -> None:
+        struct.pack_into("<I", self.shm.buf, SEQUENCE_OFFSET, (self.sequence + 1) & 0xFFFFFFFF)
+        self._set(READY_OFFSET, 1)
+
+    # Display side
+    def flip(self) -> memoryview:
+        """Make the committed back page the front page and release the old one to the producer."""
+        self._set(FRONT_OFFSET, 1 - self.front)
+        self._set(READY_OFFSET, 0)
+        return self.front_page()
+
+    def close(self) -> None:
+        for page in self.pages:
+            page.release()
+        self.pages = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
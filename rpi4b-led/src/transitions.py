@@ -0,0 +1,158 @@
+"""
+Screen transitions for app switches: wipes, an iris, a dissolve, fades and
+slides from a snapshot of the outgoing screen to the incoming app's frames.
+
+Wipes, the iris, the dissolve and slides are index maps precomputed once per
+matrix size: for each of their steps, which pixel of [outgoing snapshot,
+incoming frame] every framebuffer pixel shows. A frame of any of them is then
+one np.take() into the framebuffer. Fades blend the two with integer weights.
+The incoming app keeps running during the transition, its frames are captured
+before they are blended over and restored after they have been shown, so the
+app never sees the blend in its framebuffer.
+"""
+
+import functools
+import time
+
+import numpy as np
+
+import color_tables
+from led_matrix import LEDMatrix
+
+# Steps of the order-based transitions (slides have one step per pixel of travel)
+STEPS = 64
+
+WIPES = {
+    # Direction the edge between outgoing and incoming moves in
+    "wipe_left": lambda x, y, w, h: (w - 1 - x) / w,
+    "wipe_right": lambda x, y, w, h: x / w,
+    "wipe_up": lambda x, y, w, h: (h - 1 - y) / h,
+    "wipe_down": lambda x, y, w, h: y / h,
+    "wipe_diagonal": lambda x, y, w, h: (x / w + y / h) / 2,
+}
+SLIDES = ["slide_left", "slide_right", "slide_up", "slide_down"]  # Direction the screens move in
+FADES = ["fade", "fade_black"]  # Cross-fade, and fade out to black then in
+TRANSITIONS = list(WIPES) + ["iris", "dissolve"] + SLIDES + FADES
+
+
+def _order(name: str, width: int, height: int) -> np.ndarray:
+    """0-1 per pixel: the share of the transition after which it shows the incoming frame."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float64)
+    if name in WIPES:
+        return WIPES[name](x, y, width, height).ravel()
+    if name == "iris":  # A circle opening from the center
+        distance = np.hypot(x - (width - 1) / 2, y - (height - 1) / 2)
+        return (distance / (distance.max() + 1)).ravel()
+    # dissolve: pixels in a fixed random order, the same on every run
+    return np.random.default_rng(0).permutation(width * height) / (width * height)
+
+
+def _slide(name: str, width: int, height: int) -> np.ndarray:
+    size = width * height
+    y, x = np.mgrid[0:height, 0:width]
+    horizontal = name in ("slide_left", "slide_right")
+    travel = width if horizontal else height
+    maps = np.empty((travel + 1, size), dtype=np.intp)
+    for offset in range(travel + 1):
+        if name == "slide_left":
+            sx, sy = x + offset, y
+        elif name == "slide_right":
+            sx, sy = x - offset, y
+        elif name == "slide_up":
+            sx, sy = x, y + offset
+        else:
+            sx, sy = x, y - offset
+        # Past the outgoing screen's edge is the incoming one, which follows right behind it
+        incoming = (sx < 0) | (sx >= width) | (sy < 0) | (sy >= height)
+        index = (sy % height) * width + sx % width + incoming * size
+        maps[offset] = index.ravel()
+    return maps
+
+
+@functools.lru_cache(maxsize=None)
+def index_maps(name: str, width: int, height: int) -> np.ndarray:
+    """(steps + 1, width * height) indices into the stacked outgoing and incoming pixels, read-only."""
+    if name in SLIDES:
+        maps = _slide(name, width, height)
+    elif name in WIPES or name in ("iris", "dissolve"):
+        size = width * height
+        thresholds = np.arange(STEPS + 1) / STEPS
+        incoming = _order(name, width, height)[None, :] < thresholds[:, None]
+        maps = (np.arange(size) + incoming * size).astype(np.intp)
+    else:
+        raise ValueError(f"Unknown transition {name}, expected one of {', '.join(TRANSITIONS)}")
+    maps.flags.writeable = False
+    return maps
+
+
+class Transition:
+    """
+    A transition on `matrix` from the `outgoing` RGB snapshot to whatever is
+    drawn after it starts. Each frame: capture() the incoming frame, draw() the
+    blend, show, restore(). Timing starts with the first draw().
+    """
+
+    def __init__(
+        self,
+        matrix: LEDMatrix,
+        outgoing,
+        name: str = "dissolve",
+        duration: float = 0.4,
+        easing: str = "in_out_sine",
+    ) -> None:
+        size = matrix.width * matrix.height
+        self.name = name
+        self.duration = duration
+        self.easing = easing
+        self.start_time = None
+        self.size = size
+        # Outgoing snapshot, then the captured incoming frame
+        self.sources = np.empty((2 * size, 3), dtype=np.uint8)
+        self.sources[:size] = np.frombuffer(outgoing, dtype=np.uint8).reshape(size, 3)
+        self.incoming = self.sources[size:]
+        self._incoming_bytes = memoryview(self.incoming).cast("B")
+        if name in FADES:
+            self.maps = None
+            self._outgoing = self.sources[:size].astype(np.int32)
+            self._blend = np.empty((size, 3), dtype=np.int32)
+        else:
+            self.maps = index_maps(name, matrix.width, matrix.height)
+
+    def capture(self, matrix: LEDMatrix) -> None:
+        np.copyto(self.incoming, matrix.array().reshape(self.size, 3))
+
+    def draw(self, matrix: LEDMatrix) -> bool:
+        """Blend the captured frames into the framebuffer, False once the transition is over."""
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        t = (now - self.start_time) / self.duration
+        if t >= 1:
+            return False
+        t = color_tables.ease(self.easing, t)
+        out = matrix.array().reshape(self.size, 3)
+        if self.maps is not None:
+            steps = len(self.maps) - 1
+            np.take(self.sources, self.maps[min(steps, int(t * steps))], axis=0, out=out, mode="clip")
+            return True
+
+        blend = self._blend
+        if self.name == "fade":
+            np.copyto(blend, self.incoming)
+            blend -= self._outgoing
+            blend *= int(t * 256)
+            blend >>= 8
+            blend += self._outgoing
+        elif t < 0.5:
+            np.multiply(self._outgoing, int((1 - 2 * t) * 256), out=blend)
+            blend >>= 8
+        else:
+            np.copyto(blend, self.incoming)
+            blend *= int((2 * t - 1) * 256)
+            blend >>= 8
+        np.copyto(out, blend, casting="unsafe")
+        return True
+
+    def restore(self, matrix: LEDMatrix) -> None:
+        """Put the incoming frame back, for apps that draw on top of their previous frame."""
+        matrix.load(self._incoming_bytes)
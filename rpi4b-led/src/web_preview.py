@@ -0,0 +1,217 @@
+"""
+Live browser preview of the matrix.
+
+Serves a canvas page at "/" and streams frames over a WebSocket at "/stream".
+Every binary message starts with a 5 byte header (kind u8, width u16, height u16,
+little endian) followed by runs of (pixel offset u32, pixel count u16, RGB bytes).
+KEYFRAME messages carry runs covering the whole frame, DELTA messages only
+the changed span of each changed row.
+"""
+
+import asyncio
+import logging
+import struct
+import threading
+import time
+from typing import Optional, Set
+
+from led_matrix import LEDMatrix
+from websocket_server import (
+    accept_websocket,
+    is_websocket_upgrade,
+    read_http_request,
+    recv_message,
+    send_http_response,
+    send_message,
+)
+
+KEYFRAME = 0
+DELTA = 1
+
+_HEADER = struct.Struct("<BHH")
+_RUN = struct.Struct("<IH")
+
+
+def encode_keyframe(frame: bytes, width: int, height: int) -> bytes:
+    parts = [_HEADER.pack(KEYFRAME, width, height)]
+    pixels = width * height
+    for offset in range(0, pixels, 0xFFFF):
+        count = min(0xFFFF, pixels - offset)
+        parts.append(_RUN.pack(offset, count))
+        parts.append(frame[offset * 3:(offset + count) * 3])
+    return b"".join(parts)
+
+
+def encode_delta(previous: bytes, frame: bytes, width: int, height: int) -> Optional[bytes]:
+    """Encode the changed span of each row, or return None if nothing changed."""
+    row_bytes = width * 3
+    parts = [_HEADER.pack(DELTA, width, height)]
+    for start in range(0, len(frame), row_bytes):
+        end = start + row_bytes
+        old = previous[start:end]
+        new = frame[start:end]
+        if old == new:
+            continue
+        # XOR the rows as big ints to find the first and last differing byte without a Python loop
+        diff = int.from_bytes(old, "big") ^ int.from_bytes(new, "big")
+        first = row_bytes - (diff.bit_length() + 7) // 8
+        last = row_bytes - 1 - ((diff & -diff).bit_length() - 1) // 8
+        first_pixel = first // 3
+        last_pixel = last // 3
+        parts.append(_RUN.pack(start // 3 + first_pixel, last_pixel - first_pixel + 1))
+        parts.append(new[first_pixel * 3:(last_pixel + 1) * 3])
+    if len(parts) == 1:
+        return None
+    return b"".join(parts)
+
+
+PREVIEW_PAGE = b"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>LED Matrix Preview</title>
+<style>
+body{margin:0;height:100vh;display:flex;justify-content:center;align-items:center;background:#111}
+canvas{width:90vw;max-height:90vh;object-fit:contain;image-rendering:pixelated}
+</style></head><body><canvas id="c" width="1" height="1"></canvas>
+<script>
+var canvas = document.getElementById("c"), ctx = canvas.getContext("2d"), image = null;
+function connect(){
+  var ws = new WebSocket("ws://" + location.host + "/stream");
+  ws.binaryType = "arraybuffer";
+  ws.onmessage = function(e){
+    var view = new DataView(e.data), bytes = new Uint8Array(e.data);
+    var width = view.getUint16(1, true), height = view.getUint16(3, true);
+    if (!image || image.width !== width || image.height !== height){
+      canvas.width = width; canvas.height = height;
+      image = ctx.createImageData(width, height);
+      for (var i = 3; i < image.data.length; i += 4) image.data[i] = 255;
+    }
+    var pos = 5, px = image.data;
+    while (pos < bytes.length){
+      var offset = view.getUint32(pos, true), count = view.getUint16(pos + 4, true);
+      pos += 6;
+      for (var n = 0; n < count; n++, pos += 3){
+        var o = (offset + n) * 4;
+        px[o] = bytes[pos]; px[o + 1] = bytes[pos + 1]; px[o + 2] = bytes[pos + 2];
+      }
+    }
+    ctx.putImageData(image, 0, 0);
+  };
+  ws.onclose = function(){ setTimeout(connect, 1000); };
+}
+connect();
+</script></body></html>
+"""
+
+
+class WebPreviewServer:
+    """
+    HTTP/WebSocket preview running on its own thread. The render loop only
+    snapshots the framebuffer at `max_fps` while somebody is watching; each
+    viewer encodes and sends the latest snapshot at its own pace, so a slow
+    viewer skips frames instead of holding up show().
+    """
+
+    def __init__(
+        self, matrix: LEDMatrix, host: str = "0.0.0.0", port: int = 8080, max_fps: float = 10
+    ) -> None:
+        self.matrix = matrix
+        self.host = host
+        self.port = port
+        self.frame_interval = 1.0 / max_fps
+        self._next_frame_time = 0.0
+        self._latest = bytes(matrix.buffer)
+        self._viewers: Set[asyncio.Event] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="web-preview", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        self.matrix.add_frame_listener(self.on_frame)
+
+    def stop(self) -> None:
+        self.matrix.remove_frame_listener(self.on_frame)
+        # The loop is already closed if the server failed to start, e.g. the port was taken
+        if self._loop is not None and self._stop_event is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def on_frame(self, buffer) -> None:
+        if not self._viewers or self._loop is None:
+            return
+        now = time.monotonic()
+        if now < self._next_frame_time:
+            return
+        self._next_frame_time = now + self.frame_interval
+        self._latest = bytes(buffer)
+        self._loop.call_soon_threadsafe(self._notify_viewers)
+
+    def _notify_viewers(self) -> None:
+        for event in self._viewers:
+            event.set()
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except Exception:
+            logging.error("Web preview stopped", exc_info=True)
+        finally:
+            self._ready.set()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logging.info(f"Web preview on http://{self.host}:{self.port}/")
+        self._ready.set()
+        await self._stop_event.wait()
+        server.close()
+        await server.wait_closed()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            method, path, headers = await read_http_request(reader)
+            if not is_websocket_upgrade(headers):
+                if method == "GET" and path in ("/", "/index.html"):
+                    await send_http_response(writer, "200 OK", PREVIEW_PAGE, "text/html; charset=utf-8")
+                else:
+                    await send_http_response(writer, "404 Not Found", b"not found")
+                return
+            await accept_websocket(writer, headers)
+            await self._stream(reader, writer)
+        except (ValueError, KeyError, ConnectionError, asyncio.IncompleteReadError):
+            logging.debug("Dropped preview connection", exc_info=True)
+        finally:
+            writer.close()
+
+    async def _stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        width, height = self.matrix.width, self.matrix.height
+        event = asyncio.Event()
+        # The viewer never sends data, reading only notices the close
+        closed = asyncio.ensure_future(recv_message(reader, writer))
+        self._viewers.add(event)
+        try:
+            previous = self._latest
+            send_message(writer, encode_keyframe(previous, width, height), binary=True)
+            await writer.drain()
+            while not closed.done():
+                waiter = asyncio.ensure_future(event.wait())
+                await asyncio.wait([waiter, closed], return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if closed.done():
+                    break
+                event.clear()
+                frame = self._latest
+                message = encode_delta(previous, frame, width, height)
+                previous = frame
+                if message is not None:
+                    send_message(writer, message, binary=True)
+                    await writer.drain()
+        finally:
+            self._viewers.discard(event)
+            closed.cancel()
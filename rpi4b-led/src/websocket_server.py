@@ -0,0 +1,170 @@
+import asyncio
+import base64
+import hashlib
+import struct
+from typing import Dict, Optional, Tuple
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_MESSAGE = 1 << 16  # Gamepad and viewer messages are tiny, anything bigger is refused
+CLOSE_TOO_BIG = 1009
+
+
+class MessageTooBig(Exception):
+    pass
+
+
+class Opcode:
+    CONTINUATION = 0x0
+    TEXT = 0x1
+    BINARY = 0x2
+    CLOSE = 0x8
+    PING = 0x9
+    PONG = 0xA
+
+
+async def read_http_request(
+    reader: asyncio.StreamReader,
+) -> Tuple[str, str, Dict[str, str]]:
+    """Read an HTTP request head, returning (method, path, lower-cased headers)."""
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    parts = request_line.split(" ")
+    if len(parts) != 3:
+        raise ValueError(f"Malformed request line: {request_line!r}")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, path, headers
+
+
+def is_websocket_upgrade(headers: Dict[str, str]) -> bool:
+    return headers.get("upgrade", "").lower() == "websocket"
+
+
+async def send_http_response(
+    writer: asyncio.StreamWriter,
+    status: str,
+    body: bytes = b"",
+    content_type: str = "text/plain; charset=utf-8",
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> None:
+    head = [
+        f"HTTP/1.1 {status}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    for name, value in (extra_headers or {}).items():
+        head.append(f"{name}: {value}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def accept_websocket(
+    writer: asyncio.StreamWriter, headers: Dict[str, str]
+) -> None:
+    key = headers["sec-websocket-key"]
+    accept = base64.b64encode(
+        hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+    ).decode("ascii")
+    writer.write(
+        (
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode("ascii")
+    )
+    await writer.drain()
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    # XOR the whole payload at once through big ints instead of byte by byte
+    size = len(payload)
+    if size == 0:
+        return payload
+    key = (mask * (size // 4 + 1))[:size]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(
+        size, "big"
+    )
+
+
+def encode_frame(opcode: int, payload: bytes = b"", mask: bytes = b"") -> bytes:
+    """Build a single final frame. Clients must pass a 4 byte mask, servers must not."""
+    size = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if size < 126:
+        head = struct.pack("!BB", 0x80 | opcode, mask_bit | size)
+    elif size < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, size)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, size)
+    if mask:
+        return head + mask + _unmask(payload, mask)
+    return head + payload
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int = MAX_MESSAGE) -> Tuple[bool, int, bytes]:
+    """Read one frame, returning (fin, opcode, unmasked payload). Raises MessageTooBig past `max_size`."""
+    b0, b1 = await reader.readexactly(2)
+    size = b1 & 0x7F
+    if size == 126:
+        (size,) = struct.unpack("!H", await reader.readexactly(2))
+    elif size == 127:
+        (size,) = struct.unpack("!Q", await reader.readexactly(8))
+    if size > max_size:
+        raise MessageTooBig(size)  # Before reading, the length is whatever the peer claims
+    mask = await reader.readexactly(4) if b1 & 0x80 else b""
+    payload = await reader.readexactly(size)
+    if mask:
+        payload = _unmask(payload, mask)
+    return bool(b0 & 0x80), b0 & 0x0F, payload
+
+
+async def recv_message(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_size: int = MAX_MESSAGE
+) -> Optional[Tuple[int, bytes]]:
+    """
+    Receive the next data message, answering pings on the way.
+    Returns (opcode, payload), or None once the peer closed the connection
+    or sent a message over `max_size` bytes (closed with 1009).
+    """
+    message_opcode = None
+    chunks = []
+    size = 0
+    while True:
+        try:
+            fin, opcode, payload = await read_frame(reader, max_size - size)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        except MessageTooBig:
+            writer.write(encode_frame(Opcode.CLOSE, struct.pack("!H", CLOSE_TOO_BIG)))
+            return None
+
+        if opcode == Opcode.CLOSE:
+            writer.write(encode_frame(Opcode.CLOSE, payload[:2]))
+            return None
+        if opcode == Opcode.PING:
+            writer.write(encode_frame(Opcode.PONG, payload))
+            continue
+        if opcode == Opcode.PONG:
+            continue
+
+        if opcode != Opcode.CONTINUATION:
+            message_opcode = opcode
+            chunks = []
+            size = 0
+        chunks.append(payload)
+        size += len(payload)
+        if fin and message_opcode is not None:
+            return message_opcode, b"".join(chunks)
+
+
+def send_message(writer: asyncio.StreamWriter, payload, binary: bool = False) -> None:
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    writer.write(encode_frame(Opcode.BINARY if binary else Opcode.TEXT, payload))
@@ -2,16 +2,22 @@
 
 start() {
     echo "Starting tasks..."
+    local led_args="--width 18 --height 9 --pixel-width 2 --control-socket"
 
-    # Start gamepad service and redirect output
-    sudo node ./node-virtual-gamepads/main.js > ./node-virtual-gamepads.log 2>&1 &
-    echo $! > ./node-virtual-gamepads.pid
-    
-    # Wait for gamepad service to initialize
-    sleep 2
+    if [ "$GAMEPAD_SERVER" = "python" ]; then
+        # Phones connect straight to the LED matrix process
+        led_args="$led_args --gamepad-server"
+    else
+        # Start gamepad service and redirect output
+        sudo node ./node-virtual-gamepads/main.js > ./node-virtual-gamepads.log 2>&1 &
+        echo $! > ./node-virtual-gamepads.pid
+
+        # Wait for gamepad service to initialize
+        sleep 2
+    fi
     
     # Start LED matrix and redirect output
-    sudo python3 ./rpi4b-led/src/main.py --width 18 --height 9 --pixel-width 2 > ./rpi4b-led.log 2>&1 &
+    sudo python3 ./rpi4b-led/src/main.py $led_args > ./rpi4b-led.log 2>&1 &
     echo $! > ./rpi4b-led.pid
     
     echo "Tasks started."
@@ -0,0 +1,90 @@
+"""
+Check of the asset loader (src/assets.py) against throwaway PNGs: decoding,
+the memory-mapped cache, clipped sprite drawing, tinted text and reloading a
+changed file. Uses a temporary cache directory and exits non-zero on failure:
+
+    python test/asset-check.py
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rpi4b-led", "src"))
+
+work_dir = tempfile.mkdtemp(prefix="led-assets-")
+atexit.register(shutil.rmtree, work_dir, True)
+os.environ["LED_ASSET_CACHE"] = os.path.join(work_dir, "cache")  # Read when assets is imported
+
+import pygame
+
+import assets
+from apps.base import FONT
+from led_matrix import LEDMatrix
+
+RED, GREEN, BLUE = 0xFF0000, 0x00FF00, 0x0000FF
+
+
+def check(name: str, condition: bool) -> None:
+    print(f"{name:<40} {'ok' if condition else 'FAILED'}")
+    if not condition:
+        sys.exit(1)
+
+
+def row(matrix: LEDMatrix, y: int):
+    return [matrix.get_color(x, y) for x in range(matrix.width)]
+
+
+if __name__ == "__main__":
+    # A 4x3 sprite: three opaque pixels in the top row, a gap at x = 2 and a translucent pixel below
+    sprite_path = os.path.join(work_dir, "sprite.png")
+    image = pygame.Surface((4, 3), pygame.SRCALPHA)
+    image.fill((0, 0, 0, 0))
+    image.set_at((0, 0), (255, 0, 0, 255))
+    image.set_at((1, 0), (0, 255, 0, 255))
+    image.set_at((3, 0), (0, 0, 255, 255))
+    image.set_at((2, 2), (9, 9, 9, 100))
+    pygame.image.save(image, sprite_path)
+
+    # A font sheet of the built-in 3x5 glyphs
+    font_path = os.path.join(work_dir, "font.png")
+    chars = "".join(FONT)
+    image = pygame.Surface((3 * len(chars), 5), pygame.SRCALPHA)
+    image.fill((0, 0, 0, 0))
+    for i, char in enumerate(chars):
+        for y, pattern in enumerate(FONT[char]):
+            for x, pixel in enumerate(pattern):
+                if pixel == "#":
+                    image.set_at((i * 3 + x, y), (255, 255, 255, 255))
+    pygame.image.save(image, font_path)
+
+    sprite = assets.load_sprite(sprite_path)
+    check("decode: opaque runs", list(sprite.runs) == [0, 0, 2, 0, 3, 1])
+    check("decode: advance", sprite.advance == 4)
+
+    matrix = LEDMatrix(8, 4, 32, 0, headless=True)
+    sprite.draw(matrix, -1, 1)
+    check("draw clipped at the left edge", row(matrix, 1)[:4] == [GREEN, 0, BLUE, 0])
+    check("draw skips transparent pixels", row(matrix, 3) == [0] * 8)
+    matrix.clear()
+    sprite.draw(matrix, 6, 0)
+    check("draw clipped at the right edge", row(matrix, 0)[5:] == [0, RED, GREEN])
+
+    assets._sheets.clear()
+    font = assets.load_font(font_path, chars, 3, 5)
+    check("cache hit is memory-mapped", font.sheet._source is not None)
+
+    text_matrix = LEDMatrix(20, 5, 100, 0, headless=True)
+    end = font.draw_text(text_matrix, 0, 0, "12:0", 0xFF8000)
+    check("text width", end == font.text_width("12:0"))
+    drawn = {text_matrix.get_color(x, y) for y in range(5) for x in range(20)} - {0}
+    check("text drawn in the tint", drawn == {0xFF8000})
+
+    old_sheet = font.sheet
+    os.utime(font_path, ns=(1, 1))
+    reloaded = assets.load_font(font_path, chars, 3, 5)
+    check("changed file is reloaded", reloaded.sheet is not old_sheet)
+    check("replaced sheet is closed", old_sheet._source is None)
+    check("reloaded sheet draws", reloaded.draw_text(text_matrix, 0, 0, "1") == font.text_width("1"))
@@ -0,0 +1,119 @@
+"""
+Allocation check of the frame loop: runs apps headless with a fake gamepad and
+measures with tracemalloc, per frame, the memory allocated over the frame's
+start (transient garbage) and the blocks still allocated afterwards (growth).
+Exits non-zero when an app is over budget:
+
+    python test/frame-alloc.py TetrisApp SnakeApp --frames 1000
+"""
+
+import argparse
+import array
+import gc
+import os
+import random
+import statistics
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rpi4b-led", "src"))
+
+import pygame
+
+import apps
+from input_manager import InputManager
+from led_matrix import LEDMatrix
+
+DEFAULT_APPS = ["ClockApp", "TetrisApp", "SnakeApp", "ScreenTestApp", "LifeApp"]
+
+
+class FakeGamepad:
+    """A virtual gamepad pressing random buttons, BACK excepted so the apps keep running."""
+
+    def __init__(self, press_chance: float) -> None:
+        self.press_chance = press_chance
+
+    def get_instance_id(self) -> int:
+        return 0
+
+    def get_name(self) -> str:
+        return "Virtual benchmark pad"
+
+    def get_numbuttons(self) -> int:
+        return 12
+
+    def get_numaxes(self) -> int:
+        return 2
+
+    def get_numhats(self) -> int:
+        return 1
+
+    def get_button(self, button: int) -> bool:
+        return button != 6 and random.random() < self.press_chance
+
+    def get_axis(self, axis: int) -> float:
+        return 0.0
+
+    def get_hat(self, hat: int):
+        return (0, 0)
+
+
+def measure(name: str, input_manager: InputManager, width: int, height: int, frames: int, warmup: int):
+    """Return (mean transient bytes, worst transient bytes, blocks kept per frame) of `name`."""
+    matrix = LEDMatrix(width, height, width * height, 0, headless=True)
+    app = getattr(apps, name)(matrix)
+    app.connect_device()
+    app.reset()
+
+    def frame() -> None:
+        app.keep_running = True
+        if app.clear_before_render:
+            matrix.clear()
+        app.simulate(1 / app.target_fps, input_manager.update)
+        app.render()
+        matrix.show()
+
+    for _ in range(warmup):
+        frame()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    transient = array.array("q", bytes(8 * frames))  # Preallocated, appending would count as kept blocks
+    for i in range(frames):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        frame()
+        transient[i] = tracemalloc.get_traced_memory()[1] - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # Leave out tracemalloc's own bookkeeping
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    kept = sum(stat.count_diff for stat in after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno"))
+    return statistics.mean(transient), max(transient), kept / frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("apps", nargs="*", default=DEFAULT_APPS)
+    parser.add_argument("--width", type=int, default=18)
+    parser.add_argument("--height", type=int, default=9)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=120)
+    parser.add_argument("--press-chance", type=float, default=0.02, help="Chance a button is down in a frame")
+    parser.add_argument("--max-bytes", type=int, default=1024, help="Budget of the mean transient bytes per frame")
+    parser.add_argument("--max-blocks", type=float, default=0.5, help="Budget of the blocks kept per frame")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    random.seed(0)
+    input_manager = InputManager([FakeGamepad(args.press_chance)])
+    failed = False
+    for name in args.apps:
+        mean, worst, kept = measure(name, input_manager, args.width, args.height, args.frames, args.warmup)
+        ok = mean <= args.max_bytes and kept <= args.max_blocks
+        failed |= not ok
+        print(
+            f"{name:16} {mean:8.0f} B/frame transient (worst {worst} B), {kept:5.2f} blocks/frame kept"
+            f"  {'ok' if ok else 'OVER BUDGET'}"
+        )
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,76 @@
+"""Scripted gamepad client for the built-in gamepad server (main.py --gamepad-server)."""
+
+import argparse
+import base64
+import json
+import os
+import socket
+import time
+
+# (delay in seconds, message)
+SCRIPT = [
+    (0.5, {"type": "axis", "index": 0, "value": 1.0}),  # Menu right
+    (0.3, {"type": "axis", "index": 0, "value": 0.0}),
+    (0.5, {"type": "button", "index": 0, "value": 1}),  # A: launch app
+    (0.1, {"type": "button", "index": 0, "value": 0}),
+    (1.0, {"type": "axis", "index": 1, "value": 1.0}),  # Down
+    (0.3, {"type": "axis", "index": 1, "value": 0.0}),
+    (1.0, {"type": "button", "index": 6, "value": 1}),  # BACK: return to menu
+    (0.1, {"type": "button", "index": 6, "value": 0}),
+]
+
+
+def send_udp(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    buttons = [0] * 8
+    axes = [0.0, 0.0]
+    for delay, message in SCRIPT:
+        time.sleep(delay)
+        if message["type"] == "button":
+            buttons[message["index"]] = message["value"]
+        else:
+            axes[message["index"]] = message["value"]
+        # Full state messages survive lost datagrams
+        state = {"type": "state", "buttons": buttons, "axes": axes}
+        sock.sendto(json.dumps(state).encode(), (host, port))
+        print("udp", state)
+    sock.sendto(json.dumps({"type": "bye"}).encode(), (host, port))
+
+
+def send_ws(host, port):
+    sock = socket.create_connection((host, port))
+    key = base64.b64encode(os.urandom(16)).decode()
+    sock.sendall(
+        (
+            f"GET /gamepad HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode()
+    )
+    response = sock.recv(1024)
+    assert response.startswith(b"HTTP/1.1 101"), response
+
+    def send_text(text):
+        payload = text.encode()
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        sock.sendall(bytes([0x81, 0x80 | len(payload)]) + mask + masked)
+
+    for delay, message in SCRIPT:
+        time.sleep(delay)
+        send_text(json.dumps(message))
+        print("ws", message)
+    send_text(json.dumps({"type": "bye"}))
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws", action="store_true", help="Use WebSocket instead of UDP")
+    args = parser.parse_args()
+
+    if args.ws:
+        send_ws(args.host, args.port)
+    else:
+        send_udp(args.host, args.port)
@@ -0,0 +1,80 @@
+"""
+Local stand-in for a network pixel controller, to test main.py --output ddp/e131:
+counts the packets and frames (DDP push / E1.31 sync) it receives per second and
+draws the last complete frame in the terminal.
+
+    python test/pixel-listener.py ddp --width 18 --height 9
+    python src/main.py --output ddp --output-host 127.0.0.1 --width 18 --height 9
+"""
+
+import argparse
+import socket
+import struct
+import time
+
+CHANNELS_PER_UNIVERSE = 510
+
+
+def draw(frame, width, height):
+    print("\033[H", end="")
+    for y in range(height):
+        # Frames arrive in LED order, undo the serpentine the wall is wired in
+        row_y = height - 1 - y
+        row = frame[row_y * width * 3:(row_y + 1) * width * 3]
+        pixels = [row[x * 3:x * 3 + 3] for x in range(width)]
+        if row_y % 2:
+            pixels.reverse()
+        print("".join(f"\033[48;2;{r};{g};{b}m  \033[0m" for r, g, b in pixels))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("protocol", choices=["e131", "ddp"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=10)
+    parser.add_argument("--universe", type=int, default=1, help="First E1.31 universe")
+    parser.add_argument("--quiet", action="store_true", help="Print only the statistics")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((args.host, {"e131": 5568, "ddp": 4048}[args.protocol]))
+    sock.settimeout(1.0)
+    frame = bytearray(args.width * args.height * 3)
+    packets = frames = payload = 0
+    last_report = time.monotonic()
+    if not args.quiet:
+        print("\033[2J", end="")
+    while True:
+        try:
+            data = sock.recv(2048)
+        except socket.timeout:
+            data = b""
+        if data:
+            packets += 1
+            complete = False
+            if args.protocol == "ddp":
+                flags = data[0]
+                offset, length = struct.unpack_from("!IH", data, 4)
+                frame[offset:offset + length] = data[10:10 + length]
+                payload += length
+                complete = bool(flags & 0x01)
+            elif struct.unpack_from("!I", data, 18)[0] == 0x8:  # Synchronization
+                complete = True
+            else:
+                universe, = struct.unpack_from("!H", data, 113)
+                count, = struct.unpack_from("!H", data, 123)
+                offset = (universe - args.universe) * CHANNELS_PER_UNIVERSE
+                frame[offset:offset + count - 1] = data[126:126 + count - 1]
+                payload += count - 1
+                complete = data[109:111] == b"\x00\x00"  # No sync address: shown as it arrives
+            if complete:
+                frames += 1
+                if not args.quiet:
+                    draw(frame, args.width, args.height)
+
+        now = time.monotonic()
+        if now - last_report >= 1:
+            print(f"\033[K{frames} frames, {packets} packets, {payload} pixel bytes per second")
+            packets = frames = payload = 0
+            last_report = now
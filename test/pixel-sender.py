@@ -0,0 +1,89 @@
+"""Local packet generator for PixelReceiverApp: streams a moving rainbow over E1.31, Art-Net or DDP."""
+
+import argparse
+import socket
+import struct
+import time
+import uuid
+
+CHANNELS_PER_UNIVERSE = 510
+DDP_MAX_DATA = 1440
+
+
+def wheel(pos):
+    if pos < 85:
+        return (pos * 3, 255 - pos * 3, 0)
+    elif pos < 170:
+        pos -= 85
+        return (255 - pos * 3, 0, pos * 3)
+    else:
+        pos -= 170
+        return (0, pos * 3, 255 - pos * 3)
+
+
+def make_frame(width, height, step):
+    frame = bytearray()
+    for y in range(height):
+        for x in range(width):
+            frame += bytes(wheel((x * 256 // width + y * 8 + step) & 255))
+    return frame
+
+
+def e131_packets(frame, sequence, sync_universe, cid=uuid.uuid4().bytes):
+    for index, offset in enumerate(range(0, len(frame), CHANNELS_PER_UNIVERSE)):
+        data = frame[offset:offset + CHANNELS_PER_UNIVERSE]
+        universe = index + 1
+        count = len(data) + 1
+        root = struct.pack("!HH12sHI16s", 0x0010, 0, b"ASC-E1.17\x00\x00\x00", 0x7000 | (110 + count), 0x4, cid)
+        framing = struct.pack("!HI64sBHBBH", 0x7000 | (88 + count), 0x2, b"pixel-sender", 100, sync_universe, sequence, 0, universe)
+        dmp = struct.pack("!HBBHHHB", 0x7000 | (10 + count), 0x02, 0xA1, 0, 1, count, 0)
+        yield root + framing + dmp + data
+    if sync_universe:
+        root = struct.pack("!HH12sHI16s", 0x0010, 0, b"ASC-E1.17\x00\x00\x00", 0x7000 | 33, 0x8, cid)
+        yield root + struct.pack("!HIBHH", 0x7000 | 11, 0x1, sequence, sync_universe, 0)
+
+
+def artnet_packets(frame, sequence, sync):
+    for universe, offset in enumerate(range(0, len(frame), CHANNELS_PER_UNIVERSE)):
+        data = frame[offset:offset + CHANNELS_PER_UNIVERSE]
+        if len(data) % 2:
+            data += b"\x00"
+        yield b"Art-Net\x00" + struct.pack("<H", 0x5000) + struct.pack("!HBBBBH", 14, sequence, 0, universe & 0xFF, universe >> 8, len(data)) + data
+    if sync:
+        yield b"Art-Net\x00" + struct.pack("<H", 0x5200) + struct.pack("!HBB", 14, 0, 0)
+
+
+def ddp_packets(frame, sequence):
+    for offset in range(0, len(frame), DDP_MAX_DATA):
+        data = frame[offset:offset + DDP_MAX_DATA]
+        push = 0x01 if offset + DDP_MAX_DATA >= len(frame) else 0
+        yield struct.pack("!BBBBIH", 0x40 | push, sequence & 0x0F, 0x0B, 1, offset, len(data)) + data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("protocol", choices=["e131", "artnet", "ddp"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--frames", type=int, default=0, help="Stop after this many frames (0: forever)")
+    parser.add_argument("--no-sync", action="store_true", help="Skip sync packets (E1.31/Art-Net)")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    port = {"e131": 5568, "artnet": 6454, "ddp": 4048}[args.protocol]
+    step = 0
+    while args.frames == 0 or step < args.frames:
+        frame = make_frame(args.width, args.height, step)
+        sequence = step & 0xFF
+        if args.protocol == "e131":
+            packets = e131_packets(frame, sequence, 0 if args.no_sync else 64000)
+        elif args.protocol == "artnet":
+            packets = artnet_packets(frame, sequence, not args.no_sync)
+        else:
+            packets = ddp_packets(frame, sequence)
+        for packet in packets:
+            sock.sendto(packet, (args.host, port))
+        step += 1
+        time.sleep(1 / args.fps)
@@ -0,0 +1,45 @@
+"""Sample producer for the shared framebuffer (main.py --shm-name led-matrix, then open ExternalFrameApp)."""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rpi4b-led", "src"))
+
+from shared_frame import SharedFrame  # Only depends on the stdlib
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--name", default="led-matrix")
+    parser.add_argument("--fps", type=float, default=30)
+    args = parser.parse_args()
+
+    frame = SharedFrame.attach(args.name)
+    width, height = frame.width, frame.height
+    print(f"Attached to {args.name}: {width}x{height}")
+
+    start = time.monotonic()
+    try:
+        while True:
+            if not frame.can_write():
+                time.sleep(0.002)
+                continue
+            t = time.monotonic() - start
+            page = frame.back_page()
+            i = 0
+            for y in range(height):
+                for x in range(width):
+                    v = math.sin(x * 0.4 + t) + math.sin(y * 0.3 - t * 1.3) + math.sin((x + y) * 0.2 + t * 0.7)
+                    page[i] = int(127 + 127 * math.sin(v * math.pi / 3))
+                    page[i + 1] = int(127 + 127 * math.sin(v * math.pi / 3 + 2.094))
+                    page[i + 2] = int(127 + 127 * math.sin(v * math.pi / 3 + 4.189))
+                    i += 3
+            frame.commit()
+            time.sleep(1 / args.fps)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        frame.close()
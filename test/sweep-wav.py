@@ -0,0 +1,32 @@
+"""Writes a logarithmic sine sweep WAV for SpectrumApp (main.py --audio sweep.wav)."""
+
+import argparse
+import math
+import struct
+import wave
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output", nargs="?", default="sweep.wav")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--start", type=float, default=40, help="Start frequency in Hz")
+    parser.add_argument("--end", type=float, default=16000, help="End frequency in Hz")
+    args = parser.parse_args()
+
+    count = int(args.seconds * args.rate)
+    ratio = math.log(args.end / args.start)
+    frames = bytearray()
+    for i in range(count):
+        t = i / args.rate
+        # Phase of an exponential sweep, so every octave takes the same time
+        phase = 2 * math.pi * args.start * args.seconds / ratio * (math.exp(t / args.seconds * ratio) - 1)
+        sample = int(0.5 * 32767 * math.sin(phase))
+        frames += struct.pack("<hh", sample, sample)
+
+    with wave.open(args.output, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(args.rate)
+        wav.writeframes(frames)
+    print(f"Wrote {args.seconds}s sweep from {args.start} to {args.end} Hz to {args.output}")
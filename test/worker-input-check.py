@@ -0,0 +1,78 @@
+"""
+Check of button edges in app worker processes (--app-processes): drives
+_worker_main over a Pipe, as WorkerApp does, with a held, released and pressed
+again button, and counts what the app sees per update(). Runs the worker on a
+thread so the app's counts can be read back. Exits non-zero on failure:
+
+    python test/worker-input-check.py
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rpi4b-led", "src"))
+
+from apps.base import BaseApp, GamepadButtons
+from apps.worker import FRAME_DONE, _worker_main
+from input_manager import GamepadType, NintendoButtons
+from led_matrix import LEDMatrix
+from shared_frame import SharedFrame
+
+# A held for 5 frames, released for 3, held again for 4
+BUTTON_A = [True] * 5 + [False] * 3 + [True] * 4
+EXPECTED = {"pressed": 2, "holding": 7, "released": 1}
+
+
+class CountingApp(BaseApp):
+    def reset(self) -> None:
+        self.counts = {"pressed": 0, "holding": 0, "released": 0}
+
+    def update(self, delta_time: float) -> None:
+        for name in self.counts:
+            if getattr(self, f"is_{name}")(GamepadButtons.A):
+                self.counts[name] += 1
+
+
+class FixedStepCountingApp(CountingApp):
+    FIXED_TIMESTEP = 1 / 30
+
+
+def run(app_class) -> dict:
+    matrix = LEDMatrix(4, 4, 16, 0, headless=True)
+    app = app_class(matrix)
+    frame = SharedFrame.create(f"led-input-check-{os.getpid()}", matrix.width, matrix.height)
+    conn, child_conn = multiprocessing.Pipe()
+    worker = threading.Thread(target=_worker_main, args=(app, frame, child_conn))
+    worker.start()
+    devices = [(0, GamepadType.NINTENDO), None, None, None]
+    previous = {0: {NintendoButtons.A: False}}
+    try:
+        for held in BUTTON_A:
+            # What the parent sends: its states of this frame and of the frame before
+            current = {0: {NintendoButtons.A: held}}
+            conn.send((1 / 30, (current, previous, {0: [0.0, 0.0]}, {0: [[0, 0]]}, devices)))
+            message, detail = conn.recv()
+            if message != FRAME_DONE:
+                sys.exit(f"Worker failed:\n{detail}")
+            previous = current
+    finally:
+        conn.close()
+        worker.join(timeout=2)
+        counts = app.counts
+        del app  # With its matrix, which still holds views of the shared page
+        gc.collect()
+        frame.close()
+    return counts
+
+
+if __name__ == "__main__":
+    failed = False
+    for app_class in (CountingApp, FixedStepCountingApp):
+        counts = run(app_class)
+        ok = counts == EXPECTED
+        failed |= not ok
+        print(f"{app_class.__name__:<22} {counts}  {'ok' if ok else f'FAILED, expected {EXPECTED}'}")
+    sys.exit(1 if failed else 0)